@@ -0,0 +1,148 @@
+import math
+import threading
+import time
+from metrics import ADMISSION_ACTIVE, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS, ADMISSION_WAIT_SECONDS
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is over its client's rate limit or its endpoint is at capacity"""
+
+    def __init__(self, message, status, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = max(1, math.ceil(retry_after))  # whole seconds, as Retry-After expects
+
+
+class RateLimiter:
+    """Per-client token bucket (GCRA) kept in the shared store
+
+    Each client's key holds its theoretical arrival time: when its bucket will be
+    full again. A request is admitted while that is at most burst intervals
+    ahead, so a client may send burst requests at once and then one per
+    interval. With SHARED_STATE_BACKEND=database every worker shares the buckets.
+    """
+
+    MAX_ATTEMPTS = 5
+
+    def __init__(self, store, name, per_minute, burst):
+        self.store = store
+        self.name = name
+        self.interval = 60.0 / per_minute
+        self.burst = max(1, burst)
+
+    def check(self, client):
+        """Take a token for client; returns 0 when admitted, otherwise seconds until one is available"""
+        key = f'ratelimit:{self.name}:{client}'
+        for _ in range(self.MAX_ATTEMPTS):
+            now = time.time()
+            stored = self.store.get(key)
+            arrival = max(stored or now, now) + self.interval
+            allowed_at = arrival - self.burst * self.interval
+            if now < allowed_at:
+                return allowed_at - now
+            if self.store.compare_and_set(key, stored, arrival, ttl=arrival - now):
+                return 0
+        # Lost every race for this key: the client is sending faster than it can be counted
+        return self.interval
+
+
+class ConcurrencyLimiter:
+    """Caps requests in progress on one endpoint in this process, with a bounded wait queue
+
+    A request that finds every slot taken waits up to queue_timeout seconds for
+    one, unless queue_size requests are already waiting.
+    """
+
+    def __init__(self, name, limit, queue_size=0, queue_timeout=0):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        started = time.perf_counter()
+        with self._condition:
+            if self.active >= self.limit or self.waiting:
+                if self.waiting >= self.queue_size:
+                    ADMISSION_REJECTIONS.inc(endpoint=self.name, reason='queue_full')
+                    raise AdmissionRejected(
+                        'Server is busy, please retry shortly', 503, self.queue_timeout or 1
+                    )
+                self.waiting += 1
+                ADMISSION_QUEUE_DEPTH.set(self.waiting, endpoint=self.name)
+                try:
+                    deadline = time.monotonic() + self.queue_timeout
+                    while self.active >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            ADMISSION_REJECTIONS.inc(endpoint=self.name, reason='queue_timeout')
+                            raise AdmissionRejected(
+                                'Server is busy, please retry shortly', 503, self.queue_timeout or 1
+                            )
+                        self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+                    ADMISSION_QUEUE_DEPTH.set(self.waiting, endpoint=self.name)
+            self.active += 1
+            ADMISSION_ACTIVE.set(self.active, endpoint=self.name)
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, endpoint=self.name)
+        return self
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            ADMISSION_ACTIVE.set(self.active, endpoint=self.name)
+            self._condition.notify()
+
+
+class AdmissionController:
+    """Rate limits and concurrency caps for the endpoint groups named in ADMISSION_ENDPOINTS
+
+    Settings come from app config as <GROUP>_RATE_PER_MINUTE, <GROUP>_RATE_BURST,
+    <GROUP>_MAX_CONCURRENCY, <GROUP>_QUEUE_SIZE and <GROUP>_QUEUE_TIMEOUT_SECONDS;
+    a rate or concurrency of 0 turns that limit off.
+    """
+
+    def __init__(self, app, store, endpoints):
+        self.groups = {}
+        for endpoint, group in endpoints.items():
+            if group not in self.groups:
+                self.groups[group] = self._build(app.config, store, group)
+        self.endpoints = {endpoint: self.groups[group] for endpoint, group in endpoints.items()}
+
+    @staticmethod
+    def _build(config, store, group):
+        prefix = group.upper()
+        rate = config[f'{prefix}_RATE_PER_MINUTE']
+        concurrency = config[f'{prefix}_MAX_CONCURRENCY']
+        limiter = RateLimiter(store, group, rate, config[f'{prefix}_RATE_BURST']) if rate > 0 else None
+        slots = ConcurrencyLimiter(
+            group,
+            concurrency,
+            queue_size=config[f'{prefix}_QUEUE_SIZE'],
+            queue_timeout=config[f'{prefix}_QUEUE_TIMEOUT_SECONDS']
+        ) if concurrency > 0 else None
+        return group, limiter, slots
+
+    def admit(self, endpoint, client):
+        """Check endpoint's limits for client; returns the slot to release when done (or None)
+
+        Raises AdmissionRejected (429 over the client's rate, 503 at capacity).
+        """
+        if endpoint not in self.endpoints:
+            return None
+        group, limiter, slots = self.endpoints[endpoint]
+        if limiter is not None:
+            try:
+                retry_after = limiter.check(client)
+            except Exception as e:
+                # The shared store is unavailable: admit rather than fail every request
+                print(f"WARNING: Rate limit check for {group} failed, admitting: {str(e)}")
+                retry_after = 0
+            if retry_after:
+                ADMISSION_REJECTIONS.inc(endpoint=group, reason='rate_limited')
+                raise AdmissionRejected('Too many requests, please slow down', 429, retry_after)
+        return slots.acquire() if slots is not None else None
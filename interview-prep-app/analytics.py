@@ -0,0 +1,259 @@
+import hashlib
+import os
+import wave
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, AnswerMetric, QuestionMetric
+
+FILLER_WORDS = ('um', 'umm', 'uh', 'uhh', 'er', 'erm', 'ah', 'hmm', 'like', 'basically', 'actually', 'literally')
+FILLER_PHRASES = ('you know', 'i mean', 'kind of', 'sort of')
+
+# Words signalling each part of a STAR answer (keys follow AnswerMetric.STAR_COMPONENTS)
+STAR_KEYWORDS = {
+    'situation': ('situation', 'context', 'background', 'when', 'while', 'during', 'previously', 'originally'),
+    'task': ('task', 'goal', 'objective', 'responsible', 'responsibility', 'needed', 'required', 'challenge',
+             'problem', 'asked'),
+    'action': ('implemented', 'built', 'designed', 'decided', 'created', 'developed', 'wrote', 'led',
+               'refactored', 'investigated', 'introduced', 'migrated', 'profiled', 'automated'),
+    'result': ('result', 'resulted', 'outcome', 'improved', 'reduced', 'increased', 'decreased', 'saved',
+               'achieved', 'delivered', 'percent', 'faster', 'learned')
+}
+
+# Tokens are compared by a polynomial hash of their characters modulo 2**64; the
+# base is odd, so it has an inverse and any token's hash follows from prefix sums
+_HASH_BASE = 0x100000001b3
+_HASH_BASE_INVERSE = pow(_HASH_BASE, -1, 2 ** 64)
+
+
+def _word_hash(word):
+    return sum(ord(char) * pow(_HASH_BASE, i, 2 ** 64) for i, char in enumerate(word)) % 2 ** 64
+
+
+def compute_answer_metrics(answers, durations):
+    """Metrics for a batch of answer texts, computed over the whole batch at once
+
+    durations holds each answer's recording length in seconds (NaN without
+    one). Returns NumPy arrays aligned with answers: word_count, filler_count,
+    filler_rate, words_per_minute (NaN without a recording), star_components
+    (bitmask over AnswerMetric.STAR_COMPONENTS) and star_coverage.
+    """
+    import numpy as np  # imported on first use so startup stays lean
+
+    n = len(answers)
+
+    # One corpus for the batch as code points, answer i starting at offsets[i]
+    corpus = '\0'.join(answers)
+    lengths = np.fromiter(map(len, answers), dtype=np.int64, count=n)
+    offsets = np.cumsum(lengths + 1) - (lengths + 1)
+    codes = np.frombuffer(corpus.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+
+    # Words are runs of ASCII letters and digits, apostrophes and non-ASCII letters
+    upper = (codes >= 0x41) & (codes <= 0x5a)
+    is_word = (
+        upper | ((codes >= 0x61) & (codes <= 0x7a)) | ((codes >= 0x30) & (codes <= 0x39))
+        | (codes == 0x27) | (codes == 0x2019)
+        | ((codes >= 0xc0) & (codes <= 0x1fff)) | ((codes >= 0x2c00) & (codes <= 0xffff))
+    )
+    edges = np.diff(np.concatenate(([False], is_word, [False])).astype(np.int8))
+    word_starts = np.flatnonzero(edges == 1)
+    word_ends = np.flatnonzero(edges == -1)
+    word_answer = np.searchsorted(offsets, word_starts, side='right') - 1
+    word_count = np.bincount(word_answer, minlength=n)
+
+    # hash(word) = sum(code[start + i] * BASE**i), from prefix sums over the lower-cased corpus
+    codes = np.where(upper, codes + 32, codes).astype(np.uint64)
+    powers = np.full(len(codes) + 1, _HASH_BASE, dtype=np.uint64)
+    powers[0] = 1
+    np.cumprod(powers, out=powers)
+    inverse_powers = np.full(len(codes) + 1, _HASH_BASE_INVERSE, dtype=np.uint64)
+    inverse_powers[0] = 1
+    np.cumprod(inverse_powers, out=inverse_powers)
+    prefix = np.zeros(len(codes) + 1, dtype=np.uint64)
+    np.cumsum(codes * powers[:-1], out=prefix[1:])
+    hashes = (prefix[word_ends] - prefix[word_starts]) * inverse_powers[word_starts]
+
+    fillers = np.isin(hashes, [_word_hash(word) for word in FILLER_WORDS])
+    same_answer = word_answer[:-1] == word_answer[1:]
+    for phrase in FILLER_PHRASES:
+        first, second = map(_word_hash, phrase.split())
+        # Count the phrase on its first word
+        fillers[:-1] |= (hashes[:-1] == first) & (hashes[1:] == second) & same_answer
+    filler_count = np.bincount(word_answer[fillers], minlength=n)
+
+    # Look every word up in the sorted STAR vocabulary and OR its component bit into its answer
+    entries = sorted(
+        (_word_hash(word), bit)
+        for bit, name in enumerate(AnswerMetric.STAR_COMPONENTS) for word in STAR_KEYWORDS[name]
+    )
+    vocabulary = np.array([word for word, _ in entries], dtype=np.uint64)
+    component = np.array([bit for _, bit in entries], dtype=np.int64)
+    position = np.minimum(np.searchsorted(vocabulary, hashes), len(vocabulary) - 1)
+    matched = vocabulary[position] == hashes
+    star_components = np.zeros(n, dtype=np.int64)
+    np.bitwise_or.at(star_components, word_answer[matched], np.left_shift(1, component[position[matched]]))
+    parts = len(AnswerMetric.STAR_COMPONENTS)
+    star_coverage = ((star_components[:, None] >> np.arange(parts)) & 1).sum(axis=1) / parts
+
+    filler_rate = np.zeros(n)
+    np.divide(filler_count, word_count, out=filler_rate, where=word_count > 0)
+    minutes = np.asarray(durations, dtype=float) / 60
+    words_per_minute = np.full(n, np.nan)
+    np.divide(word_count, minutes, out=words_per_minute, where=minutes > 0)
+
+    return {
+        'word_count': word_count,
+        'filler_count': filler_count,
+        'filler_rate': filler_rate,
+        'words_per_minute': words_per_minute,
+        'star_components': star_components,
+        'star_coverage': star_coverage
+    }
+
+
+def recording_duration(audio_file):
+    """Length in seconds of a saved WAV recording, read from its header (NaN if there is none)"""
+    if not isinstance(audio_file, str) or not audio_file.endswith('.wav'):
+        return float('nan')
+    path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'audio', os.path.basename(audio_file))
+    try:
+        with wave.open(path, 'rb') as recording:
+            return recording.getnframes() / recording.getframerate()
+    except (OSError, EOFError, wave.Error):
+        return float('nan')
+
+
+def _rows(columns):
+    """Turn a dict of equal-length columns (lists or arrays) into executemany parameter rows"""
+    values = [column.tolist() if hasattr(column, 'tolist') else column for column in columns.values()]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+# Dialects with INSERT ... ON CONFLICT, which adds a batch's totals in one statement
+_UPSERT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def _add_question_totals(totals, rows):
+    """Add each row's totals to its question_metrics row, creating the rows of new questions
+
+    Other databases take a portable path: update the questions that exist, then
+    insert the rest. There, a new question first answered by two concurrent
+    submissions fails one of them on the unique key (its analytics are skipped).
+    """
+    table = QuestionMetric.__table__
+    insert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is not None:
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=['question_hash'],
+            set_=dict(
+                {name: table.c[name] + statement.excluded[name] for name in totals},
+                updated_at=statement.excluded.updated_at
+            )
+        )
+        db.session.execute(statement, rows)
+        return
+
+    existing = set(db.session.execute(
+        db.select(table.c.question_hash).where(table.c.question_hash.in_([row['question_hash'] for row in rows]))
+    ).scalars())
+    updates = [{f'new_{name}': value for name, value in row.items()} for row in rows if row['question_hash'] in existing]
+    if updates:
+        db.session.execute(
+            table.update()
+            .where(table.c.question_hash == db.bindparam('new_question_hash'))
+            .values(dict(
+                {name: table.c[name] + db.bindparam(f'new_{name}') for name in totals},
+                updated_at=db.bindparam('new_updated_at')
+            )),
+            updates
+        )
+    inserts = [row for row in rows if row['question_hash'] not in existing]
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+
+
+def analyze_responses(responses):
+    """Store per-answer metrics for these responses and add them to the per-question totals
+
+    Runs in the caller's transaction (commit afterwards). Analyzing a response
+    twice violates the answer_metrics unique constraint instead of double
+    counting it. Returns the number of answers analyzed.
+    """
+    import numpy as np
+
+    response_ids, answer_indexes, questions, answers, durations = [], [], [], [], []
+    for response in responses:
+        for index, item in enumerate(response.responses or []):
+            if not isinstance(item, dict):
+                continue
+            response_ids.append(response.id)
+            answer_indexes.append(index)
+            questions.append(str(item.get('question') or ''))
+            answers.append(str(item.get('answer') or ''))
+            durations.append(recording_duration(item.get('audio_file')))
+    if not answers:
+        return 0
+
+    metrics = compute_answer_metrics(answers, durations)
+    durations = np.asarray(durations, dtype=float)
+    timed = durations > 0
+
+    unique_questions, question_of = np.unique(np.asarray(questions, dtype=str), return_inverse=True)
+    question_hashes = np.array([hashlib.sha256(q.encode('utf-8')).hexdigest() for q in unique_questions.tolist()])
+
+    db.session.execute(db.insert(AnswerMetric), _rows({
+        'response_id': response_ids,
+        'answer_index': answer_indexes,
+        'question_hash': question_hashes[question_of],
+        'word_count': metrics['word_count'],
+        'filler_count': metrics['filler_count'],
+        'filler_rate': metrics['filler_rate'],
+        'duration_seconds': np.where(timed, durations, None),
+        'words_per_minute': np.where(timed, metrics['words_per_minute'], None),
+        'star_coverage': metrics['star_coverage'],
+        'star_components': metrics['star_components']
+    }))
+
+    # Sum this batch per question, then add the sums to the running totals in one upsert per question
+    groups = len(unique_questions)
+    totals = {
+        'answer_count': np.bincount(question_of, minlength=groups),
+        'total_words': np.bincount(question_of, weights=metrics['word_count'], minlength=groups).astype(int),
+        'total_fillers': np.bincount(question_of, weights=metrics['filler_count'], minlength=groups).astype(int),
+        'total_star_coverage': np.bincount(question_of, weights=metrics['star_coverage'], minlength=groups),
+        'timed_answer_count': np.bincount(question_of, weights=timed, minlength=groups).astype(int),
+        'timed_words': np.bincount(
+            question_of, weights=np.where(timed, metrics['word_count'], 0), minlength=groups
+        ).astype(int),
+        'timed_seconds': np.bincount(question_of, weights=np.where(timed, durations, 0), minlength=groups)
+    }
+    _add_question_totals(totals, _rows(dict(
+        totals,
+        question_hash=question_hashes,
+        question=unique_questions,
+        updated_at=[datetime.utcnow()] * groups
+    )))
+    return len(answers)
+
+
+def analytics_totals():
+    """Averages over every analyzed answer, read from the per-question totals"""
+    sums = db.session.query(
+        db.func.count(QuestionMetric.question_hash),
+        db.func.coalesce(db.func.sum(QuestionMetric.answer_count), 0),
+        db.func.coalesce(db.func.sum(QuestionMetric.total_words), 0),
+        db.func.coalesce(db.func.sum(QuestionMetric.total_fillers), 0),
+        db.func.coalesce(db.func.sum(QuestionMetric.total_star_coverage), 0),
+        db.func.coalesce(db.func.sum(QuestionMetric.timed_words), 0),
+        db.func.coalesce(db.func.sum(QuestionMetric.timed_seconds), 0)
+    ).one()
+    questions, answers, words, fillers, star_coverage, timed_words, timed_seconds = sums
+    return {
+        'questions': questions,
+        'answers': answers,
+        'avg_word_count': round(words / answers, 1) if answers else 0.0,
+        'filler_rate': round(fillers / words, 4) if words else 0.0,
+        'avg_star_coverage': round(star_coverage / answers, 4) if answers else 0.0,
+        'words_per_minute': round(timed_words / (timed_seconds / 60), 1) if timed_seconds else None
+    }
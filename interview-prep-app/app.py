@@ -1,131 +1,481 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Blueprint, current_app, render_template, request, jsonify, stream_with_context, g, send_from_directory, url_for
+import click
 from werkzeug.utils import secure_filename
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 from dotenv import load_dotenv
-import PyPDF2
-from models import db, Resume, Response
+from models import db, Resume, Response, UploadJob, AnswerMetric, QuestionMetric, Transcript
 from config import Config, allowed_file
+from question_cache import get_cached_questions, store_questions, cache_stats
+from jobs import JobQueue, JobQueueFull, set_job_status
+from pdf_extract import extract_pdf, extract_pdfs, extract_pdf_isolated
+from llm_client import GeminiClient, CircuitOpenError
+from shared_state import create_store, get_store
+from db_profiles import resolve_profile, engine_options, configure_engine
+from group_commit import GroupCommitWriter, insert_row
+from admission import AdmissionController, AdmissionRejected
+from static_assets import AssetManifest, IMMUTABLE_CACHE_CONTROL, build_assets
+from profiling import MODES as PROFILING_MODES, RequestProfiler, profile_trigger, token_matches, list_dumps, DUMP_NAME
+from resume_condense import condense_resume
+from local_questions import generate_local_questions
+from analytics import analyze_responses, analytics_totals
+from question_parser import parse_questions, parse_batch_questions, QuestionStreamParser
+from audio_relay import TranscriptionRelay, WavRecorder, SilenceGate, MIN_SAMPLE_RATE, MAX_SAMPLE_RATE
+from transcripts import TranscriptWriter, TranscriptSession
 from flask_sock import Sock
+import metrics
+from metrics import (
+    HTTP_REQUEST_SECONDS, PDF_EXTRACTION_SECONDS, PDF_PAGES, PDF_EXTRACTIONS,
+    QUESTION_GENERATION_SECONDS, QUESTIONS_GENERATED, QUESTION_FALLBACKS, QUESTION_WRITE_BACKS, RESUME_PROMPT_TOKENS,
+    TRANSCRIBE_ACTIVE_SOCKETS, PROFILED_REQUESTS
+)
 import json
 import base64
-import requests
-import websocket
+import hashlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from collections import OrderedDict
+import threading
+from datetime import datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import load_only, undefer
+import time
+import traceback
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config.from_object(Config)
-sock = Sock(app)
+# Routes live on a blueprint so create_app() can build the app; heavy dependencies
+# (PyPDF2, requests, alembic) are imported on first use rather than at startup
+bp = Blueprint('main', __name__, cli_group=None)
+sock = Sock()
 
-# Initialize database
-db.init_app(app)
+# Process-wide SQLAlchemy session listeners, registered once
+metrics.instrument_db_commits()
 
-# Create upload folder if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'audio'), exist_ok=True)
-os.makedirs('instance', exist_ok=True)
+# Project-focused questions used whenever AI generation is unavailable or fails
+FALLBACK_QUESTIONS = [
+    "Can you describe the most technically challenging project you've worked on? What made it challenging and how did you approach solving those challenges?",
+    "Tell me about a time when you had to learn a new technology or framework quickly for a project. How did you go about learning it?",
+    "Describe a specific bug or technical issue in one of your projects that took significant time to resolve. What was your debugging process?",
+    "Walk me through a project where you had to make important architectural or design decisions. What factors did you consider?"
+]
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text content from PDF file"""
+@bp.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+# Never profiled: the profile endpoints themselves, scrapes, static files and transcription sessions
+UNPROFILED_ENDPOINTS = {
+    'main.list_profiles', 'main.download_profile', 'main.get_metrics', 'static', 'main.serve_asset', 'main.transcribe'
+}
+
+@bp.before_app_request
+def start_request_profile():
+    """Profile this request when asked to (X-Profile header) or sampled; see profiling.py"""
+    trigger = profile_trigger(current_app.config, request.headers.get('X-Profile'))
+    if trigger is None or request.endpoint in UNPROFILED_ENDPOINTS:
+        return
+    profiler = RequestProfiler(
+        current_app.config['PROFILING_DIR'],
+        request.endpoint,
+        mode=current_app.config['PROFILING_MODE'],
+        sample_interval=current_app.config['PROFILING_SAMPLE_INTERVAL_MS'] / 1000
+    )
+    if profiler.start():
+        g.request_profiler = profiler
+        PROFILED_REQUESTS.inc(trigger=trigger)
+
+@bp.after_app_request
+def add_profile_header(response):
+    if 'request_profiler' in g:
+        response.headers['X-Profile-Id'] = g.request_profiler.id
+    return response
+
+@bp.teardown_app_request
+def finish_request_profile(exc):
+    # Streamed responses tear down once the stream ends, so the profile covers the whole body
+    profiler = g.pop('request_profiler', None)
+    if profiler is not None:
+        try:
+            profiler.finish(current_app.config['PROFILING_MAX_DUMPS'])
+        except Exception as e:
+            print(f"WARNING: Writing profile {profiler.id} failed: {str(e)}")
+
+@bp.before_app_request
+def resume_interrupted_jobs():
+    # Deferred from startup so CLI commands (and the import itself) never touch the job table
+    current_app.extensions['job_queue'].resume_unfinished_once()
+
+# Endpoints under admission control, by limit group (settings: <GROUP>_* in config.py)
+ADMISSION_ENDPOINTS = {
+    'main.upload_resume': 'upload',
+    'main.upload_resumes': 'upload',
+    'main.transcribe': 'transcribe'
+}
+
+@bp.before_request
+def admit_request():
+    """Apply the client's rate limit and the endpoint's concurrency cap before any work starts
+    
+    Runs before the WebSocket handshake too, so rejected transcription sessions get a plain HTTP error.
+    """
     try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+        g.admission_slot = current_app.extensions['admission'].admit(request.endpoint, request.remote_addr)
+    except AdmissionRejected as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = e.status
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+
+@bp.teardown_request
+def release_admission_slot(exc):
+    # Streamed responses tear down once the stream ends, so the slot covers the whole upload
+    slot = g.pop('admission_slot', None)
+    if slot is not None:
+        slot.release()
+
+@bp.after_app_request
+def record_request_metrics(response):
+    # The transcription socket reports its own metrics; its "request" lasts the whole session
+    if 'request_started' in g and request.endpoint != 'main.transcribe':
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_started,
+            method=request.method,
+            endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+            status=response.status_code
+        )
+    return response
+
+_gemini_client_lock = threading.Lock()
+
+def get_gemini_client():
+    """The app's shared Gemini client (pooled keep-alive connections, retries, circuit breaker)
+    
+    Created on first use so `requests` isn't imported until a question is generated.
+    """
+    client = current_app.extensions.get('gemini_client')
+    if client is None:
+        with _gemini_client_lock:
+            client = current_app.extensions.get('gemini_client')
+            if client is None:
+                client = current_app.extensions['gemini_client'] = GeminiClient.from_config(current_app.config, get_store())
+    return client
+
+def fallback_questions(reason, resume_text=None):
+    """Return questions built locally from the resume (or the static list), counting why"""
+    QUESTION_FALLBACKS.inc(reason=reason)
+    if resume_text:
+        QUESTIONS_GENERATED.inc(source='local')
+        return generate_local_questions(resume_text, fallbacks=FALLBACK_QUESTIONS)
+    QUESTIONS_GENERATED.inc(source='fallback')
+    return list(FALLBACK_QUESTIONS)
+
+def extract_text_from_pdf(source):
+    """Extract text content from a PDF path, bytes or upload stream"""
+    config = current_app.config
+    try:
+        with PDF_EXTRACTION_SECONDS.time():
+            if config['PDF_EXTRACT_IN_POOL']:
+                # Parse in the process pool so the web worker's event loop never runs PyPDF2
+                result = extract_pdf_isolated(
+                    source,
+                    max_pages=config['PDF_MAX_PAGES'],
+                    time_budget=config['PDF_TIME_BUDGET_SECONDS'],
+                    early_stop_chars=config['PDF_EARLY_STOP_CHARS'],
+                    workers=max(1, config['PDF_PARALLEL_WORKERS'])
+                )
+            else:
+                result = extract_pdf(
+                    source,
+                    max_pages=config['PDF_MAX_PAGES'],
+                    time_budget=config['PDF_TIME_BUDGET_SECONDS'],
+                    early_stop_chars=config['PDF_EARLY_STOP_CHARS'],
+                    parallel_workers=config['PDF_PARALLEL_WORKERS'],
+                    parallel_min_pages=config['PDF_PARALLEL_MIN_PAGES']
+                )
+        PDF_PAGES.observe(result.page_count)
+        PDF_EXTRACTIONS.inc(outcome='truncated' if result.truncated else 'complete')
+        if result.truncated:
+            print(f"PDF extraction stopped after {result.pages_read}/{result.page_count} pages")
+        return result.text
     except Exception as e:
+        PDF_EXTRACTIONS.inc(outcome='error')
         raise Exception(f"Error extracting text from PDF: {str(e)}")
 
+def extract_texts_from_pdfs(documents):
+    """Extract several PDFs (bytes) concurrently, returning text or an Exception for each"""
+    results = extract_pdfs(
+        documents,
+        max_pages=current_app.config['PDF_MAX_PAGES'],
+        time_budget=current_app.config['PDF_TIME_BUDGET_SECONDS'],
+        early_stop_chars=current_app.config['PDF_EARLY_STOP_CHARS'],
+        workers=current_app.config['PDF_PARALLEL_WORKERS'],
+        isolate=current_app.config['PDF_EXTRACT_IN_POOL']
+    )
+    texts = []
+    for result in results:
+        if isinstance(result, Exception):
+            PDF_EXTRACTIONS.inc(outcome='error')
+            texts.append(Exception(f"Error extracting text from PDF: {str(result)}"))
+            continue
+        PDF_PAGES.observe(result.page_count)
+        PDF_EXTRACTIONS.inc(outcome='truncated' if result.truncated else 'complete')
+        texts.append(result.text)
+    return texts
+
+def condensed_resume_text(resume_text):
+    """Pack the resume's most informative lines into RESUME_TOKEN_BUDGET tokens for the prompt"""
+    condensed = condense_resume(resume_text, current_app.config['RESUME_TOKEN_BUDGET'])
+    RESUME_PROMPT_TOKENS.observe(condensed.source_tokens, stage='source')
+    RESUME_PROMPT_TOKENS.observe(condensed.tokens, stage='condensed')
+    return condensed.text
+
+def build_question_prompt(resume_text):
+    """Build the Gemini prompt for a resume (bump PROMPT_VERSION when this changes)"""
+    return f"""Based on this resume, generate exactly 4 behavioral interview questions. Each question must reference a specific project or technology from the resume.
+
+Resume (condensed to its technologies and most relevant lines):
+{condensed_resume_text(resume_text)}
+
+Generate 4 numbered questions (1., 2., 3., 4.):"""
+
+QUESTION_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "maxOutputTokens": 4096,
+    "responseModalities": ["TEXT"]
+}
+
+def build_batch_question_prompt(resume_texts):
+    """Build one Gemini prompt covering several resumes (bump PROMPT_VERSION when this changes)"""
+    sections = '\n\n'.join(
+        f"Resume {index}:\n{condensed_resume_text(resume_text)}" for index, resume_text in enumerate(resume_texts)
+    )
+    return f"""Below are {len(resume_texts)} resumes, each labelled with its index. For each resume, generate exactly 4 behavioral interview questions. Each question must reference a specific project or technology from that resume.
+
+{sections}
+
+Return one entry per resume with its index and its 4 questions."""
+
+BATCH_QUESTION_GENERATION_CONFIG = dict(
+    QUESTION_GENERATION_CONFIG,
+    maxOutputTokens=8192,
+    responseMimeType="application/json",
+    responseSchema={
+        "type": "OBJECT",
+        "properties": {
+            "resumes": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "index": {"type": "INTEGER"},
+                        "questions": {"type": "ARRAY", "items": {"type": "STRING"}}
+                    },
+                    "required": ["index", "questions"]
+                }
+            }
+        },
+        "required": ["resumes"]
+    }
+)
+
+def request_batch_questions(client, prompt, count):
+    """Ask Gemini for the questions of every resume in a batch prompt in one call
+    
+    Returns (question lists, None), or (None, fallback reason) when the call failed.
+    """
+    try:
+        print(f"Generating questions for a batch of {count} resumes")
+        result = client.generate_content(prompt, BATCH_QUESTION_GENERATION_CONFIG)
+        parts = result.get('candidates', [{}])[0].get('content', {}).get('parts', [])
+        text = ''.join(part.get('text', '') for part in parts)
+        return parse_batch_questions(text, count), None
+    except CircuitOpenError:
+        print("WARNING: Gemini circuit breaker is open. Using fallback questions.")
+        return None, 'circuit_open'
+    except Exception as e:
+        print(f"ERROR generating batch questions: {str(e)}")
+        return None, 'error'
+
+def generate_batch_interview_questions(resume_texts):
+    """Generate questions for many resumes, packing cache misses several to a Gemini request"""
+    questions = [get_cached_questions(resume_text) for resume_text in resume_texts]
+    misses = [index for index, cached in enumerate(questions) if cached is None]
+    QUESTIONS_GENERATED.inc(len(resume_texts) - len(misses), source='cache')
+    if not misses:
+        return questions
+    
+    if not current_app.config['GEMINI_API_KEY'] or current_app.config['GEMINI_API_KEY'].strip() == '':
+        print("WARNING: GEMINI_API_KEY is not configured. Using fallback questions.")
+        for index in misses:
+            questions[index] = fallback_questions('no_api_key', resume_texts[index])
+        return questions
+    
+    per_prompt = max(1, current_app.config['BATCH_RESUMES_PER_PROMPT'])
+    groups = [misses[start:start + per_prompt] for start in range(0, len(misses), per_prompt)]
+    # Prompts are built here (they need the app config); the calls go out in parallel
+    # and the Gemini client caps how many are in flight
+    prompts = [build_batch_question_prompt([resume_texts[i] for i in group]) for group in groups]
+    client = get_gemini_client()
+    with ThreadPoolExecutor(max_workers=min(len(groups), current_app.config['GEMINI_MAX_CONCURRENCY'])) as pool:
+        answers = list(pool.map(
+            request_batch_questions, [client] * len(groups), prompts, [len(group) for group in groups]
+        ))
+    
+    for group, (generated, failure) in zip(groups, answers):
+        for position, index in enumerate(group):
+            if generated is None:
+                questions[index] = fallback_questions(failure, resume_texts[index])
+            elif len(generated[position]) >= 2:
+                questions[index] = generated[position][:4]
+                store_questions(resume_texts[index], questions[index])
+                QUESTIONS_GENERATED.inc(source='gemini')
+            else:
+                # The batch answer skipped this resume; ask for it on its own
+                questions[index] = generate_interview_questions(resume_texts[index])
+    return questions
+
+# Late Gemini answers for resumes that were given local questions, keyed by a
+# hash of the resume text (oldest dropped first); see write_back_late_questions
+late_questions = OrderedDict()
+late_questions_lock = threading.Lock()
+LATE_QUESTIONS_LIMIT = 256
+
+@QUESTION_GENERATION_SECONDS.time()
 def generate_interview_questions(resume_text):
     """Generate behavioral interview questions using Google Gemini"""
     
     print(f"=== generate_interview_questions called ===")
-    print(f"API Key from config: '{app.config.get('GEMINI_API_KEY')}'")
-    print(f"API Key exists: {bool(app.config.get('GEMINI_API_KEY'))}")
+    print(f"API Key from config: '{current_app.config.get('GEMINI_API_KEY')}'")
+    print(f"API Key exists: {bool(current_app.config.get('GEMINI_API_KEY'))}")
+    
+    # Serve repeat uploads of the same resume without calling Gemini
+    cached_questions = get_cached_questions(resume_text)
+    if cached_questions is not None:
+        print(f"Question cache hit ({len(cached_questions)} questions)")
+        QUESTIONS_GENERATED.inc(source='cache')
+        return cached_questions
     
     # Check if API key is configured
-    if not app.config['GEMINI_API_KEY'] or app.config['GEMINI_API_KEY'].strip() == '':
-        print("WARNING: GEMINI_API_KEY is not configured. Using fallback questions.")
+    if not current_app.config['GEMINI_API_KEY'] or current_app.config['GEMINI_API_KEY'].strip() == '':
+        print("WARNING: GEMINI_API_KEY is not configured. Using local questions.")
         print("Please add your API key to the .env file")
-        return [
-            "Can you describe the most technically challenging project you've worked on? What made it challenging and how did you approach solving those challenges?",
-            "Tell me about a time when you had to learn a new technology or framework quickly for a project. How did you go about learning it?",
-            "Describe a specific bug or technical issue in one of your projects that took significant time to resolve. What was your debugging process?",
-            "Walk me through a project where you had to make important architectural or design decisions. What factors did you consider?"
-        ]
+        return fallback_questions('no_api_key', resume_text)
+    
+    print(f"API Key configured: {current_app.config['GEMINI_API_KEY'][:10]}...")
+    
+    deadline = current_app.config['QUESTION_DEADLINE_SECONDS']
+    if deadline > 0:
+        return generate_hedged_questions(resume_text, deadline)
     
-    print(f"API Key configured: {app.config['GEMINI_API_KEY'][:10]}...")
+    questions, failure = request_gemini_questions(resume_text)
+    if questions is None:
+        return fallback_questions(failure, resume_text)
+    QUESTIONS_GENERATED.inc(source='gemini')
+    return questions
+
+def generate_hedged_questions(resume_text, deadline):
+    """Race Gemini against the local generator; after `deadline` seconds answer with local questions
+    
+    The Gemini call keeps running after the deadline so its answer still reaches
+    the question cache, and with QUESTION_WRITE_BACK it is parked for
+    write_back_late_questions to store on the resume.
+    """
+    started = time.monotonic()
+    future = current_app.extensions['question_executor'].submit(
+        request_gemini_questions_in_app_context, current_app._get_current_object(), resume_text
+    )
+    local_questions = generate_local_questions(resume_text, fallbacks=FALLBACK_QUESTIONS)
     
     try:
-        print(f"Generating questions for resume (length: {len(resume_text)} chars)")
-        
-        prompt = f"""Based on this resume, generate exactly 4 behavioral interview questions. Each question must reference a specific project or technology from the resume.
+        questions, failure = future.result(timeout=max(0, deadline - (time.monotonic() - started)))
+    except FuturesTimeoutError:
+        print(f"WARNING: Gemini missed the {deadline}s question deadline. Using local questions.")
+        QUESTION_FALLBACKS.inc(reason='deadline')
+        QUESTIONS_GENERATED.inc(source='local')
+        if current_app.config['QUESTION_WRITE_BACK']:
+            with late_questions_lock:
+                late_questions[hashlib.sha256(resume_text.encode('utf-8')).hexdigest()] = (future, local_questions)
+                while len(late_questions) > LATE_QUESTIONS_LIMIT:
+                    late_questions.popitem(last=False)
+        return local_questions
+    
+    if questions is None:
+        return fallback_questions(failure, resume_text)
+    QUESTIONS_GENERATED.inc(source='gemini')
+    return questions
 
-Resume:
-{resume_text[:2000]}
+def request_gemini_questions_in_app_context(app, resume_text):
+    """Run request_gemini_questions on an executor thread"""
+    with app.app_context():
+        return request_gemini_questions(resume_text)
 
-Generate 4 numbered questions (1., 2., 3., 4.):"""
+def write_back_late_questions(resume_id, resume_text):
+    """Replace a stored resume's local questions with Gemini's once its late answer arrives
+    
+    Only applies when generate_hedged_questions parked an answer for this resume
+    text. Questions that changed in the meantime are left alone.
+    """
+    key = hashlib.sha256(resume_text.encode('utf-8')).hexdigest()
+    with late_questions_lock:
+        pending = late_questions.get(key)
+    if pending is None:
+        return
+    future, local_questions = pending
+    app = current_app._get_current_object()
+    
+    def apply(done):
+        try:
+            questions, failure = done.result()
+            if questions is None:
+                print(f"Late Gemini answer for resume {resume_id} failed ({failure}); keeping local questions")
+                QUESTION_WRITE_BACKS.inc(outcome='failed')
+                return
+            with app.app_context():
+                resume = db.session.get(Resume, resume_id)
+                if resume is None or resume.questions != local_questions:
+                    QUESTION_WRITE_BACKS.inc(outcome='skipped')
+                    return
+                resume.questions = questions
+                db.session.commit()
+            print(f"Wrote late Gemini questions back to resume {resume_id}")
+            QUESTION_WRITE_BACKS.inc(outcome='written')
+        except Exception as e:
+            print(f"ERROR writing back late questions for resume {resume_id}: {str(e)}")
+            QUESTION_WRITE_BACKS.inc(outcome='failed')
+        finally:
+            # The answer has been used (or can't be); drop it unless a newer one took its place
+            with late_questions_lock:
+                if late_questions.get(key) is pending:
+                    del late_questions[key]
+    
+    # Runs right away if the answer is already in, otherwise on the executor thread
+    future.add_done_callback(apply)
 
-        print("Calling Gemini API via REST...")
-        
-        # Use REST API instead of SDK to avoid version issues
-        import requests
-        import json
-        
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={app.config['GEMINI_API_KEY']}"
-        
-        headers = {
-            'Content-Type': 'application/json'
-        }
-        
-        data = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": 0.7,
-                "maxOutputTokens": 4096,
-                "responseModalities": ["TEXT"]
-            }
-        }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        
-        # Log the response for debugging
-        if response.status_code != 200:
-            print(f"API Error Response: {response.text}")
+def request_gemini_questions(resume_text):
+    """Ask Gemini for questions; returns (questions, None) or (None, fallback reason)"""
+    try:
+        print(f"Generating questions for resume (length: {len(resume_text)} chars)")
         
-        response.raise_for_status()
+        prompt = build_question_prompt(resume_text)
+
+        print("Calling Gemini API via REST...")
         
-        result = response.json()
+        result = get_gemini_client().generate_content(prompt, QUESTION_GENERATION_CONFIG)
         print(f"API Response: {result}")
         
         # Check if content was blocked
         if 'candidates' not in result or len(result['candidates']) == 0:
             print("WARNING: No candidates in API response. Content may have been blocked.")
-            return [
-                "Can you describe the most technically challenging project you've worked on? What made it challenging and how did you approach solving those challenges?",
-                "Tell me about a time when you had to learn a new technology or framework quickly for a project. How did you go about learning it?",
-                "Describe a specific bug or technical issue in one of your projects that took significant time to resolve. What was your debugging process?",
-                "Walk me through a project where you had to make important architectural or design decisions. What factors did you consider?"
-            ]
+            return None, 'blocked'
         
         candidate = result['candidates'][0]
         
         # Check if content exists
         if 'content' not in candidate:
-            print("WARNING: No content in candidate. Using fallback questions.")
-            return [
-                "Can you describe the most technically challenging project you've worked on? What made it challenging and how did you approach solving those challenges?",
-                "Tell me about a time when you had to learn a new technology or framework quickly for a project. How did you go about learning it?",
-                "Describe a specific bug or technical issue in one of your projects that took significant time to resolve. What was your debugging process?",
-                "Walk me through a project where you had to make important architectural or design decisions. What factors did you consider?"
-            ]
+            print("WARNING: No content in candidate. Using local questions.")
+            return None, 'empty_response'
         
         # Extract text from parts
         if 'parts' in candidate['content'] and len(candidate['content']['parts']) > 0:
@@ -133,70 +483,156 @@ Generate 4 numbered questions (1., 2., 3., 4.):"""
         elif 'text' in candidate['content']:
             response_text = candidate['content']['text']
         else:
-            print("WARNING: Could not extract text from response. Using fallback questions.")
-            return [
-                "Can you describe the most technically challenging project you've worked on? What made it challenging and how did you approach solving those challenges?",
-                "Tell me about a time when you had to learn a new technology or framework quickly for a project. How did you go about learning it?",
-                "Describe a specific bug or technical issue in one of your projects that took significant time to resolve. What was your debugging process?",
-                "Walk me through a project where you had to make important architectural or design decisions. What factors did you consider?"
-            ]
+            print("WARNING: Could not extract text from response. Using local questions.")
+            return None, 'empty_response'
         
         print(f"Gemini API response received (length: {len(response_text)} chars)")
         print(f"Response preview: {response_text[:200]}...")
         
         # Parse the response to extract questions
-        questions_text = response_text.strip()
-        questions = []
-        
-        # Split by newlines and filter for numbered questions
-        lines = questions_text.split('\n')
-        for line in lines:
-            line = line.strip()
-            # Check if line starts with a number followed by a period or parenthesis
-            if line and (line[0].isdigit() or line.startswith('**')):
-                # Remove numbering and clean up
-                question = line
-                # Remove common numbering patterns
-                for i in range(1, 20):
-                    question = question.replace(f"{i}.", "", 1).replace(f"{i})", "", 1).replace(f"**{i}.**", "", 1).replace(f"**{i})", "", 1)
-                question = question.strip().replace("**", "")
-                if question and len(question) > 20:  # Ensure it's a real question
-                    questions.append(question)
+        questions = parse_questions(response_text.strip())
         
         print(f"Parsed {len(questions)} questions from AI response")
         
         # Ensure we have at least some questions
         if len(questions) < 2:
-            print("WARNING: AI generated fewer than 2 questions. Using fallback questions.")
-            # If AI generation mostly failed, create project-focused fallback questions
-            return [
-                "Can you describe the most technically challenging project you've worked on? What made it challenging and how did you approach solving those challenges?",
-                "Tell me about a time when you had to learn a new technology or framework quickly for a project. How did you go about learning it?",
-                "Describe a specific bug or technical issue in one of your projects that took significant time to resolve. What was your debugging process?",
-                "Walk me through a project where you had to make important architectural or design decisions. What factors did you consider?"
-            ]
+            print("WARNING: AI generated fewer than 2 questions. Using local questions.")
+            return None, 'too_few_questions'
         
         print(f"Successfully generated {len(questions[:4])} project-specific questions")
-        return questions[:4]  # Return up to 4 questions
+        store_questions(resume_text, questions[:4])
+        return questions[:4], None  # Return up to 4 questions
         
+    except CircuitOpenError:
+        print("WARNING: Gemini circuit breaker is open. Using local questions.")
+        return None, 'circuit_open'
     except Exception as e:
         print(f"ERROR generating questions: {str(e)}")
-        import traceback
         traceback.print_exc()
         # Return project-focused fallback questions if AI generation fails
-        return [
-            "Can you describe the most technically challenging project you've worked on? What made it challenging and how did you approach solving those challenges?",
-            "Tell me about a time when you had to learn a new technology or framework quickly for a project. How did you go about learning it?",
-            "Describe a specific bug or technical issue in one of your projects that took significant time to resolve. What was your debugging process?",
-            "Walk me through a project where you had to make important architectural or design decisions. What factors did you consider?"
-        ]
+        return None, 'error'
 
-@app.route('/')
+def stream_interview_questions(resume_text):
+    """Yield interview questions one at a time as Gemini streams them"""
+    cached_questions = get_cached_questions(resume_text)
+    if cached_questions is not None:
+        print(f"Question cache hit ({len(cached_questions)} questions)")
+        QUESTIONS_GENERATED.inc(source='cache')
+        yield from cached_questions
+        return
+    
+    questions = []
+    fallback_reason = 'too_few_questions'
+    if not current_app.config['GEMINI_API_KEY'] or current_app.config['GEMINI_API_KEY'].strip() == '':
+        print("WARNING: GEMINI_API_KEY is not configured. Using local questions.")
+        fallback_reason = 'no_api_key'
+    else:
+        try:
+            print(f"Streaming questions for resume (length: {len(resume_text)} chars)")
+            parser = QuestionStreamParser()
+            stream = get_gemini_client().stream_generate_content(build_question_prompt(resume_text), QUESTION_GENERATION_CONFIG)
+            try:
+                for fragment in stream:
+                    for question in parser.feed(fragment):
+                        if len(questions) < 4:
+                            questions.append(question)
+                            yield question
+                    if len(questions) >= 4:
+                        break
+                else:
+                    for question in parser.close()[:4 - len(questions)]:
+                        questions.append(question)
+                        yield question
+            finally:
+                stream.close()
+        except CircuitOpenError:
+            print("WARNING: Gemini circuit breaker is open. Using fallback questions.")
+            fallback_reason = 'circuit_open'
+        except Exception as e:
+            print(f"ERROR streaming questions: {str(e)}")
+            fallback_reason = 'error'
+            traceback.print_exc()
+    
+    if len(questions) >= 2:
+        print(f"Successfully streamed {len(questions)} project-specific questions")
+        store_questions(resume_text, questions)
+        QUESTIONS_GENERATED.inc(source='gemini')
+        return
+    
+    # Questions already shown stay on screen; top up with local questions
+    print("WARNING: AI streamed fewer than 2 questions. Adding local questions.")
+    local_questions = [q for q in fallback_questions(fallback_reason, resume_text) if q not in questions]
+    for question in local_questions[:4 - len(questions)]:
+        yield question
+
+def sse_event(event, payload):
+    """Format a server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def save_resume(filename, resume_text, questions):
+    """Insert a resume (in a group commit when GROUP_COMMIT_ENABLED) and return its id"""
+    return insert_row(lambda: Resume(filename=filename, content=resume_text, questions=questions))
+
+def stream_upload_response(filename, resume_text):
+    """Push each question to the browser as soon as it is complete, then store the resume"""
+    def generate():
+        questions = []
+        try:
+            for question in stream_interview_questions(resume_text):
+                questions.append(question)
+                yield sse_event('question', {'index': len(questions) - 1, 'question': question})
+            
+            resume_id = save_resume(filename, resume_text, questions)
+            
+            yield sse_event('done', {'resume_id': resume_id, 'questions': questions})
+        except Exception as e:
+            print(f"ERROR in streamed upload: {str(e)}")
+            db.session.rollback()
+            yield sse_event('error', {'error': f'An error occurred: {str(e)}'})
+    
+    return current_app.response_class(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@bp.route('/')
 def index():
     """Render main application page"""
     return render_template('index.html')
 
-@app.route('/api/upload-resume', methods=['POST'])
+@bp.app_template_global()
+def asset_url(filename):
+    """URL of a static file: its fingerprinted /assets/ copy, or /static/ with the pipeline off, in debug mode or unbuilt"""
+    manifest = current_app.extensions.get('asset_manifest')
+    if manifest is not None and not current_app.debug:
+        name = manifest.name_for(filename)
+        if name is not None:
+            return url_for('main.serve_asset', name=name)
+    return url_for('static', filename=filename)
+
+@bp.route('/assets/<path:name>', methods=['GET'])
+def serve_asset(name):
+    """Serve a prebuilt fingerprinted static file, precompressed, cacheable for a year"""
+    manifest = current_app.extensions.get('asset_manifest')
+    asset = manifest.get(name) if manifest is not None else None
+    if asset is None:
+        return jsonify({'error': 'Asset not found'}), 404
+    encoding = asset.negotiate(request.accept_encodings)
+    response = send_from_directory(
+        manifest.build_dir,
+        asset.path(encoding),
+        mimetype=asset.mimetype,
+        etag=f"{asset.etag}-{encoding}"
+    )
+    del response.headers['Content-Disposition']  # names the variant file, e.g. app.<hash>.js.br
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+@bp.route('/api/upload-resume', methods=['POST'])
 def upload_resume():
     """Handle resume upload and generate questions"""
     try:
@@ -214,51 +650,228 @@ def upload_resume():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Only PDF files are allowed'}), 400
         
-        # Save file
+        # Job mode: store the upload in the database and let whichever worker claims it process it
+        if request.args.get('mode') == 'async':
+            filename = secure_filename(file.filename)
+            try:
+                job = current_app.extensions['job_queue'].create(filename, file.read())
+            except JobQueueFull as e:
+                return jsonify({'error': str(e)}), 503
+            
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': f"/api/jobs/{job.id}",
+                'events_url': f"/api/jobs/{job.id}/events"
+            }), 202, {'Location': f"/api/jobs/{job.id}"}
+        
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
         
-        # Extract text from PDF
+        # Extract text straight from the upload stream (no copy to UPLOAD_FOLDER)
         try:
-            resume_text = extract_text_from_pdf(filepath)
+            resume_text = extract_text_from_pdf(file.stream)
         except Exception as e:
-            os.remove(filepath)  # Clean up file
             return jsonify({'error': f'Failed to extract text from PDF: {str(e)}'}), 400
         
+        # Streaming mode: send questions as server-sent events while Gemini generates them
+        if request.args.get('mode') == 'stream':
+            return stream_upload_response(filename, resume_text)
+        
         # Generate interview questions
         questions = generate_interview_questions(resume_text)
         
         # Save to database
-        resume = Resume(
-            filename=filename,
-            content=resume_text,
-            questions=questions
-        )
-        db.session.add(resume)
-        db.session.commit()
-        
-        # Clean up uploaded file (optional - keep if you want to store PDFs)
-        os.remove(filepath)
+        resume_id = save_resume(filename, resume_text, questions)
+        write_back_late_questions(resume_id, resume_text)
         
         return jsonify({
             'success': True,
-            'resume_id': resume.id,
+            'resume_id': resume_id,
             'questions': questions,
             'message': 'Resume processed successfully!'
         }), 200
         
     except Exception as e:
         print(f"ERROR in upload_resume: {str(e)}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
-@app.route('/api/get-questions/<int:resume_id>', methods=['GET'])
+def read_batch_archive(stream):
+    """Read the entries of an uploaded zip as (filename, data, error) items"""
+    try:
+        with zipfile.ZipFile(stream) as archive:
+            entries = [
+                info for info in archive.infolist()
+                if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+            ]
+            if len(entries) > current_app.config['BATCH_MAX_FILES']:
+                raise ValueError(f"Archive holds more than {current_app.config['BATCH_MAX_FILES']} files")
+            if sum(info.file_size for info in entries) > current_app.config['BATCH_MAX_UNCOMPRESSED_BYTES']:
+                raise ValueError('Archive is too large once uncompressed')
+            
+            items = []
+            for info in entries:
+                filename = secure_filename(os.path.basename(info.filename))
+                if not allowed_file(filename):
+                    items.append((filename or info.filename, None, 'Only PDF files are allowed'))
+                else:
+                    items.append((filename, archive.read(info), None))
+            return items
+    except zipfile.BadZipFile:
+        raise ValueError('Invalid zip archive')
+
+@bp.route('/api/upload-resumes', methods=['POST'])
+def upload_resumes():
+    """Ingest a batch of resumes (`resumes` PDF files and/or an `archive` zip) in one request"""
+    try:
+        items = []
+        for file in request.files.getlist('resumes'):
+            if not allowed_file(file.filename):
+                items.append((file.filename, None, 'Only PDF files are allowed'))
+            else:
+                items.append((secure_filename(file.filename), file.read(), None))
+        if 'archive' in request.files:
+            try:
+                items.extend(read_batch_archive(request.files['archive'].stream))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        if not items:
+            return jsonify({'error': 'No files provided'}), 400
+        if len(items) > current_app.config['BATCH_MAX_FILES']:
+            return jsonify({'error': f"At most {current_app.config['BATCH_MAX_FILES']} resumes per batch"}), 400
+        
+        results = [{'index': index, 'filename': filename} for index, (filename, _, _) in enumerate(items)]
+        for result, (_, _, error) in zip(results, items):
+            if error:
+                result.update(success=False, error=error)
+        
+        # Extract every PDF concurrently, then generate questions for the readable ones
+        valid = [index for index, (_, _, error) in enumerate(items) if not error]
+        texts = extract_texts_from_pdfs([items[index][1] for index in valid])
+        extracted = []
+        for index, text in zip(valid, texts):
+            if isinstance(text, Exception):
+                results[index].update(success=False, error=f'Failed to extract text from PDF: {str(text)}')
+            else:
+                extracted.append((index, text))
+        
+        questions = generate_batch_interview_questions([text for _, text in extracted])
+        
+        # One flush and one transaction for the whole batch (batched INSERT ... RETURNING on PostgreSQL)
+        resumes = [
+            Resume(filename=items[index][0], content=text, questions=resume_questions)
+            for (index, text), resume_questions in zip(extracted, questions)
+        ]
+        db.session.add_all(resumes)
+        db.session.flush()
+        resume_ids = [resume.id for resume in resumes]  # read before commit expires the rows
+        db.session.commit()
+        
+        for (index, text), resume_id, resume_questions in zip(extracted, resume_ids, questions):
+            write_back_late_questions(resume_id, text)
+            results[index].update(success=True, resume_id=resume_id, questions=resume_questions)
+        
+        succeeded = len(resumes)
+        return jsonify({
+            'success': succeeded > 0,
+            'results': results,
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'message': f'Processed {succeeded} of {len(results)} resumes'
+        }), 200
+        
+    except Exception as e:
+        print(f"ERROR in upload_resumes: {str(e)}")
+        traceback.print_exc()
+        db.session.rollback()
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+def process_upload_job(job):
+    """Run extraction, question generation and storage for a queued upload job"""
+    set_job_status(job, UploadJob.STATUS_EXTRACTING)
+    try:
+        resume_text = extract_text_from_pdf(job.file_data if job.file_data is not None else job.file_path)
+    except Exception as e:
+        raise Exception(f'Failed to extract text from PDF: {str(e)}')
+    
+    set_job_status(job, UploadJob.STATUS_GENERATING)
+    questions = generate_interview_questions(resume_text)
+    
+    set_job_status(job, UploadJob.STATUS_SAVING)
+    resume_id = save_resume(job.filename, resume_text, questions)
+    write_back_late_questions(resume_id, resume_text)
+    return resume_id
+
+def job_payload(job):
+    """Serialize a job, including its questions once it has completed"""
+    payload = job.to_dict()
+    if job.status == UploadJob.STATUS_COMPLETED and job.resume_id:
+        resume = db.session.get(Resume, job.resume_id)
+        payload['questions'] = resume.questions if resume else []
+    return payload
+
+@bp.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report the current stage of an upload job"""
+    try:
+        job = db.session.get(UploadJob, job_id)
+        
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job_payload(job)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@bp.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Stream upload job stage changes as server-sent events"""
+    if not db.session.get(UploadJob, job_id):
+        return jsonify({'error': 'Job not found'}), 404
+    db.session.close()
+    
+    poll_interval = current_app.config['JOB_EVENTS_POLL_INTERVAL']
+    timeout = current_app.config['JOB_EVENTS_TIMEOUT']
+    
+    def generate():
+        last_status = None
+        deadline = time.time() + timeout
+        while True:
+            job = db.session.get(UploadJob, job_id)
+            payload = job_payload(job)
+            # Release the read transaction so workers can keep committing
+            db.session.close()
+            
+            if payload['status'] != last_status:
+                last_status = payload['status']
+                yield sse_event('status', payload)
+            else:
+                yield ": keepalive\n\n"
+            
+            if payload['status'] in UploadJob.FINISHED_STATUSES:
+                return
+            if time.time() > deadline:
+                yield sse_event('timeout', payload)
+                return
+            time.sleep(poll_interval)
+    
+    return current_app.response_class(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@bp.route('/api/get-questions/<int:resume_id>', methods=['GET'])
 def get_questions(resume_id):
     """Retrieve questions for a specific resume"""
     try:
-        resume = Resume.query.get(resume_id)
+        resume = Resume.query.options(undefer(Resume.content)).get(resume_id)
         
         if not resume:
             return jsonify({'error': 'Resume not found'}), 404
@@ -271,19 +884,147 @@ def get_questions(resume_id):
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
-@app.route('/api/resumes', methods=['GET'])
+def encode_resume_cursor(resume):
+    """Opaque keyset cursor pointing just after this resume"""
+    raw = f"{resume.upload_date.isoformat()}|{resume.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_resume_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    upload_date, resume_id = raw.split('|', 1)
+    return datetime.fromisoformat(upload_date), int(resume_id)
+
+@bp.route('/api/resumes', methods=['GET'])
 def get_all_resumes():
-    """Get all uploaded resumes"""
+    """Get uploaded resumes, newest first, one keyset-paginated page at a time"""
+    try:
+        limit = request.args.get('limit', current_app.config['RESUMES_PAGE_SIZE'], type=int)
+        limit = max(1, min(limit, current_app.config['RESUMES_MAX_PAGE_SIZE']))
+        
+        # Projection: content is only loaded when explicitly requested
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or list(Resume.LIST_FIELDS)
+        unknown = [f for f in fields if f not in Resume.FIELDS]
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+        columns = {'id', 'upload_date'} | set(fields)
+        
+        query = Resume.query.options(load_only(*[getattr(Resume, c) for c in columns]))
+        
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                upload_date, resume_id = decode_resume_cursor(cursor)
+            except (ValueError, UnicodeDecodeError):
+                return jsonify({'error': 'Invalid cursor'}), 400
+            query = query.filter(or_(
+                Resume.upload_date < upload_date,
+                and_(Resume.upload_date == upload_date, Resume.id < resume_id)
+            ))
+        
+        resumes = query.order_by(Resume.upload_date.desc(), Resume.id.desc()).limit(limit + 1).all()
+        has_more = len(resumes) > limit
+        resumes = resumes[:limit]
+        
+        response = jsonify({
+            'success': True,
+            'resumes': [resume.to_dict(fields) for resume in resumes],
+            'has_more': has_more,
+            'next_cursor': encode_resume_cursor(resumes[-1]) if has_more else None
+        })
+        
+        # Conditional GET: unchanged pages revalidate with a 304 and no body
+        response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+        if resumes:
+            response.last_modified = max(resume.upload_date for resume in resumes)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@bp.route('/api/question-cache/stats', methods=['GET'])
+def get_question_cache_stats():
+    """Report question cache hit/miss counters"""
     try:
-        resumes = Resume.query.order_by(Resume.upload_date.desc()).all()
         return jsonify({
             'success': True,
-            'resumes': [resume.to_dict() for resume in resumes]
+            'cache': cache_stats()
         }), 200
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
-@app.route('/api/submit-responses', methods=['POST'])
+@bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Expose in-process counters and histograms in the Prometheus text format"""
+    return current_app.response_class(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+def profiling_authorized():
+    # Without a configured token the profile endpoints don't exist
+    return token_matches(current_app.config, request.headers.get('X-Profile') or request.args.get('token'))
+
+@bp.route('/api/profiles', methods=['GET'])
+def list_profiles():
+    """List the request profiles kept in PROFILING_DIR, newest first"""
+    if not profiling_authorized():
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify({'success': True, 'profiles': list_dumps(current_app.config['PROFILING_DIR'])}), 200
+
+@bp.route('/api/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    """Download one profile: .pstats for pstats/snakeviz, .collapsed for flamegraph.pl/speedscope"""
+    if not profiling_authorized():
+        return jsonify({'error': 'Not found'}), 404
+    if not DUMP_NAME.match(name) or not os.path.exists(os.path.join(current_app.config['PROFILING_DIR'], name)):
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_from_directory(current_app.config['PROFILING_DIR'], name, as_attachment=True)
+
+def record_response_analytics(responses):
+    """Add flushed responses to the answer analytics in a savepoint (never fails the submission)
+    
+    The caller's commit writes the responses and their metrics in one transaction;
+    a group commit analyzes all of its responses in one pass.
+    """
+    try:
+        with db.session.begin_nested():
+            analyze_responses(responses)
+    except Exception as e:
+        ids = ', '.join(str(response.id) for response in responses)
+        print(f"WARNING: Analytics for responses {ids} failed, `flask analyze-responses` will retry: {str(e)}")
+
+def resolve_transcripts(items, resume_id):
+    """Fill in answers given by transcript_id from the stored transcripts
+    
+    A transcript's text replaces the client's answer only once its session has
+    finished and it is at least as long: the row may lag behind what the user
+    saw (segments batched in another worker, a stop that timed out). Items
+    without an answer need a finished transcript. Returns (items, error, status).
+    """
+    transcript_ids = {item['transcript_id'] for item in items if isinstance(item, dict) and item.get('transcript_id')}
+    if not transcript_ids:
+        return items, None, None
+    # Sessions still open in this process may have segments waiting for the next batch
+    current_app.extensions['transcript_writer'].flush()
+    transcripts = {t.id: t for t in Transcript.query.filter(Transcript.id.in_(transcript_ids))}
+    for transcript_id in transcript_ids:
+        transcript = transcripts.get(transcript_id)
+        if transcript is None or transcript.resume_id not in (None, resume_id):
+            return items, f'Transcript {transcript_id} not found', 400
+    
+    resolved = []
+    for item in items:
+        if isinstance(item, dict) and item.get('transcript_id'):
+            transcript = transcripts[item['transcript_id']]
+            item = dict(item)
+            answer = (item.get('answer') or '').strip()
+            if transcript.completed_at is not None and len(transcript.text) >= len(answer):
+                item['answer'] = transcript.text
+            elif not answer:
+                return items, f'Transcript {transcript.id} is still being recorded, retry shortly', 409
+            if not item.get('audio_file') and transcript.audio_file:
+                item['audio_file'] = transcript.audio_file
+        resolved.append(item)
+    return resolved, None, None
+
+@bp.route('/api/submit-responses', methods=['POST'])
 def submit_responses():
     """Submit user responses to interview questions"""
     try:
@@ -301,26 +1042,104 @@ def submit_responses():
         if not resume:
             return jsonify({'error': 'Resume not found'}), 404
         
-        # Create response record
-        response = Response(
-            resume_filename=resume.filename,
-            resume_upload_time=resume.upload_date,
-            responses=data['responses']
-        )
+        # Answers recorded through /ws/transcribe may reference the server-side transcript
+        responses, error, status = resolve_transcripts(data['responses'], resume.id)
+        if error:
+            return jsonify({'error': error}), status
         
-        db.session.add(response)
-        db.session.commit()
+        # Create response record (with its analytics, in a group commit when enabled)
+        resume_id, resume_filename, resume_upload_time = resume.id, resume.filename, resume.upload_date
+        
+        response_id = insert_row(lambda: Response(
+            resume_id=resume_id,
+            resume_filename=resume_filename,
+            resume_upload_time=resume_upload_time,
+            responses=responses
+        ), after=record_response_analytics)
         
         return jsonify({
             'success': True,
-            'response_id': response.id,
+            'response_id': response_id,
             'message': 'Responses saved successfully!'
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
-@app.route('/api/upload-audio', methods=['POST'])
+@bp.route('/api/transcripts/<transcript_id>', methods=['GET'])
+def get_transcript(transcript_id):
+    """A transcription session's server-side transcript (e.g. to recover answers after a closed tab)"""
+    try:
+        current_app.extensions['transcript_writer'].flush()
+        transcript = db.session.get(Transcript, transcript_id)
+        if not transcript:
+            return jsonify({'error': 'Transcript not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'transcript': transcript.to_dict()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@bp.route('/api/resumes/<int:resume_id>/transcripts', methods=['GET'])
+def get_resume_transcripts(resume_id):
+    """Transcripts recorded for a resume's questions, newest first"""
+    try:
+        current_app.extensions['transcript_writer'].flush()
+        transcripts = Transcript.query \
+            .filter_by(resume_id=resume_id) \
+            .order_by(Transcript.created_at.desc()) \
+            .all()
+        
+        return jsonify({
+            'success': True,
+            'transcripts': [transcript.to_dict() for transcript in transcripts]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@bp.route('/api/analytics/questions', methods=['GET'])
+def get_question_analytics():
+    """Answer metrics aggregated per question (most answered first) plus overall averages"""
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        question_metrics = QuestionMetric.query \
+            .order_by(QuestionMetric.answer_count.desc(), QuestionMetric.question_hash) \
+            .limit(limit) \
+            .all()
+        
+        return jsonify({
+            'success': True,
+            'totals': analytics_totals(),
+            'questions': [metric.to_dict() for metric in question_metrics]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@bp.route('/api/analytics/responses/<int:response_id>', methods=['GET'])
+def get_response_analytics(response_id):
+    """Per-answer metrics of one submitted response"""
+    try:
+        answer_metrics = AnswerMetric.query \
+            .filter_by(response_id=response_id) \
+            .order_by(AnswerMetric.answer_index) \
+            .all()
+        
+        if not answer_metrics:
+            return jsonify({'error': 'No analytics for this response'}), 404
+        
+        return jsonify({
+            'success': True,
+            'response_id': response_id,
+            'answers': [metric.to_dict() for metric in answer_metrics]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@bp.route('/api/upload-audio', methods=['POST'])
 def upload_audio():
     """Handle audio file upload"""
     try:
@@ -333,7 +1152,7 @@ def upload_audio():
             
         # Save audio file
         filename = secure_filename(f"audio_{os.urandom(8).hex()}.webm")
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], 'audio', filename)
+        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], 'audio', filename)
         file.save(filepath)
         
         return jsonify({
@@ -346,103 +1165,75 @@ def upload_audio():
         print(f"Error uploading audio: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@sock.route('/ws/transcribe')
+@sock.route('/ws/transcribe', bp=bp)
 def transcribe(ws):
     """WebSocket route for real-time transcription"""
-    api_key = os.getenv('ELEVENLABS_API_KEY')
+    api_key = current_app.config['ELEVENLABS_API_KEY']
     if not api_key:
         ws.send(json.dumps({'error': 'ElevenLabs API key not configured'}))
         return
-
-    # ElevenLabs WebSocket URL with scribe_v2_realtime model
-    # We use query params for configuration as per documentation
-    model_id = "scribe_v2_realtime"
-    url = f"wss://api.elevenlabs.io/v1/speech-to-text/realtime?model_id={model_id}&language_code=en"
     
+    # Checked before anything (the recording, the silence gate) is sized by it
+    sample_rate = request.args.get('sample_rate', '16000')
+    if not sample_rate.isdigit() or not MIN_SAMPLE_RATE <= int(sample_rate) <= MAX_SAMPLE_RATE:
+        ws.send(json.dumps({'error': f'sample_rate must be an integer from {MIN_SAMPLE_RATE} to {MAX_SAMPLE_RATE}'}))
+        return
+    sample_rate = int(sample_rate)
+    
+    # Optionally tee the incoming PCM to a WAV file for this session
+    recorder = None
+    if request.args.get('record') == '1':
+        filename = f"audio_{os.urandom(8).hex()}.wav"
+        recorder = WavRecorder(
+            os.path.join(current_app.config['UPLOAD_FOLDER'], 'audio', filename),
+            sample_rate=sample_rate,
+            buffer_bytes=current_app.config['RECORDING_BUFFER_BYTES']
+        )
+    
+    # Optionally keep silence from reaching ElevenLabs (the recording still gets all of it)
+    gate = None
+    if current_app.config['TRANSCRIBE_VAD_ENABLED']:
+        gate = SilenceGate(
+            sample_rate=sample_rate,
+            threshold_dbfs=current_app.config['TRANSCRIBE_VAD_THRESHOLD_DBFS'],
+            frame_ms=current_app.config['TRANSCRIBE_VAD_FRAME_MS'],
+            hangover_ms=current_app.config['TRANSCRIBE_VAD_HANGOVER_MS'],
+            padding_ms=current_app.config['TRANSCRIBE_VAD_PADDING_MS']
+        )
+    
+    # Committed text is kept server-side too; the browser gets the id to submit instead of the text
+    transcript = None
     try:
-        # State to track if ElevenLabs WS is open
-        el_ws_ready = [False]
-        
-        def on_message(ws_client, message):
-            # Forward message from ElevenLabs to browser
-            try:
-                data = json.loads(message)
-                ws.send(json.dumps(data))
-            except Exception as e:
-                print(f"Error forwarding message: {e}")
-            
-        def on_error(ws_client, error):
-            print(f"ElevenLabs WS Error: {error}")
-            try:
-                ws.send(json.dumps({'error': str(error)}))
-            except:
-                pass
-            
-        def on_close(ws_client, close_status_code, close_msg):
-            print(f"ElevenLabs WS Closed: {close_status_code} - {close_msg}")
-            el_ws_ready[0] = False
-            
-        def on_open(ws_client):
-            print("Connected to ElevenLabs")
-            el_ws_ready[0] = True
-            
-        # Create WebSocket connection to ElevenLabs
-        import websocket
-        el_ws = websocket.WebSocketApp(
-            url,
-            header={"xi-api-key": api_key},
-            on_message=on_message,
-            on_error=on_error,
-            on_close=on_close,
-            on_open=on_open
+        resume_id = request.args.get('resume_id', type=int)
+        if resume_id is not None and db.session.get(Resume, resume_id) is None:
+            resume_id = None
+        transcript = TranscriptSession.start(
+            current_app.extensions['transcript_writer'],
+            resume_id=resume_id,
+            question_index=request.args.get('question_index', type=int)
         )
-        
-        # Run ElevenLabs connection in a separate thread
-        import threading
-        wst = threading.Thread(target=el_ws.run_forever)
-        wst.daemon = True
-        wst.start()
-        
-        # Wait for connection to be ready (short timeout)
-        import time
-        timeout = 5
-        start_time = time.time()
-        while not el_ws_ready[0] and time.time() - start_time < timeout:
-            time.sleep(0.1)
-            
-        if not el_ws_ready[0]:
-            ws.send(json.dumps({'error': 'Failed to connect to ElevenLabs transcription service'}))
-            return
-
-        # Loop to receive audio from browser and send to ElevenLabs
-        while True:
-            data = ws.receive()
-            if data:
-                try:
-                    # Browser sends JSON with audio or control messages
-                    msg = json.loads(data)
-                    
-                    if el_ws_ready[0]:
-                        # Handle different message types from browser
-                        if 'type' in msg and msg['type'] == 'audio':
-                            # Wrap in ElevenLabs format
-                            el_msg = {
-                                "message_type": "input_audio_chunk",
-                                "audio_base_64": msg['audio'],
-                                "sample_rate": msg.get('sample_rate', 16000)
-                            }
-                            el_ws.send(json.dumps(el_msg))
-                        elif 'type' in msg and msg['type'] == 'ping':
-                            pass # Keepalive
-                        else:
-                            # Forward other messages directly
-                            el_ws.send(json.dumps(msg))
-                except Exception as e:
-                    print(f"Error processing browser message: {e}")
-            else:
-                break
-                
-        el_ws.close()
+        ws.send(json.dumps({'message_type': 'transcript_started', 'transcript_id': transcript.id}))
+    except Exception as e:
+        db.session.rollback()
+        print(f"WARNING: Could not start a server-side transcript: {str(e)}")
+    
+    TRANSCRIBE_ACTIVE_SOCKETS.inc()
+    try:
+        relay = TranscriptionRelay(
+            ws,
+            current_app.config['ELEVENLABS_REALTIME_URL'],
+            api_key,
+            sample_rate=sample_rate,
+            chunk_bytes=current_app.config['TRANSCRIBE_CHUNK_BYTES'],
+            window_seconds=current_app.config['TRANSCRIBE_CHUNK_MS'] / 1000,
+            queue_size=current_app.config['TRANSCRIBE_SEND_QUEUE_SIZE'],
+            send_timeout=current_app.config['TRANSCRIBE_SEND_TIMEOUT_SECONDS'],
+            connect_timeout=current_app.config['TRANSCRIBE_CONNECT_TIMEOUT_SECONDS'],
+            recorder=recorder,
+            gate=gate,
+            transcript=transcript
+        )
+        relay.run()
         
     except Exception as e:
         print(f"WebSocket Error: {str(e)}")
@@ -450,12 +1241,173 @@ def transcribe(ws):
             ws.send(json.dumps({'error': str(e)}))
         except:
             pass
+    finally:
+        TRANSCRIBE_ACTIVE_SOCKETS.dec()
+        if recorder is not None:
+            recorder.close()
+            if not recorder.bytes_written:
+                os.remove(recorder.path)
+
+@bp.cli.command('backfill-response-resume-ids')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows updated per transaction')
+def backfill_response_resume_ids(batch_size):
+    """Link legacy responses to their resume by filename and upload time"""
+    responses = Response.__table__
+    resumes = Resume.__table__
+    matching_resume = db.select(resumes.c.id).where(
+        resumes.c.filename == responses.c.resume_filename,
+        resumes.c.upload_date == responses.c.resume_upload_time
+    ).order_by(resumes.c.id).limit(1).scalar_subquery()
+    
+    last_id = 0
+    processed = 0
+    while True:
+        batch_ids = db.session.execute(
+            db.select(responses.c.id)
+            .where(responses.c.resume_id.is_(None), responses.c.id > last_id)
+            .order_by(responses.c.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not batch_ids:
+            break
+        
+        # One set-based UPDATE per batch instead of a round trip per row
+        db.session.execute(
+            responses.update()
+            .where(responses.c.id.in_(batch_ids))
+            .values(resume_id=matching_resume)
+        )
+        db.session.commit()
+        last_id = batch_ids[-1]
+        processed += len(batch_ids)
+        click.echo(f"Processed responses up to id {last_id}")
+    
+    unmatched = db.session.execute(
+        db.select(db.func.count()).select_from(responses).where(responses.c.resume_id.is_(None))
+    ).scalar()
+    click.echo(f"Backfill complete: {processed} responses processed, {unmatched} have no matching resume")
+
+@bp.cli.command('build-assets')
+def build_assets_command():
+    """Write the fingerprinted, precompressed static assets to ASSET_BUILD_DIR"""
+    manifest = build_assets(current_app.static_folder, current_app.config['ASSET_BUILD_DIR'])
+    click.echo(f"Built {len(manifest.by_name)} assets in {manifest.build_dir}")
 
+@bp.cli.command('run-jobs')
+@click.option('--workers', default=2, show_default=True, help='Jobs processed concurrently by this process')
+def run_jobs(workers):
+    """Process queued upload jobs from the database until stopped"""
+    queue = JobQueue(
+        current_app._get_current_object(),
+        process_upload_job,
+        max_workers=workers,
+        max_pending=workers
+    )
+    queue.run_forever(current_app.config['JOB_POLL_INTERVAL_SECONDS'])
+
+@bp.cli.command('analyze-responses')
+@click.option('--batch-size', default=500, show_default=True, help='Responses analyzed per transaction')
+@click.option('--rebuild', is_flag=True, help='Discard all stored metrics and analyze every response again')
+def analyze_responses_command(batch_size, rebuild):
+    """Compute answer analytics for responses that have none yet"""
+    if rebuild:
+        AnswerMetric.query.delete()
+        QuestionMetric.query.delete()
+        db.session.commit()
+        click.echo('Discarded stored answer analytics')
+    
+    analyzed = db.select(AnswerMetric.id).where(AnswerMetric.response_id == Response.id).exists()
+    last_id = 0
+    answers = 0
+    while True:
+        batch = Response.query \
+            .options(load_only(Response.id, Response.responses)) \
+            .filter(Response.id > last_id, ~analyzed) \
+            .order_by(Response.id) \
+            .limit(batch_size) \
+            .all()
+        if not batch:
+            break
+        
+        answers += analyze_responses(batch)
+        db.session.commit()
+        last_id = batch[-1].id
+        click.echo(f"Analyzed responses up to id {last_id}")
+    
+    click.echo(f"Analysis complete: {answers} answers added")
 
+def init_migrations(app):
+    """Register Flask-Migrate for the `flask db` commands (imports alembic)"""
+    from flask_migrate import Migrate
+    return Migrate(app, db, directory=os.path.join(app.config['BASE_DIR'], 'migrations'), render_as_batch=True)
 
-# Create database tables
-with app.app_context():
-    db.create_all()
+def create_app(config_class=Config):
+    """Application factory
+    
+    Schema changes are not applied here: run `flask --app app db upgrade` (the
+    Procfile's release phase does) before starting the web process.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    
+    if app.config['TRUSTED_PROXY_HOPS']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_HOPS'])
+    
+    if app.config['PROFILING_MODE'] not in PROFILING_MODES:
+        raise ValueError(f"Unknown PROFILING_MODE {app.config['PROFILING_MODE']!r} (expected one of {', '.join(PROFILING_MODES)})")
+    
+    # Engine tuning (SQLite PRAGMAs, PostgreSQL pool); explicit SQLALCHEMY_ENGINE_OPTIONS win
+    profile = resolve_profile(app.config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(
+        engine_options(profile, app.config), **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    )
+    db.init_app(app)
+    configure_engine(app, profile)
+    sock.init_app(app)
+    app.register_blueprint(bp)
+    
+    # alembic is only needed by CLI commands, so web workers never import it
+    if os.environ.get('FLASK_RUN_FROM_CLI') == 'true':
+        init_migrations(app)
+    
+    # Circuit breaker state and counters, shared across workers with SHARED_STATE_BACKEND=database
+    app.extensions['shared_state'] = create_store(app)
+    app.extensions['admission'] = AdmissionController(app, app.extensions['shared_state'], ADMISSION_ENDPOINTS)
+    app.extensions['job_queue'] = JobQueue(
+        app,
+        process_upload_job,
+        max_workers=app.config['JOB_WORKERS'],
+        max_pending=app.config['JOB_MAX_PENDING']
+    )
+    # Resume and response inserts from concurrent requests share one commit when enabled
+    if app.config['GROUP_COMMIT_ENABLED']:
+        app.extensions['group_commit'] = GroupCommitWriter(
+            app,
+            window=app.config['GROUP_COMMIT_WINDOW_MS'] / 1000,
+            max_batch=app.config['GROUP_COMMIT_MAX_BATCH']
+        )
+    app.extensions['transcript_writer'] = TranscriptWriter(app, app.config['TRANSCRIPT_FLUSH_SECONDS'])
+    # Gemini calls that may outlive their request when QUESTION_DEADLINE_SECONDS is set
+    app.extensions['question_executor'] = ThreadPoolExecutor(
+        max_workers=app.config['GEMINI_MAX_CONCURRENCY'],
+        thread_name_prefix='gemini-questions'
+    )
+    # Assets are compressed by `flask build-assets` (the Procfile's release phase); requests only read the files
+    if app.config['ASSET_PIPELINE_ENABLED']:
+        app.extensions['asset_manifest'] = AssetManifest.load(app.config['ASSET_BUILD_DIR'])
+        if app.extensions['asset_manifest'] is None and os.environ.get('FLASK_RUN_FROM_CLI') != 'true':
+            print(f"WARNING: No built assets in {app.config['ASSET_BUILD_DIR']}; run `flask --app app build-assets`. Serving /static/ instead.")
+    
+    # Create upload folder if it doesn't exist
+    os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'audio'), exist_ok=True)
+    os.makedirs('instance', exist_ok=True)
+    return app
 
 if __name__ == '__main__':
+    app = create_app()
+    # The development server applies pending migrations itself
+    with app.app_context():
+        from flask_migrate import upgrade
+        init_migrations(app)
+        upgrade()
     app.run(debug=True, host='0.0.0.0', port=5001)
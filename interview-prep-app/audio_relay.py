@@ -0,0 +1,434 @@
+import base64
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+import wave
+from collections import deque
+from metrics import (
+    TRANSCRIBE_BYTES, TRANSCRIBE_CONNECT_SECONDS, TRANSCRIBE_DROPPED_CHUNKS, TRANSCRIBE_FRAMES,
+    TRANSCRIBE_VAD_SUPPRESSED_BYTES, TRANSCRIBE_VAD_SUPPRESSED_SECONDS
+)
+
+# 16-bit mono PCM sample rates the relay accepts from the browser (telephone to 48 kHz)
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 48000
+
+
+class AudioCoalescer:
+    """Buffer small PCM frames into larger upstream chunks by size or time window"""
+
+    def __init__(self, chunk_bytes=16000, window_seconds=0.25):
+        self.chunk_bytes = chunk_bytes
+        self.window_seconds = window_seconds
+        self._buffer = bytearray()
+        self._first_frame_at = None
+
+    def add(self, frame):
+        """Buffer a frame and return a chunk if the size limit was reached"""
+        if not self._buffer:
+            self._first_frame_at = time.monotonic()
+        self._buffer += frame
+        if len(self._buffer) >= self.chunk_bytes:
+            return self.flush()
+        return None
+
+    def time_until_flush(self):
+        """Seconds until buffered audio is due, or None when nothing is buffered"""
+        if not self._buffer:
+            return None
+        return max(0.0, self._first_frame_at + self.window_seconds - time.monotonic())
+
+    def flush(self):
+        """Return everything buffered so far (None if empty) and reset"""
+        if not self._buffer:
+            return None
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        self._first_frame_at = None
+        return chunk
+
+
+class SilenceGate:
+    """Energy-based voice activity gate for mono PCM16 audio
+
+    Audio is judged in frame_ms frames by RMS level: frames at or above
+    threshold_dbfs are speech. Speech goes through with padding_ms of the audio
+    before it and hangover_ms after it, so word onsets and tails aren't
+    clipped; longer silences are dropped and counted.
+    """
+
+    def __init__(self, sample_rate=16000, threshold_dbfs=-45.0, frame_ms=20, hangover_ms=600, padding_ms=200):
+        self.sample_rate = sample_rate
+        self.frame_bytes = max(1, sample_rate * frame_ms // 1000) * 2
+        self.hangover_frames = math.ceil(hangover_ms / frame_ms)
+        self.padding_frames = math.ceil(padding_ms / frame_ms)
+        # RMS of a full-scale PCM16 signal is 32768 at 0 dBFS
+        self.threshold_rms = 32768 * 10 ** (threshold_dbfs / 20)
+        self.passed_bytes = 0
+        self.suppressed_bytes = 0
+        self._partial = bytearray()  # trailing bytes short of a whole frame
+        self._preroll = deque()  # latest silent frames, sent if speech follows within padding_ms
+        self._hangover = 0  # frames still passed after the last speech frame
+
+    @property
+    def suppressed_seconds(self):
+        return self.suppressed_bytes / (2 * self.sample_rate)
+
+    def _suppress(self, size):
+        self.suppressed_bytes += size
+        TRANSCRIBE_VAD_SUPPRESSED_BYTES.inc(size)
+        TRANSCRIBE_VAD_SUPPRESSED_SECONDS.inc(size / (2 * self.sample_rate))
+
+    def process(self, pcm):
+        """Feed browser PCM; return the audio to send upstream now (possibly empty)"""
+        import numpy as np  # imported on first use so startup stays lean
+
+        self._partial += pcm
+        count = len(self._partial) // self.frame_bytes
+        if not count:
+            return b''
+        data = bytes(self._partial[:count * self.frame_bytes])
+        del self._partial[:count * self.frame_bytes]
+
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32).reshape(count, -1)
+        speech = np.sqrt(np.mean(samples * samples, axis=1)) >= self.threshold_rms
+
+        out = bytearray()
+        for i, is_speech in enumerate(speech.tolist()):
+            frame = data[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            if is_speech:
+                while self._preroll:
+                    out += self._preroll.popleft()
+                out += frame
+                self._hangover = self.hangover_frames
+            elif self._hangover:
+                out += frame
+                self._hangover -= 1
+            else:
+                self._preroll.append(frame)
+                if len(self._preroll) > self.padding_frames:
+                    self._suppress(len(self._preroll.popleft()))
+        self.passed_bytes += len(out)
+        return bytes(out)
+
+    def flush(self):
+        """Return the partial frame if speech is ongoing (dropping it otherwise)"""
+        tail = bytes(self._partial)
+        self._partial.clear()
+        if self._hangover:
+            self.passed_bytes += len(tail)
+            return tail
+        if tail:
+            self._suppress(len(tail))
+        return b''
+
+    def close(self):
+        """Count the held-back silence as suppressed once the stream has ended"""
+        self.flush()
+        while self._preroll:
+            self._suppress(len(self._preroll.popleft()))
+
+
+def upstream_audio_message(pcm, sample_rate):
+    """Wrap raw PCM in an ElevenLabs input_audio_chunk message (the only base64 step)"""
+    return json.dumps({
+        "message_type": "input_audio_chunk",
+        "audio_base_64": base64.b64encode(pcm).decode('ascii'),
+        "sample_rate": sample_rate
+    })
+
+
+class WavRecorder:
+    """Stream mono PCM16 frames into a WAV file through a large write buffer"""
+
+    def __init__(self, path, sample_rate=16000, buffer_bytes=64 * 1024):
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.sample_rate = sample_rate
+        self.bytes_written = 0
+        self._file = open(path, 'wb', buffering=buffer_bytes)
+        self._wav = wave.open(self._file, 'wb')
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    @property
+    def closed(self):
+        return self._wav is None
+
+    @property
+    def duration_seconds(self):
+        return self.bytes_written / (2 * self.sample_rate)
+
+    def write(self, pcm):
+        if self._wav is not None:
+            # writeframesraw skips the per-call header rewrite; close() patches it once
+            self._wav.writeframesraw(pcm)
+            self.bytes_written += len(pcm)
+
+    def close(self):
+        """Finalize the WAV header and flush to disk (idempotent)"""
+        if self._wav is None:
+            return
+        self._wav.close()
+        self._file.close()
+        self._wav = None
+
+
+def _concurrency_primitives():
+    """Greenlets when the gevent worker has monkey-patched the process, threads otherwise"""
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('socket'):
+            import gevent
+            from gevent.event import Event
+            from gevent.queue import Queue
+            return gevent.spawn, Queue, Event
+    except ImportError:
+        pass
+
+    def spawn(target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    return spawn, queue.Queue, threading.Event
+
+
+class TranscriptionRelay:
+    """Bridge one browser WebSocket to the ElevenLabs realtime API
+
+    The upstream handshake completes before any audio is relayed (no polling),
+    one task reads upstream and forwards to the browser, and another drains a
+    bounded send queue so a slow upstream pushes back on the browser reader.
+    """
+
+    # How often the browser loop wakes to notice an upstream disconnect
+    IDLE_CHECK_SECONDS = 1.0
+
+    def __init__(self, browser_ws, url, api_key, sample_rate=16000, chunk_bytes=16000,
+                 window_seconds=0.25, queue_size=32, send_timeout=2.0, connect_timeout=5.0,
+                 recorder=None, gate=None, transcript=None):
+        self.browser_ws = browser_ws
+        self.recorder = recorder
+        self.gate = gate
+        self.transcript = transcript
+        self.url = url
+        self.api_key = api_key
+        self.sample_rate = sample_rate
+        self.send_timeout = send_timeout
+        self.connect_timeout = connect_timeout
+        self.coalescer = AudioCoalescer(chunk_bytes, window_seconds)
+        self.dropped_chunks = 0
+        self.upstream = None
+
+        self._spawn, queue_class, event_class = _concurrency_primitives()
+        self._send_queue = queue_class(maxsize=queue_size)
+        self._closed = event_class()
+
+    def run(self):
+        """Relay until either side closes, then tear both down"""
+        import websocket
+
+        try:
+            with TRANSCRIBE_CONNECT_SECONDS.time():
+                self.upstream = websocket.create_connection(
+                    self.url,
+                    header=[f"xi-api-key: {self.api_key}"],
+                    timeout=self.connect_timeout
+                )
+            self.upstream.settimeout(None)
+        except Exception as e:
+            print(f"ElevenLabs WS Error: {e}")
+            self._send_browser(json.dumps({'error': 'Failed to connect to ElevenLabs transcription service'}))
+            return
+        print("Connected to ElevenLabs")
+
+        reader = self._spawn(self._pump_upstream)
+        writer = self._spawn(self._drain_send_queue)
+        try:
+            self._pump_browser()
+        finally:
+            self.close()
+            self._finish_recording()
+            reader.join(timeout=self.connect_timeout)
+            writer.join(timeout=self.connect_timeout)
+            self._finish_transcript()  # after the reader, so no committed segment is missed
+            if self.dropped_chunks:
+                print(f"Transcription relay dropped {self.dropped_chunks} chunks under backpressure")
+            if self.gate is not None:
+                self.gate.close()
+                total = self.gate.passed_bytes + self.gate.suppressed_bytes
+                print(f"Silence gate suppressed {self.gate.suppressed_bytes}/{total} bytes "
+                      f"({self.gate.suppressed_seconds:.1f}s of audio)")
+
+    def close(self):
+        """Stop both pumps; safe to call more than once"""
+        self._closed.set()
+        try:
+            self._send_queue.put_nowait(None)
+        except queue.Full:
+            pass  # the writer exits on its next send once upstream is closed
+        try:
+            self.upstream.close()
+        except Exception:
+            pass
+
+    def _send_browser(self, message):
+        try:
+            self.browser_ws.send(message)
+        except Exception:
+            self._closed.set()
+
+    def _enqueue(self, message):
+        """Queue a message for upstream, waiting up to send_timeout for room"""
+        try:
+            self._send_queue.put(message, timeout=self.send_timeout)
+        except queue.Full:
+            self.dropped_chunks += 1
+            TRANSCRIBE_DROPPED_CHUNKS.inc()
+
+    def _enqueue_audio(self, pcm):
+        if pcm:
+            self._enqueue(upstream_audio_message(pcm, self.sample_rate))
+
+    def _pump_browser(self):
+        from simple_websocket import ConnectionClosed
+
+        while not self._closed.is_set():
+            wait = self.coalescer.time_until_flush()
+            try:
+                data = self.browser_ws.receive(timeout=self.IDLE_CHECK_SECONDS if wait is None else wait)
+            except ConnectionClosed:
+                return
+
+            if data is None:
+                # Time window elapsed with audio still buffered (or just an idle check)
+                self._enqueue_audio(self.coalescer.flush())
+                continue
+
+            TRANSCRIBE_FRAMES.inc(direction='from_browser')
+            TRANSCRIBE_BYTES.inc(len(data), direction='from_browser')
+            try:
+                self._handle_browser_message(data)
+            except Exception as e:
+                print(f"Error processing browser message: {e}")
+
+    def _finish_transcript(self):
+        """Write the session's transcript now, so a submission can reference it right away"""
+        if self.transcript is None:
+            return
+        recorded = self.recorder is not None and self.recorder.bytes_written
+        try:
+            self.transcript.finish(audio_file=self.recorder.filename if recorded else None)
+        except Exception as e:
+            print(f"Error saving transcript {self.transcript.id}: {e}")
+
+    def _finish_recording(self):
+        """Finalize the server-side recording and tell the browser where it is"""
+        if self.recorder is None or self.recorder.closed:
+            return
+        self.recorder.close()
+        print(f"Saved recording {self.recorder.filename} ({self.recorder.duration_seconds:.1f}s)")
+        self._send_browser(json.dumps({
+            'message_type': 'recording_saved',
+            'filename': self.recorder.filename,
+            'path': f"/uploads/audio/{self.recorder.filename}",
+            'duration_seconds': round(self.recorder.duration_seconds, 2)
+        }))
+
+    def _handle_browser_message(self, data):
+        if isinstance(data, bytes):
+            if self.recorder is not None:
+                self.recorder.write(data)
+            if self.gate is not None:
+                data = self.gate.process(data)
+                if not data:
+                    return
+            self._enqueue_audio(self.coalescer.add(data))
+            return
+
+        # Text frames carry JSON control messages (and legacy base64 audio)
+        msg = json.loads(data)
+        if msg.get('type') == 'ping':
+            return  # Keepalive
+
+        # Keep ordering: buffered audio goes out before anything else
+        if self.gate is not None:
+            self._enqueue_audio(self.coalescer.add(self.gate.flush()))
+        self._enqueue_audio(self.coalescer.flush())
+        if msg.get('type') == 'stop':
+            # Browser finished recording; reply with the saved file before it closes
+            self._finish_transcript()
+            self._finish_recording()
+            return
+        if msg.get('type') == 'audio':
+            self._enqueue(json.dumps({
+                "message_type": "input_audio_chunk",
+                "audio_base_64": msg['audio'],
+                "sample_rate": msg.get('sample_rate', self.sample_rate)
+            }))
+        else:
+            # Forward other messages directly
+            self._enqueue(data)
+
+    def _pump_upstream(self):
+        """Forward ElevenLabs messages to the browser untouched, keeping committed text server-side"""
+        try:
+            while not self._closed.is_set():
+                message = self.upstream.recv()
+                if not message:
+                    break
+                TRANSCRIBE_FRAMES.inc(direction='to_browser')
+                TRANSCRIBE_BYTES.inc(len(message), direction='to_browser')
+                self._send_browser(message)
+                # Only committed segments are parsed; partials pass straight through
+                if self.transcript is not None and 'committed_transcript' in message:
+                    self._collect_transcript(message)
+        except Exception as e:
+            if not self._closed.is_set():
+                print(f"ElevenLabs WS Error: {e}")
+                self._send_browser(json.dumps({'error': str(e)}))
+        finally:
+            print("ElevenLabs WS Closed")
+            self._closed.set()
+
+    def _collect_transcript(self, message):
+        try:
+            event = json.loads(message)
+        except ValueError:
+            return
+        if event.get('message_type') == 'committed_transcript':
+            self.transcript.add(event.get('text') or '')
+
+    def _drain_send_queue(self):
+        while True:
+            message = self._send_queue.get()
+            if message is None:
+                return
+            try:
+                self.upstream.send(message)
+                TRANSCRIBE_FRAMES.inc(direction='to_upstream')
+                TRANSCRIBE_BYTES.inc(len(message), direction='to_upstream')
+            except Exception as e:
+                if not self._closed.is_set():
+                    print(f"Error sending to ElevenLabs: {e}")
+                self._closed.set()
+                return
+
+
+if __name__ == '__main__':
+    # Offline check of the silence gate: python audio_relay.py recording.wav [threshold_dbfs]
+    with wave.open(sys.argv[1], 'rb') as recording:
+        rate = recording.getframerate()
+        pcm = recording.readframes(recording.getnframes())
+    gate = SilenceGate(rate, float(sys.argv[2]) if len(sys.argv) > 2 else -45.0)
+    for start in range(0, len(pcm), 8192):  # browser-sized frames
+        gate.process(pcm[start:start + 8192])
+    gate.close()
+    print(f"{len(pcm) / (2 * rate):.1f}s of audio: passed {gate.passed_bytes} bytes, "
+          f"suppressed {gate.suppressed_bytes} bytes ({gate.suppressed_seconds:.1f}s)")
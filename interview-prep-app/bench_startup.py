@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from benchmark import percentile
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Loaded on first use (an upload, a Gemini call, analytics, `flask db`); none should be imported by startup
+DEFERRED_MODULES = ('PyPDF2', 'requests', 'alembic', 'flask_migrate', 'websocket', 'reportlab', 'numpy')
+
+# Runs in a fresh interpreter per sample: import, build the app, serve the first request
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+status = application.test_client().get('/').status_code
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (served - created) * 1000,
+    'ready_ms': (served - started) * 1000,
+    'status': status,
+    'deferred_loaded': [name for name in sys.argv[2].split(',') if name in sys.modules]
+}))
+"""
+
+PHASES = ('process_ms', 'import_ms', 'create_app_ms', 'first_request_ms', 'ready_ms')
+
+
+def run_child(env, python_args=()):
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *python_args, '-c', CHILD, APP_DIR, ','.join(DEFERRED_MODULES)],
+        env=env, capture_output=True, text=True
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup sample failed:\n{completed.stderr}")
+    sample = json.loads(completed.stdout.strip().splitlines()[-1])
+    sample['process_ms'] = elapsed
+    return sample, completed.stderr
+
+
+def summarize(samples):
+    summary = {}
+    for phase in PHASES:
+        values = sorted(sample[phase] for sample in samples)
+        summary[phase] = {
+            'min': round(values[0], 1),
+            'p50': round(percentile(values, 50), 1),
+            'p95': round(percentile(values, 95), 1),
+            'max': round(values[-1], 1)
+        }
+    return summary
+
+
+def slowest_imports(importtime_log, limit):
+    """Top cumulative import times (ms) of top-level modules (app, site) and their direct imports"""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        # Nesting is shown by indentation: app itself is at depth 0, its own imports at depth 1
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            rows.append((int(cumulative_us) / 1000, name.strip()))
+    return [{'module': name, 'cumulative_ms': round(ms, 1)} for ms, name in sorted(rows, reverse=True)[:limit]]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold start: import app, create_app() and the first request')
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to sample')
+    parser.add_argument('--importtime', type=int, default=15, metavar='N',
+                        help='report the N slowest imports from one extra -X importtime run (0 skips it)')
+    parser.add_argument('--max-ready-ms', type=float, help='exit 1 if p50 ready_ms exceeds this')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='previous JSON report to compare against')
+    parser.add_argument('--max-regression', type=float, help='exit 1 if p50 ready_ms grows by more than this percent')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='interview-prep-startup-')
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'startup.db')}")
+    subprocess.run([sys.executable, '-m', 'flask', '--app', os.path.join(APP_DIR, 'app.py'), 'db', 'upgrade'],
+                   cwd=workdir, env=env, capture_output=True, check=True)
+
+    samples = [run_child(env)[0] for _ in range(args.runs)]
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'config': {'runs': args.runs, 'python': sys.version.split()[0]},
+        'results': summarize(samples),
+        'deferred_loaded': sorted({name for sample in samples for name in sample['deferred_loaded']})
+    }
+    if args.importtime:
+        _, log = run_child(env, ['-X', 'importtime'])
+        report['slowest_imports'] = slowest_imports(log, args.importtime)
+
+    failures = []
+    ready = report['results']['ready_ms']['p50']
+    if report['deferred_loaded']:
+        failures.append(f"startup imported deferred modules: {', '.join(report['deferred_loaded'])}")
+    if args.max_ready_ms is not None and ready > args.max_ready_ms:
+        failures.append(f"p50 ready_ms {ready} exceeds {args.max_ready_ms}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            previous = json.load(f)['results']
+        report['comparison'] = {
+            phase: round((report['results'][phase]['p50'] - previous[phase]['p50']) / previous[phase]['p50'] * 100, 1)
+            for phase in PHASES if previous.get(phase, {}).get('p50')
+        }
+        change = report['comparison'].get('ready_ms')
+        if args.max_regression is not None and change is not None and change > args.max_regression:
+            failures.append(f"p50 ready_ms regressed by {change}% (limit {args.max_regression}%)")
+
+    print(f"{'phase':<20}{'min':>10}{'p50':>10}{'p95':>10}{'max':>10}", file=sys.stderr)
+    for phase, r in report['results'].items():
+        print(f"{phase:<20}{r['min']:>10.1f}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['max']:>10.1f}", file=sys.stderr)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
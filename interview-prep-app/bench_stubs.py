@@ -0,0 +1,205 @@
+import base64
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from flask import Flask
+from flask_sock import Sock
+from werkzeug.serving import make_server, WSGIRequestHandler
+
+STUB_QUESTIONS = [
+    "Tell me about the most complex system you designed in one of the projects on your resume. What trade-offs did you make?",
+    "Describe a production incident you debugged in one of these projects. How did you find the root cause?",
+    "Walk me through how you chose the technology stack for a project listed here.",
+    "Tell me about a time you had to improve the performance of something you built. How did you measure it?"
+]
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class _LatencyModel:
+    """Latency and failure injection shared by the stubs"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0.0, (self.latency_ms + jitter) / 1000)
+
+    def should_fail(self):
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+
+class GeminiStub:
+    """Local stand-in for Gemini generateContent and streamGenerateContent?alt=sse
+
+    Point the app at it with GEMINI_API_BASE_URL=<stub.base_url>. Failed calls
+    answer 503 (or 429 with Retry-After) so the client's retry path is exercised.
+    """
+
+    def __init__(self, latency_ms=300, jitter_ms=100, error_rate=0.0, seed=None):
+        self.latency = _LatencyModel(latency_ms, jitter_ms, error_rate, seed)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                stub._handle(self)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _count(self, failed):
+        with self._lock:
+            self.requests += 1
+            if failed:
+                self.errors += 1
+
+    def _handle(self, handler):
+        request_body = json.loads(handler.rfile.read(int(handler.headers.get('Content-Length', 0))) or b'{}')
+        failed = self.latency.should_fail()
+        self._count(failed)
+        time.sleep(self.latency.delay())
+
+        if failed:
+            status = random.choice([429, 503])
+            body = json.dumps({'error': {'code': status, 'message': 'Injected failure'}}).encode()
+            handler.send_response(status)
+            if status == 429:
+                handler.send_header('Retry-After', '1')
+            handler.send_header('Content-Type', 'application/json')
+            handler.send_header('Content-Length', str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+            return
+
+        if ':streamGenerateContent' in handler.path:
+            self._stream(handler)
+            return
+
+        if request_body.get('generationConfig', {}).get('responseMimeType') == 'application/json':
+            # Structured multi-resume prompt: one entry per "Resume <n>:" section
+            prompt = request_body['contents'][0]['parts'][0]['text']
+            indexes = [int(n) for n in re.findall(r'^Resume (\d+):', prompt, re.MULTILINE)]
+            text = json.dumps({'resumes': [{'index': i, 'questions': STUB_QUESTIONS} for i in indexes]})
+        else:
+            text = '\n'.join(f"{i}. {question}" for i, question in enumerate(STUB_QUESTIONS, 1))
+        body = json.dumps({'candidates': [{'content': {'parts': [{'text': text}]}}]}).encode()
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _stream(self, handler):
+        """Send one SSE event per question, spacing them like token generation"""
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Connection', 'close')
+        handler.end_headers()
+        for i, question in enumerate(STUB_QUESTIONS, 1):
+            event = {'candidates': [{'content': {'parts': [{'text': f"{i}. {question}\n"}]}}]}
+            handler.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode())
+            handler.wfile.flush()
+            time.sleep(self.latency.delay() / len(STUB_QUESTIONS))
+        handler.close_connection = True
+
+
+class ElevenLabsStub:
+    """Local stand-in for the ElevenLabs realtime speech-to-text WebSocket
+
+    Point the app at it with ELEVENLABS_REALTIME_URL=<stub.url>. Every audio
+    chunk gets a partial transcript after the configured latency, and every
+    `commit_every` chunks a committed one. Transcripts carry `audio_bytes`, the
+    PCM received so far, so clients can measure end-to-end lag. A failing
+    session is closed after its first chunk.
+    """
+
+    def __init__(self, latency_ms=80, jitter_ms=20, error_rate=0.0, commit_every=4, seed=None):
+        self.latency = _LatencyModel(latency_ms, jitter_ms, error_rate, seed)
+        self.commit_every = commit_every
+        self.sessions = 0
+        self.chunks = 0
+        self.audio_bytes = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self._server.server_port}/v1/speech-to-text/realtime"
+
+    def start(self):
+        app = Flask('elevenlabs-stub')
+        sock = Sock(app)
+        sock.route('/v1/speech-to-text/realtime')(self._session)
+        self._server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=_QuietRequestHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _session(self, ws):
+        with self._lock:
+            self.sessions += 1
+        failing = self.latency.should_fail()
+        ws.send(json.dumps({'message_type': 'session_started'}))
+
+        received = 0
+        chunks = 0
+        while True:
+            message = json.loads(ws.receive())
+            if message.get('message_type') != 'input_audio_chunk':
+                continue
+            if failing:
+                ws.close(reason=1011, message='Injected failure')
+                return
+            pcm_bytes = len(base64.b64decode(message.get('audio_base_64', '')))
+            received += pcm_bytes
+            chunks += 1
+            with self._lock:
+                self.chunks += 1
+                self.audio_bytes += pcm_bytes
+
+            time.sleep(self.latency.delay())
+            committed = chunks % self.commit_every == 0
+            ws.send(json.dumps({
+                'message_type': 'committed_transcript' if committed else 'partial_transcript',
+                'text': f"heard {received} bytes",
+                'audio_bytes': received
+            }))
@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from bench_stubs import GeminiStub
+from benchmark import Benchmark, Recorder, generate_resumes, print_table, scrape_server_metrics, start_app
+
+# Engine profile x group commit; 'default' is the baseline (rollback journal, a commit per request)
+CONFIGURATIONS = {
+    'default': {'DATABASE_PROFILE': 'default', 'GROUP_COMMIT_ENABLED': 'false'},
+    'sqlite': {'DATABASE_PROFILE': 'sqlite', 'GROUP_COMMIT_ENABLED': 'false'},
+    'default+group': {'DATABASE_PROFILE': 'default', 'GROUP_COMMIT_ENABLED': 'true'},
+    'sqlite+group': {'DATABASE_PROFILE': 'sqlite', 'GROUP_COMMIT_ENABLED': 'true'}
+}
+
+SERVER_METRICS = ('db_commit_seconds', 'group_commit_batch_size')
+
+
+def run_configuration(name, settings, args, resumes, gemini):
+    """Start a fresh app and database with these settings and drive concurrent writes at it"""
+    workdir = tempfile.mkdtemp(prefix=f'interview-prep-writes-{name.replace("+", "-")}-')
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'writes.db')}",
+        GEMINI_API_KEY='benchmark',
+        GEMINI_API_BASE_URL=gemini.base_url,
+        QUESTION_CACHE_ENABLED='false',
+        UPLOAD_RATE_PER_MINUTE='0',
+        UPLOAD_MAX_CONCURRENCY='0',
+        **settings
+    )
+    process, base_url, server, log_path = start_app(workdir, env, args.server)
+    bench = Benchmark(base_url, resumes, Recorder())
+    try:
+        bench.upload(0)
+        if not bench.resume_ids:
+            raise RuntimeError(f"Warm-up upload failed, see {log_path}")
+        bench.recorder = Recorder()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            futures = [pool.submit(bench.submit, i) for i in range(args.submissions)]
+            futures += [pool.submit(bench.upload, i) for i in range(args.uploads)]
+            wait(futures)
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - started
+        server_metrics = scrape_server_metrics(base_url)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    results = bench.recorder.summary()
+    writes = sum(r['requests'] - r['errors'] for r in results.values())
+    return {
+        'server': server,
+        'elapsed_seconds': round(elapsed, 3),
+        'writes_per_second': round(writes / elapsed, 2),
+        'errors': sum(r['errors'] for r in results.values()),
+        'results': results,
+        'server_metrics': {
+            # Batch sizes are counts, not seconds, so undo the millisecond scaling
+            key: {'count': value['count'], 'mean': round(value['mean_ms'] / 1000, 2)}
+            if key.startswith('group_commit_batch_size') else value
+            for key, value in server_metrics.items() if key.startswith(SERVER_METRICS)
+        }
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Concurrent write throughput (submit-responses and uploads) per engine profile and group commit'
+    )
+    parser.add_argument('--configurations', default=','.join(CONFIGURATIONS),
+                        help=f"comma-separated subset of {', '.join(CONFIGURATIONS)}")
+    parser.add_argument('--submissions', type=int, default=400)
+    parser.add_argument('--uploads', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--gemini-latency-ms', type=float, default=20)
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'werkzeug'], default='auto')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = [name.strip() for name in args.configurations.split(',') if name.strip()]
+    unknown = [name for name in names if name not in CONFIGURATIONS]
+    if unknown:
+        raise SystemExit(f"Unknown configurations: {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix='interview-prep-writes-')
+    resumes = generate_resumes(workdir, [0], 4)
+    gemini = GeminiStub(args.gemini_latency_ms, 0, 0.0).start()
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'config': vars(args),
+        'configurations': {}
+    }
+    try:
+        for name in names:
+            print(f"== {name}", file=sys.stderr)
+            result = report['configurations'][name] = run_configuration(name, CONFIGURATIONS[name], args, resumes, gemini)
+            print_table(result['results'])
+            print(f"{result['writes_per_second']} writes/s, {result['errors']} errors", file=sys.stderr)
+    finally:
+        gemini.stop()
+
+    baseline = report['configurations'].get('default')
+    if baseline:
+        report['speedup'] = {
+            name: round(result['writes_per_second'] / baseline['writes_per_second'], 2)
+            for name, result in report['configurations'].items()
+        }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
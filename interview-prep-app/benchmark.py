@@ -0,0 +1,489 @@
+import argparse
+import bisect
+import importlib.util
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+import PyPDF2
+import requests
+import wave
+import websocket
+from bench_stubs import GeminiStub, ElevenLabsStub
+from create_sample_resume import create_resume_pdf
+from create_sample_speech import synthesize_speech, write_wav
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Matches the browser: 4096-sample ScriptProcessor frames of 16 kHz PCM16
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 4096
+
+# Used when gunicorn is not installed (threaded werkzeug, as in local development)
+WERKZEUG_SERVER = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from werkzeug.serving import make_server
+from app import create_app
+make_server('127.0.0.1', int(sys.argv[2]), create_app(), threaded=True).serve_forever()
+"""
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Recorder:
+    """Collects latency samples and error counts per endpoint from many threads"""
+
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._errors = defaultdict(int)
+        self._first_start = {}
+        self._last_end = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, started, ok=True, finished=None):
+        finished = finished or time.perf_counter()
+        with self._lock:
+            self._samples[endpoint].append(finished - started)
+            if not ok:
+                self._errors[endpoint] += 1
+            self._first_start[endpoint] = min(self._first_start.get(endpoint, started), started)
+            self._last_end[endpoint] = max(self._last_end.get(endpoint, finished), finished)
+
+    def summary(self):
+        results = {}
+        with self._lock:
+            for endpoint, samples in sorted(self._samples.items()):
+                samples = sorted(samples)
+                window = self._last_end[endpoint] - self._first_start[endpoint]
+                results[endpoint] = {
+                    'requests': len(samples),
+                    'errors': self._errors[endpoint],
+                    'error_rate': round(self._errors[endpoint] / len(samples), 4),
+                    'throughput_rps': round(len(samples) / window, 3) if window > 0 else None,
+                    'mean_ms': round(sum(samples) / len(samples) * 1000, 2),
+                    'p50_ms': round(percentile(samples, 50) * 1000, 2),
+                    'p95_ms': round(percentile(samples, 95) * 1000, 2),
+                    'p99_ms': round(percentile(samples, 99) * 1000, 2),
+                    'max_ms': round(samples[-1] * 1000, 2)
+                }
+        return results
+
+
+class Benchmark:
+    """Drives uploads, response submissions and transcription sessions against one app instance"""
+
+    def __init__(self, base_url, resumes, recorder, session_seconds=3.0, realtime=True, audio=None, gated=False):
+        self.base_url = base_url.rstrip('/')
+        self.ws_url = 'ws' + self.base_url[len('http'):] + '/ws/transcribe'
+        self.resumes = resumes
+        self.recorder = recorder
+        self.session_seconds = session_seconds
+        self.realtime = realtime
+        # PCM streamed by every session (looped); random bytes, which never look silent, when None
+        self.audio = audio
+        # With the silence gate on, upstream hears less than was sent, so transcripts can't be matched to sends
+        self.gated = gated
+        self.sent_audio_bytes = 0
+        self.resume_ids = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def http(self):
+        # requests.Session is not thread-safe; keep one keep-alive session per worker
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _remember(self, resume_id):
+        with self._lock:
+            self.resume_ids.append(resume_id)
+
+    def upload(self, index, streaming=False):
+        path, pages = self.resumes[index % len(self.resumes)]
+        endpoint = f"upload_stream_{pages}p" if streaming else f"upload_{pages}p"
+        started = time.perf_counter()
+        try:
+            with open(path, 'rb') as f:
+                if streaming:
+                    ok = self._upload_streaming(f, endpoint, started)
+                else:
+                    response = self.http.post(f"{self.base_url}/api/upload-resume", files={'resume': (os.path.basename(path), f, 'application/pdf')})
+                    ok = response.status_code == 200
+                    if ok:
+                        self._remember(response.json()['resume_id'])
+        except requests.RequestException:
+            ok = False
+        self.recorder.record(endpoint, started, ok)
+
+    def _upload_streaming(self, f, endpoint, started):
+        response = self.http.post(
+            f"{self.base_url}/api/upload-resume?mode=stream",
+            files={'resume': (os.path.basename(f.name), f, 'application/pdf')},
+            stream=True
+        )
+        if response.status_code != 200:
+            return False
+        event = None
+        first_question = True
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith('event:'):
+                event = line[len('event:'):].strip()
+            elif line.startswith('data:'):
+                if event == 'question' and first_question:
+                    self.recorder.record(f"{endpoint}_first_question", started)
+                    first_question = False
+                elif event == 'done':
+                    self._remember(json.loads(line[len('data:'):])['resume_id'])
+                    return True
+                elif event == 'error':
+                    return False
+        return False
+
+    def submit(self, index):
+        with self._lock:
+            resume_id = random.choice(self.resume_ids)
+        started = time.perf_counter()
+        try:
+            response = self.http.post(f"{self.base_url}/api/submit-responses", json={
+                'resume_id': resume_id,
+                'responses': [{
+                    'question': f"Benchmark question {i + 1}",
+                    'response': f"Benchmark answer {index}.{i} " + 'lorem ipsum ' * 40,
+                    'audio': None
+                } for i in range(4)]
+            })
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        self.recorder.record('submit_responses', started, ok)
+
+    def transcribe(self, index):
+        """Stream synthetic PCM through /ws/transcribe and measure transcript lag"""
+        started = time.perf_counter()
+        try:
+            ws = websocket.create_connection(f"{self.ws_url}?sample_rate={SAMPLE_RATE}", timeout=10)
+        except Exception:
+            self.recorder.record('ws_transcribe_connect', started, ok=False)
+            return
+        self.recorder.record('ws_transcribe_connect', started)
+
+        sent_offsets = []
+        sent_times = []
+        state = {'ok': True, 'first': True, 'heard': 0, 'final': None}
+        caught_up = threading.Event()
+
+        def read_transcripts():
+            while True:
+                try:
+                    message = json.loads(ws.recv())
+                except Exception:
+                    caught_up.set()  # socket closed; nothing more will arrive
+                    return
+                if 'error' in message:
+                    state['ok'] = False
+                    caught_up.set()
+                    return
+                if 'audio_bytes' not in message:
+                    continue
+                now = time.perf_counter()
+                if state['first']:
+                    self.recorder.record('ws_transcribe_first_transcript', sent_times[0], finished=now)
+                    state['first'] = False
+                # Lag between sending the last byte this transcript covers and receiving it
+                position = bisect.bisect_left(sent_offsets, message['audio_bytes'])
+                if position < len(sent_times) and not self.gated:
+                    self.recorder.record('ws_transcribe_transcript_lag', sent_times[position], finished=now)
+                state['heard'] = max(state['heard'], message['audio_bytes'])
+                if state['final'] is not None and state['heard'] >= state['final']:
+                    caught_up.set()
+
+        reader = threading.Thread(target=read_transcripts, daemon=True)
+        reader.start()
+
+        rng = random.Random(index)
+        frame_seconds = FRAME_SAMPLES / SAMPLE_RATE
+        frames = max(1, int(self.session_seconds / frame_seconds))
+        session_started = time.perf_counter()
+        total = 0
+        try:
+            for i in range(frames):
+                if self.audio:
+                    start = (index * FRAME_SAMPLES * 2 * 7 + i * FRAME_SAMPLES * 2) % len(self.audio)
+                    frame = (self.audio[start:] + self.audio)[:FRAME_SAMPLES * 2]
+                else:
+                    frame = rng.randbytes(FRAME_SAMPLES * 2)
+                total += len(frame)
+                sent_offsets.append(total)
+                sent_times.append(time.perf_counter())
+                ws.send_binary(frame)
+                if self.realtime:
+                    time.sleep(max(0.0, session_started + (i + 1) * frame_seconds - time.perf_counter()))
+            ws.send(json.dumps({'type': 'stop'}))
+            with self._lock:
+                self.sent_audio_bytes += total
+            # Wait until the transcript covers the last frame (the relay flushes it on stop)
+            state['final'] = total
+            if state['heard'] >= total:
+                caught_up.set()
+            caught_up.wait(timeout=1 if self.gated else 5)
+        except Exception:
+            state['ok'] = False
+        finally:
+            ws.close()
+            reader.join(timeout=1)
+        self.recorder.record('ws_transcribe_session', session_started,
+                             state['ok'] and (self.gated or state['heard'] >= total))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_app(workdir, env, server):
+    """Launch the app in a subprocess (gunicorn + gevent like the Procfile when available)"""
+    port = free_port()
+    if server == 'auto':
+        server = 'gunicorn' if importlib.util.find_spec('gunicorn') else 'werkzeug'
+
+    if server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-k', 'gevent', '-w', '1',
+                   '--pythonpath', APP_DIR, '--bind', f"127.0.0.1:{port}", 'app:create_app()']
+    else:
+        command = [sys.executable, '-c', WERKZEUG_SERVER, APP_DIR, str(port)]
+
+    log_path = os.path.join(workdir, 'app.log')
+    log = open(log_path, 'w')
+    # Schema setup is a separate step (the Procfile's release phase), not part of startup
+    subprocess.run([sys.executable, '-m', 'flask', '--app', os.path.join(APP_DIR, 'app.py'), 'db', 'upgrade'],
+                   cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT, check=True)
+    process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited during startup, see {log_path}")
+        try:
+            requests.get(base_url + '/', timeout=1)
+            return process, base_url, server, log_path
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"App did not start within 60s, see {log_path}")
+
+
+def generate_resumes(workdir, extra_pages, per_size):
+    """Write unique synthetic resumes (so the question cache never hides generation cost)"""
+    resumes = []
+    for extra in extra_pages:
+        for i in range(per_size):
+            path = os.path.join(workdir, f"resume_{extra}x_{i}.pdf")
+            create_resume_pdf(path, extra_pages=extra, name=f"CANDIDATE {extra}-{i}", seed=extra * 1000 + i)
+            resumes.append((path, len(PyPDF2.PdfReader(path).pages)))
+    return resumes
+
+
+def scrape_server_metrics(base_url):
+    """Summarize the app's /metrics histograms as count and mean per series, plus counter totals"""
+    try:
+        body = requests.get(base_url + '/metrics', timeout=5).text
+    except requests.RequestException:
+        return {}
+    series = defaultdict(dict)
+    counters = {}
+    for line in body.splitlines():
+        if line.startswith('#') or not line.strip():
+            continue
+        name, value = line.rsplit(' ', 1)
+        if name.partition('{')[0].endswith('_total'):
+            counters[name] = {'total': float(value)}
+            continue
+        for suffix in ('_sum', '_count'):
+            base, _, labels = name.partition('{')
+            if base.endswith(suffix):
+                key = base[:-len(suffix)] + ('{' + labels if labels else '')
+                series[key][suffix[1:]] = float(value)
+    summary = {
+        key: {'count': int(values['count']), 'mean_ms': round(values['sum'] / values['count'] * 1000, 2)}
+        for key, values in sorted(series.items())
+        if values.get('count')
+    }
+    summary.update((name, total) for name, total in sorted(counters.items()) if total['total'])
+    return summary
+
+
+def compare(results, baseline, max_regression):
+    """Per-endpoint change against a previous report; returns (comparison, regressed endpoints)"""
+    comparison = {}
+    regressed = []
+    for endpoint, current in results.items():
+        previous = baseline.get('results', {}).get(endpoint)
+        if not previous:
+            continue
+        change = {}
+        for field in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps'):
+            if previous.get(field) and current.get(field) is not None:
+                change[f"{field}_change_pct"] = round((current[field] - previous[field]) / previous[field] * 100, 1)
+        comparison[endpoint] = change
+        if max_regression is not None and change.get('p95_ms_change_pct', 0) > max_regression:
+            regressed.append(endpoint)
+    return comparison, regressed
+
+
+def print_table(results, stream=sys.stderr):
+    print(f"{'endpoint':<36}{'n':>6}{'err':>5}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}", file=stream)
+    for endpoint, r in results.items():
+        print(f"{endpoint:<36}{r['requests']:>6}{r['errors']:>5}{r['throughput_rps'] or 0:>9.2f}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}", file=stream)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Offline load test using local Gemini and ElevenLabs stubs')
+    parser.add_argument('--uploads', type=int, default=24, help='resume uploads (alternating sync and streaming)')
+    parser.add_argument('--upload-concurrency', type=int, default=4)
+    parser.add_argument('--submissions', type=int, default=100)
+    parser.add_argument('--submit-concurrency', type=int, default=8)
+    parser.add_argument('--sessions', type=int, default=8, help='transcription sessions')
+    parser.add_argument('--session-concurrency', type=int, default=4)
+    parser.add_argument('--session-seconds', type=float, default=3.0, help='audio streamed per session')
+    parser.add_argument('--no-realtime', action='store_true', help='send audio as fast as possible instead of at 1x')
+    parser.add_argument('--pcm-fixture', help='16 kHz mono PCM16 WAV streamed by every session instead of random bytes')
+    parser.add_argument('--vad', action='store_true',
+                        help='enable the silence gate (streams a synthetic speech fixture unless --pcm-fixture is given)')
+    parser.add_argument('--extra-pages', default='0,2,8,20', help='comma-separated extra pages per synthetic resume size')
+    parser.add_argument('--resumes-per-size', type=int, default=3)
+    parser.add_argument('--gemini-latency-ms', type=float, default=400)
+    parser.add_argument('--gemini-jitter-ms', type=float, default=150)
+    parser.add_argument('--gemini-error-rate', type=float, default=0.05)
+    parser.add_argument('--stt-latency-ms', type=float, default=80)
+    parser.add_argument('--stt-jitter-ms', type=float, default=20)
+    parser.add_argument('--stt-error-rate', type=float, default=0.0)
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'werkzeug'], default='auto')
+    parser.add_argument('--question-cache', action='store_true', help='leave the question cache enabled')
+    parser.add_argument('--rate-limits', action='store_true',
+                        help='keep the per-client rate limits (every benchmark request comes from one address)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='previous JSON report to compare against')
+    parser.add_argument('--max-regression', type=float, help='exit 1 if any p95 grows by more than this percent')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)
+    workdir = tempfile.mkdtemp(prefix='interview-prep-bench-')
+
+    print(f"Generating synthetic resumes in {workdir}", file=sys.stderr)
+    extra_pages = [int(n) for n in args.extra_pages.split(',') if n.strip()]
+    resumes = generate_resumes(workdir, extra_pages, args.resumes_per_size)
+
+    audio = None
+    if args.pcm_fixture:
+        with wave.open(args.pcm_fixture, 'rb') as fixture:
+            audio = fixture.readframes(fixture.getnframes())
+    elif args.vad:
+        audio, _ = synthesize_speech(max(args.session_seconds, 20.0), seed=args.seed)
+        write_wav(os.path.join(workdir, 'speech.wav'), audio)
+
+    gemini = GeminiStub(args.gemini_latency_ms, args.gemini_jitter_ms, args.gemini_error_rate, seed=args.seed).start()
+    elevenlabs = ElevenLabsStub(args.stt_latency_ms, args.stt_jitter_ms, args.stt_error_rate, seed=args.seed).start()
+
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        GEMINI_API_KEY='benchmark',
+        GEMINI_API_BASE_URL=gemini.base_url,
+        ELEVENLABS_API_KEY='benchmark',
+        ELEVENLABS_REALTIME_URL=elevenlabs.url,
+        QUESTION_CACHE_ENABLED='true' if args.question_cache else 'false',
+        TRANSCRIBE_VAD_ENABLED='true' if args.vad else 'false'
+    )
+    if not args.rate_limits:
+        env.update(UPLOAD_RATE_PER_MINUTE='0', TRANSCRIBE_RATE_PER_MINUTE='0')
+    process, base_url, server, log_path = start_app(workdir, env, args.server)
+    print(f"App ({server}) listening on {base_url}, log at {log_path}", file=sys.stderr)
+
+    recorder = Recorder()
+    bench = Benchmark(base_url, resumes, recorder, args.session_seconds, realtime=not args.no_realtime,
+                      audio=audio, gated=args.vad)
+    try:
+        # Warm up connection pools and make sure submissions have a resume to point at
+        bench.upload(0)
+        recorder = bench.recorder = Recorder()
+        if not bench.resume_ids:
+            raise RuntimeError(f"Warm-up upload failed, see {log_path}")
+
+        started = time.perf_counter()
+        pools = [
+            ThreadPoolExecutor(args.upload_concurrency),
+            ThreadPoolExecutor(args.submit_concurrency),
+            ThreadPoolExecutor(args.session_concurrency)
+        ]
+        futures = [pools[0].submit(bench.upload, i, i % 2 == 1) for i in range(args.uploads)]
+        futures += [pools[1].submit(bench.submit, i) for i in range(args.submissions)]
+        futures += [pools[2].submit(bench.transcribe, i) for i in range(args.sessions)]
+        wait(futures)
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+        server_metrics = scrape_server_metrics(base_url)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        gemini.stop()
+        elevenlabs.stop()
+
+    results = recorder.summary()
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'config': dict(vars(args), server=server, resume_pages=sorted({pages for _, pages in resumes})),
+        'elapsed_seconds': round(elapsed, 3),
+        'results': results,
+        'server_metrics': server_metrics,
+        'stubs': {
+            'gemini': {'requests': gemini.requests, 'injected_errors': gemini.errors},
+            'elevenlabs': {'sessions': elevenlabs.sessions, 'chunks': elevenlabs.chunks, 'audio_bytes': elevenlabs.audio_bytes,
+                           'sent_audio_bytes': bench.sent_audio_bytes}
+        }
+    }
+
+    regressed = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['comparison'], regressed = compare(results, json.load(f), args.max_regression)
+
+    print_table(results)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if regressed:
+        print(f"p95 regressed by more than {args.max_regression}%: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
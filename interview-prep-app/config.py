@@ -20,14 +20,144 @@ class Config:
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Engine tuning profile (db_profiles.py): 'sqlite' (WAL, synchronous, busy timeout PRAGMAs),
+    # 'postgres' (connection pool settings), 'default' (SQLAlchemy defaults) or 'auto' to pick by URL
+    DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'auto').lower()
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))  # per process
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT_SECONDS = float(os.environ.get('DB_POOL_TIMEOUT_SECONDS', 10))
+    DB_POOL_RECYCLE_SECONDS = int(os.environ.get('DB_POOL_RECYCLE_SECONDS', 1800))
+    
+    # Group commit: resume and response inserts arriving within GROUP_COMMIT_WINDOW_MS of each
+    # other are committed in one transaction (up to GROUP_COMMIT_MAX_BATCH writes)
+    GROUP_COMMIT_ENABLED = os.environ.get('GROUP_COMMIT_ENABLED', 'false').lower() == 'true'
+    GROUP_COMMIT_WINDOW_MS = float(os.environ.get('GROUP_COMMIT_WINDOW_MS', 5))
+    GROUP_COMMIT_MAX_BATCH = int(os.environ.get('GROUP_COMMIT_MAX_BATCH', 64))
+    
     # File upload configuration
     UPLOAD_FOLDER = 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'pdf'}
     
+    # PDF extraction budgets
+    PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 50))
+    PDF_TIME_BUDGET_SECONDS = float(os.environ.get('PDF_TIME_BUDGET_SECONDS', 10))
+    PDF_EARLY_STOP_CHARS = int(os.environ.get('PDF_EARLY_STOP_CHARS', 0))  # 0 extracts every page
+    PDF_PARALLEL_WORKERS = int(os.environ.get('PDF_PARALLEL_WORKERS', 2))  # process pool size, <= 1 disables
+    PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 8))
+    PDF_EXTRACT_IN_POOL = os.environ.get('PDF_EXTRACT_IN_POOL', 'false').lower() == 'true'  # parse every PDF off the web process
+    
+    # Resume listing pagination (GET /api/resumes)
+    RESUMES_PAGE_SIZE = int(os.environ.get('RESUMES_PAGE_SIZE', 50))
+    RESUMES_MAX_PAGE_SIZE = int(os.environ.get('RESUMES_MAX_PAGE_SIZE', 200))
+    
+    # Batch uploads (POST /api/upload-resumes): many PDFs or one zip archive per request
+    BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 50))
+    BATCH_MAX_UNCOMPRESSED_BYTES = int(os.environ.get('BATCH_MAX_UNCOMPRESSED_BYTES', 64 * 1024 * 1024))
+    BATCH_RESUMES_PER_PROMPT = int(os.environ.get('BATCH_RESUMES_PER_PROMPT', 5))  # resumes packed into one Gemini call
+    
+    # Asynchronous upload jobs (POST /api/upload-resume?mode=async)
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))  # 0: web processes only enqueue, `flask run-jobs` runs jobs
+    JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', 20))
+    JOB_EVENTS_POLL_INTERVAL = float(os.environ.get('JOB_EVENTS_POLL_INTERVAL', 0.5))
+    JOB_EVENTS_TIMEOUT = int(os.environ.get('JOB_EVENTS_TIMEOUT', 120))
+    JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', 300))  # a claimed job is retried once this lapses
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))  # claims before an unfinished job is failed
+    JOB_POLL_INTERVAL_SECONDS = float(os.environ.get('JOB_POLL_INTERVAL_SECONDS', 1.0))  # `flask run-jobs` polling
+    
+    # Scale-out: 'database' shares circuit breaker state and cache counters between
+    # every worker on every node through the app database ('local' keeps them per process)
+    SHARED_STATE_BACKEND = os.environ.get('SHARED_STATE_BACKEND', 'local').lower()
+    
+    # Admission control: per-client token buckets (RATE_PER_MINUTE refill, RATE_BURST size; 429 when empty)
+    # and per-process caps on requests in progress with a bounded wait queue (503 when full or timed out).
+    # 0 turns a rate or cap off. Uploads share one group (/api/upload-resume, /api/upload-resumes).
+    UPLOAD_RATE_PER_MINUTE = float(os.environ.get('UPLOAD_RATE_PER_MINUTE', 10))
+    UPLOAD_RATE_BURST = int(os.environ.get('UPLOAD_RATE_BURST', 5))
+    UPLOAD_MAX_CONCURRENCY = int(os.environ.get('UPLOAD_MAX_CONCURRENCY', 8))
+    UPLOAD_QUEUE_SIZE = int(os.environ.get('UPLOAD_QUEUE_SIZE', 16))
+    UPLOAD_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('UPLOAD_QUEUE_TIMEOUT_SECONDS', 10))
+    TRANSCRIBE_RATE_PER_MINUTE = float(os.environ.get('TRANSCRIBE_RATE_PER_MINUTE', 6))
+    TRANSCRIBE_RATE_BURST = int(os.environ.get('TRANSCRIBE_RATE_BURST', 3))
+    TRANSCRIBE_MAX_CONCURRENCY = int(os.environ.get('TRANSCRIBE_MAX_CONCURRENCY', 50))  # open /ws/transcribe sessions
+    TRANSCRIBE_QUEUE_SIZE = int(os.environ.get('TRANSCRIBE_QUEUE_SIZE', 10))
+    TRANSCRIBE_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('TRANSCRIBE_QUEUE_TIMEOUT_SECONDS', 5))
+    # Clients are told apart by address; set to the number of reverse proxies in front of the app
+    # so the address is taken from X-Forwarded-For (werkzeug ProxyFix)
+    TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 0))
+    
     # Google Gemini API configuration
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
-    GEMINI_MODEL = 'gemini-pro'
+    GEMINI_MODEL = os.environ.get('GEMINI_MODEL') or 'gemini-2.5-flash'
+    GEMINI_API_BASE_URL = os.environ.get('GEMINI_API_BASE_URL') or 'https://generativelanguage.googleapis.com/v1beta'
+    GEMINI_TIMEOUT_SECONDS = float(os.environ.get('GEMINI_TIMEOUT_SECONDS', 30))
+    GEMINI_MAX_RETRIES = int(os.environ.get('GEMINI_MAX_RETRIES', 2))
+    GEMINI_BACKOFF_BASE_SECONDS = float(os.environ.get('GEMINI_BACKOFF_BASE_SECONDS', 0.5))
+    GEMINI_BACKOFF_MAX_SECONDS = float(os.environ.get('GEMINI_BACKOFF_MAX_SECONDS', 8))
+    GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', 8))
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('GEMINI_CIRCUIT_FAILURE_THRESHOLD', 5))
+    GEMINI_CIRCUIT_RESET_SECONDS = float(os.environ.get('GEMINI_CIRCUIT_RESET_SECONDS', 30))
+    
+    # Bump whenever the question prompt changes so cached questions are regenerated
+    PROMPT_VERSION = 'v2'
+    
+    # Resume text is condensed to this many (estimated) tokens per prompt; 0 sends it whole
+    RESUME_TOKEN_BUDGET = int(os.environ.get('RESUME_TOKEN_BUDGET', 400))
+    
+    # Latency SLO: if Gemini hasn't answered this many seconds after an upload, return
+    # questions built locally from the resume instead (0 always waits for Gemini)
+    QUESTION_DEADLINE_SECONDS = float(os.environ.get('QUESTION_DEADLINE_SECONDS', 0))
+    # Replace those local questions on the stored resume once the late Gemini answer arrives
+    QUESTION_WRITE_BACK = os.environ.get('QUESTION_WRITE_BACK', 'false').lower() == 'true'
+    
+    # Generated question cache (keyed by resume text + model + prompt version)
+    QUESTION_CACHE_ENABLED = os.environ.get('QUESTION_CACHE_ENABLED', 'true').lower() == 'true'
+    QUESTION_CACHE_TTL_SECONDS = int(os.environ.get('QUESTION_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+    QUESTION_CACHE_MAX_ENTRIES = int(os.environ.get('QUESTION_CACHE_MAX_ENTRIES', 5000))
+    
+    # ElevenLabs realtime speech-to-text (scribe_v2_realtime, configured via query params)
+    ELEVENLABS_API_KEY = os.environ.get('ELEVENLABS_API_KEY')
+    ELEVENLABS_REALTIME_URL = os.environ.get('ELEVENLABS_REALTIME_URL') or \
+        'wss://api.elevenlabs.io/v1/speech-to-text/realtime?model_id=scribe_v2_realtime&language_code=en'
+    
+    # Real-time transcription relay: browser PCM frames are coalesced into
+    # upstream chunks of this many bytes, or sent after this many milliseconds
+    TRANSCRIBE_CHUNK_BYTES = int(os.environ.get('TRANSCRIBE_CHUNK_BYTES', 16000))
+    TRANSCRIBE_CHUNK_MS = int(os.environ.get('TRANSCRIBE_CHUNK_MS', 250))
+    TRANSCRIBE_SEND_QUEUE_SIZE = int(os.environ.get('TRANSCRIBE_SEND_QUEUE_SIZE', 32))  # upstream chunks per socket
+    TRANSCRIBE_SEND_TIMEOUT_SECONDS = float(os.environ.get('TRANSCRIBE_SEND_TIMEOUT_SECONDS', 2))
+    TRANSCRIBE_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('TRANSCRIBE_CONNECT_TIMEOUT_SECONDS', 5))
+    RECORDING_BUFFER_BYTES = int(os.environ.get('RECORDING_BUFFER_BYTES', 64 * 1024))  # WAV tee write buffer
+    
+    # Committed transcripts are kept server-side; changed ones are written together this often
+    TRANSCRIPT_FLUSH_SECONDS = float(os.environ.get('TRANSCRIPT_FLUSH_SECONDS', 2))
+    
+    # Serve .css/.js from /assets/ under content-hashed names, gzip/brotli precompressed and cached
+    # as immutable (static_assets.py); templates link them with asset_url(). Off in debug mode.
+    # `flask build-assets` writes them to ASSET_BUILD_DIR; until it has run, /static/ is linked
+    ASSET_PIPELINE_ENABLED = os.environ.get('ASSET_PIPELINE_ENABLED', 'true').lower() == 'true'
+    ASSET_BUILD_DIR = os.environ.get('ASSET_BUILD_DIR') or os.path.join(BASE_DIR, 'instance', 'assets')
+    
+    # Request profiling (profiling.py): a request carrying X-Profile: <PROFILING_TOKEN>, or picked at
+    # PROFILING_SAMPLE_RATE (0-1), is profiled and its dump kept in PROFILING_DIR (newest PROFILING_MAX_DUMPS).
+    # PROFILING_MODE 'cprofile' writes pstats; 'sample' writes collapsed stacks every PROFILING_SAMPLE_INTERVAL_MS
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')  # also guards /api/profiles; unset turns the header off
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+    PROFILING_MODE = os.environ.get('PROFILING_MODE', 'cprofile').lower()
+    PROFILING_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILING_SAMPLE_INTERVAL_MS', 5))
+    PROFILING_DIR = os.environ.get('PROFILING_DIR') or os.path.join(BASE_DIR, 'instance', 'profiles')
+    PROFILING_MAX_DUMPS = int(os.environ.get('PROFILING_MAX_DUMPS', 100))
+    
+    # Voice activity gate: keep silence (frames below the RMS threshold) from reaching ElevenLabs,
+    # passing PADDING_MS before and HANGOVER_MS after speech so words aren't clipped
+    TRANSCRIBE_VAD_ENABLED = os.environ.get('TRANSCRIBE_VAD_ENABLED', 'false').lower() == 'true'
+    TRANSCRIBE_VAD_THRESHOLD_DBFS = float(os.environ.get('TRANSCRIBE_VAD_THRESHOLD_DBFS', -45))
+    TRANSCRIBE_VAD_FRAME_MS = int(os.environ.get('TRANSCRIBE_VAD_FRAME_MS', 20))
+    TRANSCRIBE_VAD_HANGOVER_MS = int(os.environ.get('TRANSCRIBE_VAD_HANGOVER_MS', 600))
+    TRANSCRIBE_VAD_PADDING_MS = int(os.environ.get('TRANSCRIBE_VAD_PADDING_MS', 200))
     
     # Session configuration
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
@@ -0,0 +1,53 @@
+import random
+import sys
+import wave
+
+SAMPLE_RATE = 16000
+
+
+def synthesize_speech(seconds=20.0, sample_rate=SAMPLE_RATE, seed=1, speech_dbfs=-20.0, noise_dbfs=-60.0):
+    """Mono PCM16 that alternates speech-like bursts with thinking pauses
+
+    Bursts are voiced harmonics with a syllable-rate envelope; pauses are
+    low-level room noise. Returns (pcm, speech_seconds).
+    """
+    import numpy as np
+
+    rng = random.Random(seed)
+    noise = np.random.default_rng(seed)
+    segments = []
+    speech_seconds = 0.0
+    total = 0.0
+    speaking = False
+    while total < seconds:
+        length = min(rng.uniform(0.6, 3.0) if speaking else rng.uniform(0.4, 4.0), seconds - total)
+        t = np.arange(int(length * sample_rate)) / sample_rate
+        signal = noise.normal(0, 32768 * 10 ** (noise_dbfs / 20), len(t))
+        if speaking:
+            pitch = rng.uniform(100, 220)
+            voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+            syllables = 0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3, 5) * t)
+            voice *= syllables * 32768 * 10 ** (speech_dbfs / 20) / np.sqrt(np.mean(voice ** 2))
+            signal += voice
+            speech_seconds += length
+        segments.append(signal)
+        total += length
+        speaking = not speaking
+    pcm = np.clip(np.concatenate(segments), -32768, 32767).astype('<i2').tobytes()
+    return pcm, speech_seconds
+
+
+def write_wav(path, pcm, sample_rate=SAMPLE_RATE):
+    with wave.open(path, 'wb') as recording:
+        recording.setnchannels(1)
+        recording.setsampwidth(2)
+        recording.setframerate(sample_rate)
+        recording.writeframes(pcm)
+
+
+if __name__ == '__main__':
+    # python create_sample_speech.py out.wav [seconds]
+    output = sys.argv[1] if len(sys.argv) > 1 else 'sample_speech.wav'
+    pcm, speech_seconds = synthesize_speech(float(sys.argv[2]) if len(sys.argv) > 2 else 20.0)
+    write_wav(output, pcm)
+    print(f"Created {output}: {len(pcm) / (2 * SAMPLE_RATE):.1f}s of audio, {speech_seconds:.1f}s of it speech")
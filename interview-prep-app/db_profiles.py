@@ -0,0 +1,61 @@
+from sqlalchemy import event
+from models import db
+
+PROFILES = ('default', 'sqlite', 'postgres')
+
+
+def resolve_profile(config):
+    """The engine profile named by DATABASE_PROFILE; 'auto' picks one from the database URL"""
+    profile = config['DATABASE_PROFILE']
+    if profile == 'auto':
+        uri = config['SQLALCHEMY_DATABASE_URI']
+        if uri.startswith('sqlite'):
+            return 'sqlite'
+        if uri.startswith('postgresql'):
+            return 'postgres'
+        return 'default'
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown DATABASE_PROFILE {profile!r} (expected 'auto' or one of {', '.join(PROFILES)})")
+    return profile
+
+
+def engine_options(profile, config):
+    """SQLAlchemy create_engine() options for a profile"""
+    if profile == 'postgres':
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT_SECONDS'],
+            'pool_recycle': config['DB_POOL_RECYCLE_SECONDS'],
+            'pool_pre_ping': True  # drop connections the server or a proxy closed while idle
+        }
+    return {}
+
+
+def sqlite_pragmas(config):
+    return {
+        'journal_mode': config['SQLITE_JOURNAL_MODE'],
+        'synchronous': config['SQLITE_SYNCHRONOUS'],
+        'busy_timeout': config['SQLITE_BUSY_TIMEOUT_MS']
+    }
+
+
+def configure_engine(app, profile):
+    """Apply per-connection settings a profile can't express as engine options
+
+    The sqlite profile sets its PRAGMAs on every new connection: WAL lets readers
+    run alongside the writer, synchronous=NORMAL only fsyncs the WAL at
+    checkpoints, and busy_timeout waits for the write lock instead of failing.
+    """
+    if profile != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(app.config)
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
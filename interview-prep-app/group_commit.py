@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from flask import current_app
+from models import db
+from metrics import GROUP_COMMIT_BATCH_SIZE, GROUP_COMMIT_FALLBACKS
+
+
+def _insert(writes):
+    """Add and flush the rows built by writes in the current transaction; returns their ids
+
+    Each write is (build, after): build() returns a new ORM object, and every
+    distinct after is called once with all of this batch's objects that named it.
+    """
+    rows = [build() for build, _ in writes]
+    db.session.add_all(rows)
+    db.session.flush()
+    batches = {}
+    for (_, after), row in zip(writes, rows):
+        if after is not None:
+            batches.setdefault(after, []).append(row)
+    for after, batch in batches.items():
+        after(batch)
+    return [row.id for row in rows]
+
+
+class GroupCommitWriter:
+    """Commits concurrent inserts from many requests in one transaction (one commit, one fsync)
+
+    insert() hands a write to a writer thread and waits. The thread collects
+    every write that arrives within window seconds of the first (up to
+    max_batch), runs them in its own session and commits once. If the batch
+    fails, each write is retried in its own transaction so one bad write fails
+    alone. build and after run in the writer's app context and session, so they
+    must not touch objects loaded by the request's session.
+    """
+
+    def __init__(self, app, window=0.005, max_batch=64):
+        self.app = app
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def insert(self, build, after=None):
+        """Insert build()'s object in the next group transaction; returns its id once committed"""
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._thread.start()
+        self._queue.put(((build, after), future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            GROUP_COMMIT_BATCH_SIZE.observe(len(batch))
+            self._commit(batch)
+
+    def _commit(self, batch):
+        with self.app.app_context():
+            try:
+                ids = _insert([write for write, _ in batch])
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    return
+                GROUP_COMMIT_FALLBACKS.inc()
+                print(f"WARNING: Group commit of {len(batch)} writes failed, retrying one by one: {str(e)}")
+                for write, future in batch:
+                    try:
+                        [row_id] = _insert([write])
+                        db.session.commit()
+                    except Exception as e:
+                        db.session.rollback()
+                        future.set_exception(e)
+                    else:
+                        future.set_result(row_id)
+                return
+        for (_, future), row_id in zip(batch, ids):
+            future.set_result(row_id)
+
+
+def insert_row(build, after=None):
+    """Insert build()'s object and commit, through the group commit writer when enabled; returns its id
+
+    after, if given, is called with a list of the inserted objects before the
+    commit (all of a group's objects at once), e.g. to derive rows from them.
+    """
+    writer = current_app.extensions.get('group_commit')
+    if writer is not None:
+        return writer.insert(build, after)
+    [row_id] = _insert([(build, after)])
+    db.session.commit()
+    return row_id
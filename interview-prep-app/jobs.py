@@ -0,0 +1,240 @@
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, or_
+from models import db, UploadJob
+
+
+class JobQueueFull(Exception):
+    """Raised when the worker pool already has its maximum number of pending jobs"""
+
+
+def set_job_status(job, status, **fields):
+    """Persist a job stage transition so pollers (and restarts) can see it
+
+    Each transition also renews the processing worker's lease on the job.
+    """
+    job.status = status
+    for name, value in fields.items():
+        setattr(job, name, value)
+    if job.claimed_by and not job.finished:
+        job.lease_expires_at = datetime.utcnow() + timedelta(seconds=current_app.config['JOB_LEASE_SECONDS'])
+    db.session.commit()
+
+
+class JobQueue:
+    """Bounded worker pool that runs resume processing jobs stored in the database
+
+    Several processes (web workers or `flask run-jobs` workers, on any node) may
+    share one database: a job is processed by whichever worker claims it first,
+    and is claimable again once that worker's lease lapses.
+    With max_workers=0 the queue only records jobs for another process to run.
+    """
+
+    def __init__(self, app, handler, max_workers=2, max_pending=20):
+        self.app = app
+        self.handler = handler
+        self.max_pending = max_pending
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upload-job') \
+            if max_workers > 0 else None
+        self._pending = 0
+        self._queued = set()
+        self._resumed = False
+        self._lock = threading.Lock()
+
+    def create(self, filename, data):
+        """Record a new queued job holding the uploaded PDF bytes and hand it to the pool
+
+        The pool slot is reserved first, so a full pool (JobQueueFull) stores nothing.
+        """
+        reserved = self._reserve()
+        try:
+            job = UploadJob(
+                id=uuid.uuid4().hex,
+                status=UploadJob.STATUS_QUEUED,
+                filename=filename,
+                file_data=data
+            )
+            db.session.add(job)
+            db.session.commit()
+        except Exception:
+            if reserved:
+                self._release(None)
+            raise
+        if reserved:
+            self._start(job.id)
+        return job
+
+    def submit(self, job_id):
+        if self._reserve():
+            self._start(job_id)
+
+    def _reserve(self):
+        """Take a pending slot (JobQueueFull if none is left); False when this process doesn't run jobs"""
+        if self._executor is None:
+            return False
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull('Too many resumes are being processed, please retry shortly')
+            self._pending += 1
+        return True
+
+    def _start(self, job_id):
+        with self._lock:
+            self._queued.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def _release(self, job_id):
+        with self._lock:
+            self._pending -= 1
+            self._queued.discard(job_id)
+
+    def _claim(self, job_id):
+        """Atomically take an unfinished job that is unclaimed or whose lease has lapsed"""
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            db.update(UploadJob)
+            .where(
+                UploadJob.id == job_id,
+                UploadJob.status.notin_(UploadJob.FINISHED_STATUSES),
+                or_(UploadJob.claimed_by.is_(None), UploadJob.lease_expires_at < now),
+                UploadJob.attempts < self.app.config['JOB_MAX_ATTEMPTS']
+            )
+            .values(
+                claimed_by=self.worker_id,
+                lease_expires_at=now + timedelta(seconds=self.app.config['JOB_LEASE_SECONDS']),
+                attempts=UploadJob.attempts + 1
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return claimed == 1
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            try:
+                if not self._claim(job_id):
+                    return
+                job = db.session.get(UploadJob, job_id)
+                if job.file_data is None and not (job.file_path and os.path.exists(job.file_path)):
+                    set_job_status(job, UploadJob.STATUS_FAILED, error='Uploaded file was lost during a restart')
+                    return
+                resume_id = self.handler(job)
+                set_job_status(job, UploadJob.STATUS_COMPLETED, resume_id=resume_id)
+            except Exception as e:
+                print(f"ERROR in upload job {job_id}: {str(e)}")
+                traceback.print_exc()
+                db.session.rollback()
+                job = db.session.get(UploadJob, job_id)
+                if job is not None and job.claimed_by == self.worker_id:
+                    set_job_status(job, UploadJob.STATUS_FAILED, error=str(e))
+            finally:
+                job = db.session.get(UploadJob, job_id)
+                if job is not None and job.finished and job.claimed_by == self.worker_id:
+                    # Release the claim and drop the upload now that nothing will read it again
+                    set_job_status(job, job.status, file_data=None, claimed_by=None, lease_expires_at=None)
+                    if job.file_path and os.path.exists(job.file_path):
+                        os.remove(job.file_path)
+                db.session.remove()
+                self._release(job_id)
+
+    def _claimable(self):
+        # Unfinished jobs nobody holds: never claimed, or abandoned by a worker whose lease lapsed
+        return and_(
+            UploadJob.status.notin_(UploadJob.FINISHED_STATUSES),
+            or_(UploadJob.claimed_by.is_(None), UploadJob.lease_expires_at < datetime.utcnow())
+        )
+
+    def _claimable_job_ids(self):
+        return db.session.execute(
+            db.select(UploadJob.id)
+            .where(self._claimable(), UploadJob.attempts < self.app.config['JOB_MAX_ATTEMPTS'])
+            .order_by(UploadJob.created_at.asc())
+        ).scalars().all()
+
+    def _fail_exhausted(self):
+        """Fail abandoned jobs that were already claimed JOB_MAX_ATTEMPTS times"""
+        max_attempts = self.app.config['JOB_MAX_ATTEMPTS']
+        failed = db.session.execute(
+            db.update(UploadJob)
+            .where(self._claimable(), UploadJob.attempts >= max_attempts)
+            .values(
+                status=UploadJob.STATUS_FAILED,
+                error=f'Job was interrupted {max_attempts} times and gave up',
+                file_data=None,
+                claimed_by=None,
+                lease_expires_at=None
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return failed
+
+    def submit_claimable(self):
+        """Hand claimable jobs to the pool while it has room; returns (submitted, left waiting)
+
+        Jobs that don't fit stay queued for another worker or a later pass.
+        """
+        self._fail_exhausted()
+        waiting = [job_id for job_id in self._claimable_job_ids() if job_id not in self._queued]
+        submitted = 0
+        for job_id in waiting:
+            try:
+                self.submit(job_id)
+            except JobQueueFull:
+                break
+            submitted += 1
+        return submitted, len(waiting) - submitted
+
+    def resume_unfinished(self):
+        """Requeue jobs interrupted by a restart (or abandoned by a worker whose lease lapsed)"""
+        submitted, waiting = self.submit_claimable()
+        if submitted:
+            print(f"Resumed {submitted} unfinished upload jobs")
+        return waiting
+
+    def resume_unfinished_once(self):
+        """Run resume_unfinished on a background thread the first time this is called"""
+        if self._resumed or self._executor is None:
+            return
+        with self._lock:
+            if self._resumed:
+                return
+            self._resumed = True
+        threading.Thread(target=self._resume_in_background, name='upload-job-resume', daemon=True).start()
+
+    def _resume_in_background(self):
+        # Jobs the pool had no room for are retried until they're running here or claimed elsewhere
+        while True:
+            with self.app.app_context():
+                try:
+                    if not self.resume_unfinished():
+                        return
+                except Exception as e:
+                    print(f"ERROR resuming unfinished upload jobs: {str(e)}")
+                    traceback.print_exc()
+                    return
+                finally:
+                    db.session.remove()
+            time.sleep(self.app.config['JOB_POLL_INTERVAL_SECONDS'])
+
+    def run_forever(self, poll_interval=1.0):
+        """Poll the database for claimable jobs and run them (the `flask run-jobs` worker loop)"""
+        print(f"Upload job worker {self.worker_id} polling every {poll_interval}s")
+        while True:
+            with self.app.app_context():
+                try:
+                    self.submit_claimable()  # jobs beyond the pool's room wait for the next poll
+                except Exception as e:
+                    print(f"ERROR polling upload jobs: {str(e)}")
+                    traceback.print_exc()
+                finally:
+                    db.session.remove()
+            time.sleep(poll_interval)
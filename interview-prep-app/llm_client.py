@@ -0,0 +1,205 @@
+import json
+import random
+import threading
+import time
+from metrics import GEMINI_REQUEST_SECONDS, GEMINI_CIRCUIT_REJECTIONS
+from shared_state import LocalStore
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMClientError(Exception):
+    """Raised when the LLM API could not produce a response"""
+
+
+class CircuitOpenError(LLMClientError):
+    """Raised without calling the API while the circuit breaker is open"""
+
+
+class LLMBusyError(LLMClientError):
+    """Raised when every in-flight slot stayed busy for the whole timeout"""
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets one probe through per cool-down period
+
+    State lives in a shared store (see shared_state) so every worker sharing it
+    sees the same circuit; the default LocalStore keeps it to this process.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, store=None, key='gemini:circuit'):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.store = store if store is not None else LocalStore()
+        self._failures_key = f"{key}:failures"
+        self._opened_key = f"{key}:opened_at"
+
+    @property
+    def state(self):
+        opened_at = self.store.get(self._opened_key)
+        if opened_at is None:
+            return 'closed'
+        if time.time() - opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        opened_at = self.store.get(self._opened_key)
+        if opened_at is None:
+            return True
+        now = time.time()
+        if now - opened_at < self.reset_timeout:
+            return False
+        # Half-open: restart the cool-down so only the caller that wins this swap probes the API
+        return self.store.compare_and_set(self._opened_key, opened_at, now)
+
+    def record_success(self):
+        self.store.delete(self._failures_key, self._opened_key)
+
+    def record_failure(self):
+        if self.store.incr(self._failures_key) >= self.failure_threshold:
+            self.store.set(self._opened_key, time.time())
+
+
+class GeminiClient:
+    """Pooled Gemini REST client with retries, a circuit breaker and a concurrency cap"""
+
+    def __init__(self, api_key, model, base_url, timeout=30, max_retries=2,
+                 backoff_base=0.5, backoff_max=8, max_concurrency=8,
+                 failure_threshold=5, reset_timeout=30, store=None):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, store)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        # One keep-alive connection pool shared by every request (requests is
+        # imported here so loading this module stays cheap at startup)
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._transient_errors = (requests.ConnectionError, requests.Timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+
+    @classmethod
+    def from_config(cls, config, store=None):
+        return cls(
+            api_key=config['GEMINI_API_KEY'],
+            model=config['GEMINI_MODEL'],
+            base_url=config['GEMINI_API_BASE_URL'],
+            timeout=config['GEMINI_TIMEOUT_SECONDS'],
+            max_retries=config['GEMINI_MAX_RETRIES'],
+            backoff_base=config['GEMINI_BACKOFF_BASE_SECONDS'],
+            backoff_max=config['GEMINI_BACKOFF_MAX_SECONDS'],
+            max_concurrency=config['GEMINI_MAX_CONCURRENCY'],
+            failure_threshold=config['GEMINI_CIRCUIT_FAILURE_THRESHOLD'],
+            reset_timeout=config['GEMINI_CIRCUIT_RESET_SECONDS'],
+            store=store
+        )
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, honouring Retry-After when the API sends it"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, min(self.backoff_max, float(retry_after)))
+            except ValueError:
+                pass
+        time.sleep(delay)
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise LLMBusyError('Too many concurrent Gemini requests')
+
+        if not self.breaker.allow():
+            self._slots.release()
+            GEMINI_CIRCUIT_REJECTIONS.inc()
+            raise CircuitOpenError('Gemini circuit breaker is open')
+
+    def _request_body(self, prompt, generation_config):
+        return {
+            "contents": [{
+                "parts": [{
+                    "text": prompt
+                }]
+            }],
+            "generationConfig": generation_config or {}
+        }
+
+    def _post(self, method, data, params=None, stream=False):
+        """POST to models/<model>:<method>, retrying transient failures"""
+        url = f"{self.base_url}/models/{self.model}:{method}"
+        params = dict(params or {}, key=self.api_key)
+
+        last_error = None
+        retry_after = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._backoff(attempt - 1, retry_after)
+            retry_after = None
+
+            started = time.perf_counter()
+            try:
+                response = self.session.post(url, params=params, json=data, timeout=self.timeout, stream=stream)
+            except self._transient_errors as e:
+                GEMINI_REQUEST_SECONDS.observe(time.perf_counter() - started, method=method, status='error')
+                last_error = e
+                print(f"Gemini request failed (attempt {attempt + 1}): {str(e)}")
+                continue
+            GEMINI_REQUEST_SECONDS.observe(time.perf_counter() - started, method=method, status=response.status_code)
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                last_error = LLMClientError(f"Gemini returned {response.status_code}: {response.text[:200]}")
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+                print(f"Gemini request failed (attempt {attempt + 1}): HTTP {response.status_code}")
+                continue
+
+            if response.status_code != 200:
+                # Client errors won't improve on retry and say nothing about API health, so the breaker is left as is
+                response.raise_for_status()
+
+            self.breaker.record_success()
+            return response
+
+        self.breaker.record_failure()
+        raise LLMClientError(f"Gemini request failed after {self.max_retries + 1} attempts: {str(last_error)}")
+
+    def generate_content(self, prompt, generation_config=None):
+        """Call models/<model>:generateContent and return the decoded JSON response"""
+        self._acquire()
+        try:
+            return self._post('generateContent', self._request_body(prompt, generation_config)).json()
+        finally:
+            self._slots.release()
+
+    def stream_generate_content(self, prompt, generation_config=None):
+        """Yield text fragments from models/<model>:streamGenerateContent as they arrive"""
+        self._acquire()
+        try:
+            response = self._post(
+                'streamGenerateContent',
+                self._request_body(prompt, generation_config),
+                params={'alt': 'sse'},
+                stream=True
+            )
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    event = json.loads(line[len('data:'):])
+                    for candidate in event.get('candidates', [])[:1]:
+                        for part in candidate.get('content', {}).get('parts', []):
+                            if part.get('text'):
+                                yield part['text']
+            finally:
+                response.close()
+        finally:
+            self._slots.release()
@@ -0,0 +1,99 @@
+import hashlib
+import random
+from resume_condense import split_sections, build_keyword_index
+
+# Each template names the resume facts it needs; a template is only used when they exist
+PROJECT_TEMPLATES = [
+    "Walk me through the {project} project. What problem was it solving, and what was the hardest technical decision you made while building it with {technology}?",
+    "If you rebuilt {project} today, what would you change about its design, and why? How did {technology} shape the original approach?",
+]
+IMPACT_TEMPLATES = [
+    "Your resume mentions that you {achievement}. How did you approach that, and how did you measure the result?",
+    "Tell me more about how you {achievement}. What obstacles did you hit along the way, and how did you get past them?",
+]
+ROLE_TEMPLATES = [
+    "As {role} at {organization}, what was the most technically challenging problem you owned end to end? How did you solve it?",
+]
+TECHNOLOGY_TEMPLATES = [
+    "Tell me about a time {technology} didn't behave the way you expected in one of your projects. How did you debug it, and what did you change afterwards?",
+    "You list both {technology} and {other_technology}. Describe a project where you used them together and a trade-off you had to make between them.",
+    "How did you get productive with {technology}? Describe a specific project where learning it quickly mattered.",
+]
+
+
+def _achievement(bullet):
+    """Turn 'Built a recommendation engine ...' into 'built a recommendation engine ...'"""
+    text = bullet.rstrip('.').strip()
+    if text and text.split()[0][0].isupper() and not text.split()[0].isupper():
+        text = text[0].lower() + text[1:]
+    return text
+
+
+def resume_facts(resume_text):
+    """Projects, roles, quantified achievements and technologies found in a resume"""
+    lines = split_sections(resume_text)
+    index = build_keyword_index(lines)
+    technologies = sorted(index, key=lambda term: (-len(index[term]), index[term][0]))
+    terms_by_position = {}
+    for term, positions in index.items():
+        for position in positions:
+            terms_by_position.setdefault(position, []).append(term)
+
+    projects = []
+    roles = []
+    for line in lines:
+        if line.kind != 'entry':
+            continue
+        parts = [part.strip() for part in line.text.split('|') if part.strip()]
+        if line.section == 'projects':
+            # Use the project's own technologies when its bullets mention any
+            bullet_terms = [
+                term for bullet in lines if bullet.entry == line.position
+                for term in terms_by_position.get(bullet.position, [])
+            ]
+            projects.append((parts[0], bullet_terms[0] if bullet_terms else None))
+        elif len(parts) >= 2:
+            roles.append((parts[0], parts[1]))
+
+    achievements = [
+        _achievement(line.text) for line in lines
+        if line.kind == 'bullet' and line.section in ('experience', 'projects')
+        and any(c.isdigit() for c in line.text) and 20 <= len(line.text) <= 160
+    ]
+    return projects, roles, achievements, technologies
+
+
+def generate_local_questions(resume_text, count=4, fallbacks=()):
+    """Fill question templates with facts from the resume, without calling any API
+
+    Deterministic for a given resume. Topped up from fallbacks when the
+    resume doesn't yield enough facts.
+    """
+    projects, roles, achievements, technologies = resume_facts(resume_text)
+    rng = random.Random(hashlib.sha256(resume_text.encode('utf-8')).hexdigest())
+
+    project_questions = []
+    for project, technology in projects[:2]:
+        technology = technology or (technologies[0] if technologies else None)
+        if technology:
+            project_questions.append(rng.choice(PROJECT_TEMPLATES).format(project=project, technology=technology))
+    impact_questions = [rng.choice(IMPACT_TEMPLATES).format(achievement=a) for a in achievements[:2]]
+    role_questions = [ROLE_TEMPLATES[0].format(role=role, organization=org) for role, org in roles[:1]]
+    technology_questions = []
+    if len(technologies) >= 2:
+        template = rng.choice(TECHNOLOGY_TEMPLATES)
+        technology_questions.append(template.format(technology=technologies[0], other_technology=technologies[1]))
+
+    # Round-robin over the kinds so four questions cover projects, impact, roles and technologies
+    questions = []
+    kinds = [project_questions, impact_questions, role_questions, technology_questions]
+    for rank in range(2):
+        for kind in kinds:
+            if rank < len(kind) and kind[rank] not in questions:
+                questions.append(kind[rank])
+    for question in fallbacks:
+        if len(questions) >= count:
+            break
+        if question not in questions:
+            questions.append(question)
+    return questions[:count]
@@ -0,0 +1,243 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    """In-process metric with optional labels; values live in a dict keyed by label values"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Unlabelled series are exported as zero before their first update
+            self._values[()] = self._initial()
+        _registry.append(self)
+
+    def _initial(self):
+        return 0.0
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def _samples(self, key, value):
+        yield self.name, self._labels(key), value
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, self._copy(value)) for key, value in self._values.items())
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in items:
+            for name, labels, sample in self._samples(key, value):
+                lines.append(f"{name}{labels} {_format_value(sample)}")
+        return '\n'.join(lines)
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; each series is [bucket counts..., sum, count]"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        super().__init__(name, documentation, labelnames)
+
+    def _initial(self):
+        return [0] * len(self.buckets) + [0.0, 0]
+
+    def _copy(self, value):
+        return list(value)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = self._initial()
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of a block (also usable as a decorator)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self, key, value):
+        for bound, count in zip(self.buckets, value):
+            yield f"{self.name}_bucket", self._labels(key, [('le', _format_value(float(bound)))]), count
+        yield f"{self.name}_sum", self._labels(key), value[-2]
+        yield f"{self.name}_count", self._labels(key), value[-1]
+
+
+def render():
+    """Render every registered metric in the Prometheus text format"""
+    return '\n'.join(metric.render() for metric in _registry) + '\n'
+
+
+def instrument_db_commits():
+    """Time every ORM session commit (flush included) and count failed commits"""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    @event.listens_for(Session, 'before_commit')
+    def _commit_started(session):
+        session.info['metrics_commit_started'] = time.perf_counter()
+
+    @event.listens_for(Session, 'after_commit')
+    def _commit_finished(session):
+        started = session.info.pop('metrics_commit_started', None)
+        if started is not None:
+            DB_COMMIT_SECONDS.observe(time.perf_counter() - started)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _commit_failed(session):
+        if session.info.pop('metrics_commit_started', None) is not None:
+            DB_COMMIT_FAILURES.inc()
+
+
+# HTTP
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Time to produce the response for an HTTP request',
+    ['method', 'endpoint', 'status']
+)
+
+# Resume uploads
+PDF_EXTRACTION_SECONDS = Histogram('pdf_extraction_seconds', 'Time spent extracting text from an uploaded PDF')
+PDF_PAGES = Histogram('pdf_pages', 'Page count of uploaded PDFs', buckets=(1, 2, 3, 5, 10, 20, 50, 100))
+PDF_EXTRACTIONS = Counter('pdf_extractions_total', 'PDF extractions by outcome', ['outcome'])
+
+# Question generation
+QUESTION_GENERATION_SECONDS = Histogram(
+    'question_generation_seconds', 'Time to produce questions for a resume (cache, Gemini, local or fallback)',
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+)
+QUESTIONS_GENERATED = Counter('question_generations_total', 'Question sets produced, by source', ['source'])
+QUESTION_FALLBACKS = Counter(
+    'question_fallbacks_total', 'Question sets that fell back to local or static questions', ['reason']
+)
+QUESTION_WRITE_BACKS = Counter(
+    'question_write_backs_total', 'Late Gemini answers for resumes that were given local questions', ['outcome']
+)
+RESUME_PROMPT_TOKENS = Histogram(
+    'resume_prompt_tokens', 'Estimated tokens of resume text before and after condensation for a prompt',
+    ['stage'],
+    buckets=(100, 200, 400, 800, 1600, 3200, 6400)
+)
+GEMINI_REQUEST_SECONDS = Histogram(
+    'gemini_request_seconds', 'Latency of one Gemini HTTP attempt until response headers',
+    ['method', 'status'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+)
+GEMINI_CIRCUIT_REJECTIONS = Counter('gemini_circuit_rejections_total', 'Gemini calls refused by the open circuit breaker')
+
+# Admission control (admission.py), per endpoint group
+ADMISSION_ACTIVE = Gauge('admission_active_requests', 'Requests holding a concurrency slot', ['endpoint'])
+ADMISSION_QUEUE_DEPTH = Gauge('admission_queue_depth', 'Requests waiting for a concurrency slot', ['endpoint'])
+ADMISSION_WAIT_SECONDS = Histogram(
+    'admission_wait_seconds', 'Time admitted requests waited for a concurrency slot', ['endpoint']
+)
+ADMISSION_REJECTIONS = Counter(
+    'admission_rejections_total', 'Requests turned away with 429 or 503, by reason', ['endpoint', 'reason']
+)
+
+# Database
+DB_COMMIT_SECONDS = Histogram('db_commit_seconds', 'Time spent in session commits, flush included')
+DB_COMMIT_FAILURES = Counter('db_commit_failures_total', 'Session commits that raised and were rolled back')
+GROUP_COMMIT_BATCH_SIZE = Histogram(
+    'group_commit_batch_size', 'Writes committed together by the group commit writer', buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+GROUP_COMMIT_FALLBACKS = Counter(
+    'group_commit_fallbacks_total', 'Group commits that failed and were retried one write at a time'
+)
+
+# Transcription WebSocket
+TRANSCRIBE_ACTIVE_SOCKETS = Gauge('transcribe_active_sockets', 'Open /ws/transcribe connections')
+TRANSCRIBE_FRAMES = Counter('transcribe_frames_total', 'Frames relayed by /ws/transcribe', ['direction'])
+TRANSCRIBE_BYTES = Counter('transcribe_bytes_total', 'Bytes relayed by /ws/transcribe', ['direction'])
+TRANSCRIBE_DROPPED_CHUNKS = Counter('transcribe_dropped_chunks_total', 'Audio chunks dropped under upstream backpressure')
+TRANSCRIBE_VAD_SUPPRESSED_BYTES = Counter(
+    'transcribe_vad_suppressed_bytes_total', 'PCM bytes of silence the voice activity gate kept from ElevenLabs'
+)
+TRANSCRIBE_VAD_SUPPRESSED_SECONDS = Counter(
+    'transcribe_vad_suppressed_audio_seconds_total', 'Seconds of silent audio the voice activity gate kept from ElevenLabs'
+)
+TRANSCRIPT_SEGMENTS = Counter('transcript_segments_total', 'Committed transcript segments accumulated server-side')
+TRANSCRIPT_FLUSH_ROWS = Histogram(
+    'transcript_flush_rows', 'Transcripts written per batched flush', buckets=(1, 2, 5, 10, 20, 50, 100, 200)
+)
+TRANSCRIPT_FLUSH_FAILURES = Counter('transcript_flush_failures_total', 'Batched transcript writes that failed and were requeued')
+TRANSCRIBE_CONNECT_SECONDS = Histogram(
+    'transcribe_upstream_connect_seconds', 'Time to open the ElevenLabs realtime WebSocket',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10)
+)
+PROFILED_REQUESTS = Counter(
+    'profiled_requests_total', 'Requests profiled (profiling.py), by trigger (header or sampled)', ['trigger']
+)
@@ -0,0 +1,86 @@
+"""baseline schema
+
+Revision ID: 4a1f0c2e9b3d
+Revises: 
+Create Date: 2026-10-18 12:00:00.000000
+
+Databases created by the old import-time db.create_all() already contain
+some or all of these tables, so each one is only created when missing.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a1f0c2e9b3d'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _has_index(table, name):
+    return any(index['name'] == name for index in sa.inspect(op.get_bind()).get_indexes(table))
+
+
+def upgrade():
+    if not _has_table('resumes'):
+        op.create_table('resumes',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('content', sa.Text(), nullable=False),
+            sa.Column('questions', sa.JSON(), nullable=False),
+            sa.Column('upload_date', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not _has_index('resumes', 'ix_resumes_upload_date_id'):
+        op.create_index('ix_resumes_upload_date_id', 'resumes', ['upload_date', 'id'], unique=False)
+
+    if not _has_table('responses'):
+        op.create_table('responses',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('resume_filename', sa.String(length=255), nullable=False),
+            sa.Column('resume_upload_time', sa.DateTime(), nullable=False),
+            sa.Column('response_submit_time', sa.DateTime(), nullable=True),
+            sa.Column('responses', sa.JSON(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if not _has_table('question_cache'):
+        op.create_table('question_cache',
+            sa.Column('key', sa.String(length=64), nullable=False),
+            sa.Column('questions', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('last_accessed', sa.DateTime(), nullable=False),
+            sa.Column('hit_count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('key')
+        )
+        op.create_index('ix_question_cache_last_accessed', 'question_cache', ['last_accessed'], unique=False)
+
+    if not _has_table('upload_jobs'):
+        op.create_table('upload_jobs',
+            sa.Column('id', sa.String(length=32), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('file_path', sa.String(length=512), nullable=False),
+            sa.Column('resume_id', sa.Integer(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_upload_jobs_status', 'upload_jobs', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_upload_jobs_status', table_name='upload_jobs')
+    op.drop_table('upload_jobs')
+    op.drop_index('ix_question_cache_last_accessed', table_name='question_cache')
+    op.drop_table('question_cache')
+    op.drop_table('responses')
+    op.drop_index('ix_resumes_upload_date_id', table_name='resumes')
+    op.drop_table('resumes')
@@ -0,0 +1,33 @@
+"""link responses to resumes by foreign key
+
+Revision ID: 7c3e5b8d1f20
+Revises: 4a1f0c2e9b3d
+Create Date: 2026-10-18 12:30:00.000000
+
+Existing rows keep resume_id NULL until `flask backfill-response-resume-ids`
+matches them on the copied resume_filename/resume_upload_time columns.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e5b8d1f20'
+down_revision = '4a1f0c2e9b3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('responses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('resume_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_responses_resume_id'), ['resume_id'], unique=False)
+        batch_op.create_foreign_key('fk_responses_resume_id_resumes', 'resumes', ['resume_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    with op.batch_alter_table('responses', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_responses_resume_id_resumes', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_responses_resume_id'))
+        batch_op.drop_column('resume_id')
@@ -0,0 +1,38 @@
+"""server-side transcripts of transcription sessions
+
+Revision ID: a93f5e2d7c48
+Revises: e4b7c19a5d36
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a93f5e2d7c48'
+down_revision = 'e4b7c19a5d36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('transcripts',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('resume_id', sa.Integer(), nullable=True),
+        sa.Column('question_index', sa.Integer(), nullable=True),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('segment_count', sa.Integer(), nullable=False),
+        sa.Column('audio_file', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_transcripts_resume_id', 'transcripts', ['resume_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_transcripts_resume_id', table_name='transcripts')
+    op.drop_table('transcripts')
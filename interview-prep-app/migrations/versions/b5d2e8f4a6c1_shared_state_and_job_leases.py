@@ -0,0 +1,46 @@
+"""shared state table and database-held upload jobs with leases
+
+Revision ID: b5d2e8f4a6c1
+Revises: 7c3e5b8d1f20
+Create Date: 2026-10-18 16:00:00.000000
+
+Uploads for queued jobs now live in upload_jobs.file_data instead of the local
+UPLOAD_FOLDER, so file_path becomes optional (older jobs still use it).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d2e8f4a6c1'
+down_revision = '7c3e5b8d1f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('shared_state',
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('expires_at', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_shared_state_expires_at', 'shared_state', ['expires_at'], unique=False)
+
+    with op.batch_alter_table('upload_jobs', schema=None) as batch_op:
+        batch_op.alter_column('file_path', existing_type=sa.String(length=512), nullable=True)
+        batch_op.add_column(sa.Column('file_data', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('claimed_by', sa.String(length=128), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('upload_jobs', schema=None) as batch_op:
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('claimed_by')
+        batch_op.drop_column('file_data')
+        batch_op.alter_column('file_path', existing_type=sa.String(length=512), nullable=False)
+
+    op.drop_index('ix_shared_state_expires_at', table_name='shared_state')
+    op.drop_table('shared_state')
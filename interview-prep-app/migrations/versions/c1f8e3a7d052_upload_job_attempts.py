@@ -0,0 +1,29 @@
+"""count claims of upload jobs
+
+Revision ID: c1f8e3a7d052
+Revises: a93f5e2d7c48
+Create Date: 2026-10-18 23:00:00.000000
+
+A job is failed once it has been claimed JOB_MAX_ATTEMPTS times without
+finishing, instead of whenever a restarting worker's pool is full.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1f8e3a7d052'
+down_revision = 'a93f5e2d7c48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('upload_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('upload_jobs', schema=None) as batch_op:
+        batch_op.drop_column('attempts')
@@ -0,0 +1,61 @@
+"""answer analytics tables
+
+Revision ID: d8a3f61c2b94
+Revises: b5d2e8f4a6c1
+Create Date: 2026-10-18 18:00:00.000000
+
+Responses submitted before this revision are analyzed by
+`flask analyze-responses`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a3f61c2b94'
+down_revision = 'b5d2e8f4a6c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('answer_metrics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('response_id', sa.Integer(), nullable=False),
+        sa.Column('answer_index', sa.Integer(), nullable=False),
+        sa.Column('question_hash', sa.String(length=64), nullable=False),
+        sa.Column('word_count', sa.Integer(), nullable=False),
+        sa.Column('filler_count', sa.Integer(), nullable=False),
+        sa.Column('filler_rate', sa.Float(), nullable=False),
+        sa.Column('duration_seconds', sa.Float(), nullable=True),
+        sa.Column('words_per_minute', sa.Float(), nullable=True),
+        sa.Column('star_coverage', sa.Float(), nullable=False),
+        sa.Column('star_components', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['response_id'], ['responses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('response_id', 'answer_index', name='uq_answer_metrics_response_answer')
+    )
+    op.create_index('ix_answer_metrics_question_hash', 'answer_metrics', ['question_hash'], unique=False)
+
+    op.create_table('question_metrics',
+        sa.Column('question_hash', sa.String(length=64), nullable=False),
+        sa.Column('question', sa.Text(), nullable=False),
+        sa.Column('answer_count', sa.Integer(), nullable=False),
+        sa.Column('total_words', sa.Integer(), nullable=False),
+        sa.Column('total_fillers', sa.Integer(), nullable=False),
+        sa.Column('total_star_coverage', sa.Float(), nullable=False),
+        sa.Column('timed_answer_count', sa.Integer(), nullable=False),
+        sa.Column('timed_words', sa.Integer(), nullable=False),
+        sa.Column('timed_seconds', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('question_hash')
+    )
+    op.create_index('ix_question_metrics_answer_count', 'question_metrics', ['answer_count'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_question_metrics_answer_count', table_name='question_metrics')
+    op.drop_table('question_metrics')
+    op.drop_index('ix_answer_metrics_question_hash', table_name='answer_metrics')
+    op.drop_table('answer_metrics')
@@ -0,0 +1,71 @@
+"""store resume content zlib-compressed
+
+Revision ID: e4b7c19a5d36
+Revises: d8a3f61c2b94
+Create Date: 2026-10-18 20:00:00.000000
+
+resumes.content (text) is replaced by resumes.content_compressed (zlib-compressed
+UTF-8, see models.CompressedText). Existing rows are compressed in batches of
+BATCH_SIZE, each batch its own UPDATE round trip keyed by id.
+
+"""
+import zlib
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b7c19a5d36'
+down_revision = 'd8a3f61c2b94'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+resumes = sa.table('resumes',
+    sa.column('id', sa.Integer()),
+    sa.column('content', sa.Text()),
+    sa.column('content_compressed', sa.LargeBinary())
+)
+
+
+def copy_in_batches(source, target, convert):
+    """Fill column target from source for every row, BATCH_SIZE rows at a time in id order"""
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(resumes.c.id, resumes.c[source])
+            .where(resumes.c.id > last_id)
+            .order_by(resumes.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            resumes.update().where(resumes.c.id == sa.bindparam('row_id')).values({target: sa.bindparam('value')}),
+            [{'row_id': row_id, 'value': convert(value)} for row_id, value in rows]
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_compressed', sa.LargeBinary(), nullable=True))
+
+    copy_in_batches('content', 'content_compressed', lambda text: zlib.compress((text or '').encode('utf-8'), 6))
+
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.alter_column('content_compressed', existing_type=sa.LargeBinary(), nullable=False)
+        batch_op.drop_column('content')
+
+
+def downgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content', sa.Text(), nullable=True))
+
+    copy_in_batches('content_compressed', 'content', lambda data: zlib.decompress(data).decode('utf-8'))
+
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.alter_column('content', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column('content_compressed')
@@ -1,42 +1,74 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import json
+import zlib
 
 db = SQLAlchemy()
 
+class CompressedText(db.TypeDecorator):
+    """Text stored zlib-compressed as binary, compressed on write and decoded on load"""
+    impl = db.LargeBinary
+    cache_ok = True
+    
+    COMPRESSION_LEVEL = 6
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.compress(value.encode('utf-8'), self.COMPRESSION_LEVEL)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.decompress(value).decode('utf-8')
+
 class Resume(db.Model):
     """Model for storing uploaded resumes and generated questions"""
     __tablename__ = 'resumes'
     
+    # Fields clients may request from the resume listing; content is opt-in
+    FIELDS = ('id', 'filename', 'content', 'upload_date', 'questions')
+    LIST_FIELDS = ('id', 'filename', 'upload_date', 'questions')
+    
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    # Extracted resume text, stored compressed and only loaded when accessed (or undeferred)
+    content = db.deferred(db.Column('content_compressed', CompressedText, nullable=False))
     questions = db.Column(db.JSON, nullable=False)
     upload_date = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Backs keyset pagination of the resume listing (newest first)
+        db.Index('ix_resumes_upload_date_id', 'upload_date', 'id'),
+    )
+    
     def __repr__(self):
         return f'<Resume {self.id}: {self.filename}>'
     
-    def to_dict(self):
-        """Convert resume to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'filename': self.filename,
-            'content': self.content,
-            'upload_date': self.upload_date.isoformat(),
-            'questions': self.questions
-        }
+    def to_dict(self, fields=None):
+        """Convert resume to dictionary for JSON serialization, optionally only some fields"""
+        result = {}
+        for field in fields or self.FIELDS:
+            value = getattr(self, field)
+            if field == 'upload_date':
+                value = value.isoformat()
+            result[field] = value
+        return result
 
 class Response(db.Model):
     """Model for storing user responses to interview questions"""
     __tablename__ = 'responses'
     
     id = db.Column(db.Integer, primary_key=True)
+    # Nullable only for legacy rows awaiting `flask backfill-response-resume-ids`
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id', ondelete='CASCADE'), nullable=True, index=True)
     resume_filename = db.Column(db.String(255), nullable=False)
     resume_upload_time = db.Column(db.DateTime, nullable=False)
     response_submit_time = db.Column(db.DateTime, default=datetime.utcnow)
     responses = db.Column(db.JSON, nullable=False)  # Array of {question, answer} objects
     
+    resume = db.relationship('Resume', backref=db.backref('responses', lazy='dynamic'))
+    
     def __repr__(self):
         return f'<Response {self.id}: {self.resume_filename}>'
     
@@ -44,8 +76,184 @@ class Response(db.Model):
         """Convert response to dictionary for JSON serialization"""
         return {
             'id': self.id,
+            'resume_id': self.resume_id,
             'resume_filename': self.resume_filename,
             'resume_upload_time': self.resume_upload_time.isoformat(),
             'response_submit_time': self.response_submit_time.isoformat(),
             'responses': self.responses
         }
+
+class Transcript(db.Model):
+    """Committed speech-to-text of one /ws/transcribe session, accumulated server-side; see transcripts.py"""
+    __tablename__ = 'transcripts'
+    
+    id = db.Column(db.String(32), primary_key=True)  # random hex, handed to the browser when the session opens
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id', ondelete='CASCADE'), nullable=True, index=True)
+    question_index = db.Column(db.Integer, nullable=True)
+    text = db.Column(db.Text, nullable=False, default='')
+    segment_count = db.Column(db.Integer, nullable=False, default=0)
+    audio_file = db.Column(db.String(255), nullable=True)  # the session's server-side recording, if any
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    completed_at = db.Column(db.DateTime, nullable=True)  # NULL while the session is open (or if it died)
+    
+    def __repr__(self):
+        return f'<Transcript {self.id}: {self.segment_count} segments>'
+    
+    def to_dict(self):
+        """Convert transcript to dictionary for JSON serialization"""
+        return {
+            'transcript_id': self.id,
+            'resume_id': self.resume_id,
+            'question_index': self.question_index,
+            'text': self.text,
+            'segment_count': self.segment_count,
+            'audio_file': self.audio_file,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+class QuestionCache(db.Model):
+    """Model for caching generated questions by resume content hash"""
+    __tablename__ = 'question_cache'
+    
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of model, prompt version and resume text
+    questions = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_accessed = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    hit_count = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<QuestionCache {self.key[:12]}: {self.hit_count} hits>'
+
+class SharedState(db.Model):
+    """Numeric values (counters, timestamps) shared by every worker; see shared_state.DatabaseStore"""
+    __tablename__ = 'shared_state'
+    
+    key = db.Column(db.String(255), primary_key=True)
+    value = db.Column(db.Float, nullable=False)
+    expires_at = db.Column(db.Float, nullable=True, index=True)  # Unix time; NULL never expires
+    
+    def __repr__(self):
+        return f'<SharedState {self.key}={self.value}>'
+
+class UploadJob(db.Model):
+    """Model for tracking asynchronous resume processing jobs"""
+    __tablename__ = 'upload_jobs'
+    
+    STATUS_QUEUED = 'queued'
+    STATUS_EXTRACTING = 'extracting'
+    STATUS_GENERATING = 'generating'
+    STATUS_SAVING = 'saving'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_FAILED)
+    
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_QUEUED, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(512), nullable=True)  # jobs created before uploads were kept in file_data
+    # The uploaded PDF, kept in the database so any worker on any node can process the job
+    file_data = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    # Worker currently processing the job; the claim lapses at lease_expires_at unless renewed
+    claimed_by = db.Column(db.String(128), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # claims so far
+    resume_id = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<UploadJob {self.id}: {self.status}>'
+    
+    @property
+    def finished(self):
+        return self.status in self.FINISHED_STATUSES
+    
+    def to_dict(self):
+        """Convert job to dictionary for JSON serialization"""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'filename': self.filename,
+            'resume_id': self.resume_id,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+class AnswerMetric(db.Model):
+    """Per-answer analytics for a submitted response; see analytics.py"""
+    __tablename__ = 'answer_metrics'
+    
+    # Bits of star_components, in STAR order
+    STAR_COMPONENTS = ('situation', 'task', 'action', 'result')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    response_id = db.Column(db.Integer, db.ForeignKey('responses.id', ondelete='CASCADE'), nullable=False)
+    answer_index = db.Column(db.Integer, nullable=False)
+    question_hash = db.Column(db.String(64), nullable=False, index=True)  # sha256 of the question text
+    word_count = db.Column(db.Integer, nullable=False)
+    filler_count = db.Column(db.Integer, nullable=False)
+    filler_rate = db.Column(db.Float, nullable=False)
+    duration_seconds = db.Column(db.Float, nullable=True)  # NULL without a saved recording
+    words_per_minute = db.Column(db.Float, nullable=True)
+    star_coverage = db.Column(db.Float, nullable=False)
+    star_components = db.Column(db.Integer, nullable=False)
+    
+    __table_args__ = (
+        # Also makes re-analyzing a response fail instead of double counting it
+        db.UniqueConstraint('response_id', 'answer_index', name='uq_answer_metrics_response_answer'),
+    )
+    
+    def __repr__(self):
+        return f'<AnswerMetric {self.response_id}/{self.answer_index}>'
+    
+    def to_dict(self):
+        """Convert answer metrics to dictionary for JSON serialization"""
+        return {
+            'answer_index': self.answer_index,
+            'word_count': self.word_count,
+            'filler_count': self.filler_count,
+            'filler_rate': round(self.filler_rate, 4),
+            'duration_seconds': self.duration_seconds,
+            'words_per_minute': round(self.words_per_minute, 1) if self.words_per_minute is not None else None,
+            'star_coverage': self.star_coverage,
+            'star_components': [
+                name for bit, name in enumerate(self.STAR_COMPONENTS) if self.star_components & (1 << bit)
+            ]
+        }
+
+class QuestionMetric(db.Model):
+    """Running totals of answer metrics per question, updated as responses are submitted"""
+    __tablename__ = 'question_metrics'
+    
+    question_hash = db.Column(db.String(64), primary_key=True)
+    question = db.Column(db.Text, nullable=False)
+    answer_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+    total_words = db.Column(db.Integer, nullable=False, default=0)
+    total_fillers = db.Column(db.Integer, nullable=False, default=0)
+    total_star_coverage = db.Column(db.Float, nullable=False, default=0)
+    timed_answer_count = db.Column(db.Integer, nullable=False, default=0)  # answers with a recording
+    timed_words = db.Column(db.Integer, nullable=False, default=0)
+    timed_seconds = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<QuestionMetric {self.question_hash[:12]}: {self.answer_count} answers>'
+    
+    def to_dict(self):
+        """Convert question aggregates (averages over every answer) to dictionary for JSON serialization"""
+        answers = self.answer_count or 1
+        return {
+            'question': self.question,
+            'answer_count': self.answer_count,
+            'avg_word_count': round(self.total_words / answers, 1),
+            'filler_rate': round(self.total_fillers / self.total_words, 4) if self.total_words else 0.0,
+            'avg_star_coverage': round(self.total_star_coverage / answers, 4),
+            'timed_answer_count': self.timed_answer_count,
+            'words_per_minute': round(self.timed_words / (self.timed_seconds / 60), 1) if self.timed_seconds else None,
+            'updated_at': self.updated_at.isoformat()
+        }
@@ -0,0 +1,246 @@
+import io
+import mmap
+import multiprocessing
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+ExtractionResult = namedtuple('ExtractionResult', ['text', 'page_count', 'pages_read', 'truncated'])
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF cannot be read within its budgets"""
+
+
+def _mp_context():
+    """Fork where possible; a gevent-patched worker must spawn fresh interpreters"""
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('os'):
+            return multiprocessing.get_context('spawn')
+    except ImportError:
+        pass
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context('spawn')
+
+
+def _get_pool(workers):
+    """Lazily start the shared process pool used for page-level parallelism"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+        return _pool
+
+
+def _reset_pool(pool):
+    """Retire pool, stopping its workers even mid-task; later calls start a fresh one
+
+    Other extractions still waiting on it see BrokenProcessPool and carry on
+    sequentially.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def _pdf_reader(stream):
+    """Open a PdfReader; PyPDF2 is imported on the first extraction, not at app startup"""
+    import PyPDF2
+    return PyPDF2.PdfReader(stream)
+
+
+def _extract_page_range(data, start, end):
+    """Process pool entry point: extract the text of pages [start, end)"""
+    reader = _pdf_reader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or '' for i in range(start, end)]
+
+
+def _extract_document(data, max_pages, time_budget, early_stop_chars):
+    """Process pool entry point: extract one whole document"""
+    return extract_pdf(data, max_pages=max_pages, time_budget=time_budget, early_stop_chars=early_stop_chars)
+
+
+@contextmanager
+def _open_source(source):
+    """Yield a seekable stream over the PDF plus a callable returning its raw bytes
+
+    Paths and real temporary files are memory-mapped; in-memory uploads are
+    read in place, so nothing is copied to UPLOAD_FOLDER first.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            with _mmap_file(f) as mm:
+                yield mm, lambda: mm[:]
+        return
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source), lambda: bytes(source)
+        return
+
+    if hasattr(source, 'getvalue'):
+        source.seek(0)
+        yield source, source.getvalue
+        return
+
+    # Only the mmap probe is guarded: errors raised by the caller at the yield must propagate
+    source.seek(0)
+    if _is_empty(source):
+        raise PDFExtractionError("The PDF file is empty")
+    try:
+        mm = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        mm = None  # not backed by a real file, e.g. a SpooledTemporaryFile still in memory
+    if mm is None:
+        data = source.read()
+        yield io.BytesIO(data), lambda: data
+        return
+    try:
+        yield mm, lambda: mm[:]
+    finally:
+        mm.close()
+
+
+def _is_empty(f):
+    try:
+        return os.fstat(f.fileno()).st_size == 0
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return False  # not a real file; the reader reports an empty stream itself
+
+
+@contextmanager
+def _mmap_file(f):
+    if _is_empty(f):
+        raise PDFExtractionError("The PDF file is empty")  # mmap can't map zero bytes
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield mm
+    finally:
+        mm.close()
+
+
+def _extract_sequential(reader, limit, deadline, early_stop_chars):
+    pages = []
+    collected = 0
+    for i in range(limit):
+        if deadline and time.monotonic() > deadline:
+            return pages, False
+        text = reader.pages[i].extract_text() or ''
+        pages.append(text)
+        collected += len(text) + 1
+        if early_stop_chars and collected >= early_stop_chars:
+            return pages, i == limit - 1
+    return pages, True
+
+
+def _extract_parallel(pool, data, limit, workers, deadline):
+    chunk_size = -(-limit // workers)
+    futures = [
+        pool.submit(_extract_page_range, data, start, min(start + chunk_size, limit))
+        for start in range(0, limit, chunk_size)
+    ]
+
+    timeout = max(0.0, deadline - time.monotonic()) if deadline else None
+    done, not_done = wait(futures, timeout=timeout)
+    if not_done:
+        # cancel() can't stop chunks already running, so recycle the pool rather than let them finish
+        _reset_pool(pool)
+
+    # Keep the in-order prefix of finished chunks so the text stays contiguous
+    pages = []
+    for future in futures:
+        if future not in done:
+            return pages, False
+        pages.extend(future.result())
+    return pages, True
+
+
+def extract_pdf(source, max_pages=None, time_budget=None, early_stop_chars=None,
+                parallel_workers=0, parallel_min_pages=8):
+    """Extract text from a PDF path, bytes or upload stream
+
+    max_pages and time_budget (seconds) cap the work done; early_stop_chars
+    stops as soon as that much text has been collected. Long documents are
+    split across a process pool when parallel_workers > 1 and early stop is off.
+    """
+    deadline = time.monotonic() + time_budget if time_budget else None
+
+    with _open_source(source) as (stream, read_bytes):
+        reader = _pdf_reader(stream)
+        page_count = len(reader.pages)
+        limit = min(page_count, max_pages) if max_pages else page_count
+
+        if parallel_workers > 1 and not early_stop_chars and limit >= parallel_min_pages:
+            pool = _get_pool(parallel_workers)
+            try:
+                pages, complete = _extract_parallel(pool, read_bytes(), limit, parallel_workers, deadline)
+            except BrokenProcessPool:
+                print("WARNING: PDF process pool died, extracting sequentially")
+                _reset_pool(pool)
+                pages, complete = _extract_sequential(reader, limit, deadline, early_stop_chars)
+        else:
+            pages, complete = _extract_sequential(reader, limit, deadline, early_stop_chars)
+
+    if not pages and limit > 0:
+        raise PDFExtractionError(f"Exceeded the {time_budget}s extraction time budget")
+
+    return ExtractionResult(
+        text='\n'.join(pages).strip(),
+        page_count=page_count,
+        pages_read=len(pages),
+        truncated=not complete or limit < page_count
+    )
+
+
+def extract_pdfs(documents, max_pages=None, time_budget=None, early_stop_chars=None, workers=0, isolate=False):
+    """Extract several PDFs (as bytes) concurrently, one document per pool worker
+
+    Returns a list aligned with documents holding either an ExtractionResult or
+    the exception raised for that document, so one bad file doesn't fail the rest.
+    With isolate, even a single document is parsed in the pool, keeping
+    CPU-bound parsing off the calling (web) process.
+    """
+    budgets = (max_pages, time_budget, early_stop_chars)
+    use_pool = workers >= 1 if isolate else workers > 1 and len(documents) > 1
+    if not use_pool:
+        futures = []
+    else:
+        pool = _get_pool(workers)
+        futures = [pool.submit(_extract_document, data, *budgets) for data in documents]
+
+    results = []
+    for i, data in enumerate(documents):
+        try:
+            try:
+                results.append(futures[i].result() if futures else _extract_document(data, *budgets))
+            except BrokenProcessPool:
+                print("WARNING: PDF process pool died, extracting sequentially")
+                _reset_pool(pool)
+                futures = []
+                results.append(_extract_document(data, *budgets))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def extract_pdf_isolated(source, max_pages=None, time_budget=None, early_stop_chars=None, workers=1):
+    """Extract one PDF (path, bytes or upload stream) in the process pool, raising on failure"""
+    with _open_source(source) as (stream, read_bytes):
+        data = read_bytes()
+    result, = extract_pdfs([data], max_pages, time_budget, early_stop_chars, workers=workers, isolate=True)
+    if isinstance(result, Exception):
+        raise result
+    return result
@@ -0,0 +1,159 @@
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+MODES = ('cprofile', 'sample')
+
+# <id>-<endpoint>-<duration>ms.<pstats|collapsed>
+DUMP_NAME = re.compile(r'^(?P<id>[0-9a-f]{12})-(?P<endpoint>[\w.]+)-(?P<duration_ms>\d+)ms\.(?P<format>pstats|collapsed)$')
+
+
+def _greenlets_patched():
+    try:
+        from gevent import monkey
+        return monkey.is_module_patched('threading')
+    except ImportError:
+        return False
+
+
+def token_matches(config, value):
+    """Whether value is the configured PROFILING_TOKEN (never true when no token is set)"""
+    token = config['PROFILING_TOKEN']
+    return bool(token) and bool(value) and hmac.compare_digest(str(value), token)
+
+
+def profile_trigger(config, header_value):
+    """Why to profile this request: 'header' (X-Profile carries the token), 'sampled' or None
+
+    The common case, no header and no sampling, costs a dict lookup.
+    """
+    if header_value is not None and token_matches(config, header_value):
+        return 'header'
+    rate = config['PROFILING_SAMPLE_RATE']
+    if rate > 0 and random.random() < rate:
+        return 'sampled'
+    return None
+
+
+class StackSampler:
+    """Samples one thread's Python stack every interval seconds into collapsed-stack counts
+
+    Runs on its own OS thread, so its cost lands between the profiled thread's
+    bytecodes rather than in every call as with cProfile. Greenlets sharing a
+    thread can't be told apart, so this is only used without gevent.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """Profiles one request, from before_request to teardown, and writes the dump to directory"""
+
+    def __init__(self, directory, endpoint, mode='cprofile', sample_interval=0.005):
+        self.directory = directory
+        self.endpoint = endpoint or 'unmatched'
+        self.id = uuid.uuid4().hex[:12]
+        if mode == 'sample' and _greenlets_patched():
+            mode = 'cprofile'  # the sampler can't see which greenlet is running
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self._profiler = None
+        self._started = None
+
+    def start(self):
+        """Start profiling the current thread; returns False if another profiler already runs in it"""
+        if self.mode == 'cprofile' and sys.getprofile() is not None:
+            return False  # e.g. another request on this thread's event loop; cProfile would replace its hook
+        self._started = time.perf_counter()
+        if self.mode == 'sample':
+            self._profiler = StackSampler(threading.get_ident(), self.sample_interval)
+            self._profiler.start()
+        else:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return True
+
+    def finish(self, max_dumps):
+        """Stop profiling, write the dump and prune the oldest beyond max_dumps; returns the file name"""
+        if self.mode == 'sample':
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+        duration_ms = int((time.perf_counter() - self._started) * 1000)
+        extension = 'collapsed' if self.mode == 'sample' else 'pstats'
+        name = f"{self.id}-{self.endpoint}-{duration_ms}ms.{extension}"
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        if self.mode == 'sample':
+            self._profiler.dump(path)
+        else:
+            self._profiler.dump_stats(path)
+        prune_dumps(self.directory, max_dumps)
+        return name
+
+
+def list_dumps(directory):
+    """Profile dumps in directory, newest first"""
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return []
+    dumps = []
+    for entry in entries:
+        match = DUMP_NAME.match(entry.name)
+        if not match:
+            continue
+        stat = entry.stat()
+        dumps.append({
+            'name': entry.name,
+            'id': match['id'],
+            'endpoint': match['endpoint'],
+            'duration_ms': int(match['duration_ms']),
+            'format': match['format'],
+            'size_bytes': stat.st_size,
+            'created_at': stat.st_mtime
+        })
+    return sorted(dumps, key=lambda dump: dump['created_at'], reverse=True)
+
+
+def prune_dumps(directory, max_dumps):
+    for dump in list_dumps(directory)[max_dumps:]:
+        try:
+            os.remove(os.path.join(directory, dump['name']))
+        except FileNotFoundError:
+            pass
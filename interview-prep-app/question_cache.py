@@ -0,0 +1,142 @@
+import hashlib
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from models import db, QuestionCache
+from shared_state import get_store
+
+STAT_NAMES = ('hits', 'misses', 'stores', 'evictions')
+
+
+def _count(name, amount=1):
+    """Add to a counter; returns its new total, or None if the update failed"""
+    # Counters live in the shared store so every worker adds to the same totals
+    try:
+        return get_store().incr(f"question_cache:{name}", amount)
+    except SQLAlchemyError as e:
+        print(f"WARNING: Question cache counter update failed: {str(e)}")
+        return None
+
+
+def normalize_resume_text(resume_text):
+    """Collapse whitespace so re-extractions of the same PDF hash identically"""
+    return ' '.join(resume_text.split())
+
+
+def cache_key(resume_text):
+    """Build the content-addressed cache key for a resume"""
+    config = current_app.config
+    digest = hashlib.sha256()
+    digest.update(config['GEMINI_MODEL'].encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(config['PROMPT_VERSION'].encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(str(config['RESUME_TOKEN_BUDGET']).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_resume_text(resume_text).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def get_cached_questions(resume_text):
+    """Return cached questions for this resume, or None on a miss
+
+    Runs on its own connection and transaction, so a lookup never commits (or
+    rolls back) anything pending in the caller's session.
+    """
+    if not current_app.config['QUESTION_CACHE_ENABLED']:
+        return None
+
+    table = QuestionCache.__table__
+    key = cache_key(resume_text)
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=current_app.config['QUESTION_CACHE_TTL_SECONDS'])
+    try:
+        with db.engine.begin() as conn:
+            row = conn.execute(
+                db.select(table.c.questions, table.c.created_at).where(table.c.key == key)
+            ).first()
+            if row is None:
+                _count('misses')
+                return None
+
+            if row.created_at < cutoff:
+                # Expired entries count as a miss and are dropped immediately
+                conn.execute(table.delete().where(table.c.key == key, table.c.created_at < cutoff))
+                _count('misses')
+                _count('evictions')
+                return None
+
+            conn.execute(
+                table.update()
+                .where(table.c.key == key)
+                .values(hit_count=table.c.hit_count + 1, last_accessed=now)
+            )
+        _count('hits')
+        return list(row.questions)
+    except SQLAlchemyError as e:
+        print(f"WARNING: Question cache lookup failed: {str(e)}")
+        _count('misses')
+        return None
+
+
+def store_questions(resume_text, questions):
+    """Store generated questions and evict least recently used entries over the limit"""
+    if not current_app.config['QUESTION_CACHE_ENABLED']:
+        return
+
+    try:
+        now = datetime.utcnow()
+        db.session.merge(QuestionCache(
+            key=cache_key(resume_text),
+            questions=questions,
+            created_at=now,
+            last_accessed=now,
+            hit_count=0
+        ))
+        db.session.commit()
+        # The size bound is enforced every tenth of it in stores (across workers), not on every store
+        stores = _count('stores')
+        if stores is not None and stores % _evict_every() == 0:
+            _evict()
+    except SQLAlchemyError as e:
+        # A concurrent upload of the same resume may have won the insert; that's fine
+        db.session.rollback()
+        print(f"WARNING: Question cache store failed: {str(e)}")
+
+
+def _evict_every():
+    return max(1, current_app.config['QUESTION_CACHE_MAX_ENTRIES'] // 10)
+
+
+def _evict():
+    """Drop expired entries, then the least recently used ones above the size bound"""
+    config = current_app.config
+    cutoff = datetime.utcnow() - timedelta(seconds=config['QUESTION_CACHE_TTL_SECONDS'])
+
+    expired = QuestionCache.query.filter(QuestionCache.created_at < cutoff).delete(synchronize_session=False)
+
+    overflow = QuestionCache.query.count() - config['QUESTION_CACHE_MAX_ENTRIES']
+    evicted = 0
+    if overflow > 0:
+        stale_keys = db.session.query(QuestionCache.key) \
+            .order_by(QuestionCache.last_accessed.asc()) \
+            .limit(overflow) \
+            .subquery()
+        evicted = QuestionCache.query.filter(QuestionCache.key.in_(db.select(stale_keys.c.key))) \
+            .delete(synchronize_session=False)
+
+    db.session.commit()
+    if expired or evicted:
+        _count('evictions', expired + evicted)
+
+
+def cache_stats():
+    """Return hit/miss counters (across all workers with the database store) plus the current cache size"""
+    store = get_store()
+    stats = {name: int(store.get(f"question_cache:{name}", 0)) for name in STAT_NAMES}
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    stats['entries'] = QuestionCache.query.count()
+    stats['max_entries'] = current_app.config['QUESTION_CACHE_MAX_ENTRIES']
+    stats['ttl_seconds'] = current_app.config['QUESTION_CACHE_TTL_SECONDS']
+    return stats
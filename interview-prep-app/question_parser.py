@@ -0,0 +1,67 @@
+import json
+
+def parse_question_line(line):
+    """Strip numbering and markdown from a generated line, returning None if it isn't a question"""
+    line = line.strip()
+    # Check if line starts with a number followed by a period or parenthesis
+    if not line or not (line[0].isdigit() or line.startswith('**')):
+        return None
+    
+    # Remove common numbering patterns
+    question = line
+    for i in range(1, 20):
+        question = question.replace(f"{i}.", "", 1).replace(f"{i})", "", 1).replace(f"**{i}.**", "", 1).replace(f"**{i})", "", 1)
+    question = question.strip().replace("**", "")
+    if question and len(question) > 20:  # Ensure it's a real question
+        return question
+    return None
+
+def parse_questions(text):
+    """Extract numbered questions from a complete model response"""
+    questions = []
+    for line in text.split('\n'):
+        question = parse_question_line(line)
+        if question:
+            questions.append(question)
+    return questions
+
+class QuestionStreamParser:
+    """Incrementally parse numbered questions from streamed model output"""
+    
+    def __init__(self):
+        self._partial_line = ''
+    
+    def feed(self, fragment):
+        """Add a streamed text fragment and return any questions completed by it"""
+        lines = (self._partial_line + fragment).split('\n')
+        self._partial_line = lines.pop()
+        return parse_questions('\n'.join(lines))
+    
+    def close(self):
+        """Flush the final unterminated line once the stream ends"""
+        line, self._partial_line = self._partial_line, ''
+        return parse_questions(line)
+
+def parse_batch_questions(text, count):
+    """Split a structured multi-resume response into one question list per resume
+    
+    Expects {"resumes": [{"index": 0, "questions": [...]}, ...]}; resumes the
+    model skipped (or a response that isn't valid JSON) come back as empty lists.
+    """
+    questions = [[] for _ in range(count)]
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.strip('`').removeprefix('json').strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return questions
+    
+    entries = data.get('resumes', []) if isinstance(data, dict) else []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get('index')
+        if isinstance(index, int) and 0 <= index < count and isinstance(entry.get('questions'), list):
+            questions[index] = [q.strip() for q in entry['questions'] if isinstance(q, str) and q.strip()]
+    return questions
@@ -0,0 +1,278 @@
+import math
+import re
+import sys
+from collections import namedtuple
+
+CondensedResume = namedtuple('CondensedResume', ['text', 'technologies', 'index', 'tokens', 'source_tokens'])
+
+# Heading keywords mapped to canonical sections (first match wins)
+SECTION_KEYWORDS = [
+    ('projects', ('PROJECT',)),
+    ('experience', ('EXPERIENCE', 'EMPLOYMENT', 'WORK HISTORY', 'CAREER')),
+    ('skills', ('SKILL', 'TECHNOLOGIES', 'TECH STACK', 'TOOLS')),
+    ('summary', ('SUMMARY', 'PROFILE', 'OBJECTIVE', 'ABOUT')),
+    ('education', ('EDUCATION', 'ACADEMIC')),
+    ('certifications', ('CERTIFICATION', 'AWARD', 'HONOR', 'ACHIEVEMENT')),
+    ('other', ('PUBLICATION', 'VOLUNTEER', 'LEADERSHIP', 'ACTIVITIES', 'INTERESTS', 'LANGUAGES')),
+]
+
+# How much a line from each section is worth before technology and impact bonuses
+SECTION_WEIGHTS = {
+    'projects': 3.0,
+    'experience': 2.5,
+    'other': 1.0,
+    'summary': 1.0,
+    'education': 0.5,
+    'certifications': 0.5,
+}
+
+# Sections rendered in this order in the condensed text
+SECTION_ORDER = ('summary', 'experience', 'projects', 'other', 'education', 'certifications')
+
+# Technologies recognised even when the resume has no skills section
+KNOWN_TECHNOLOGIES = [
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'Go', 'Golang', 'Rust', 'C++', 'C#', 'Ruby', 'PHP', 'Kotlin',
+    'Swift', 'Scala', 'R', 'SQL', 'Bash', 'MATLAB', 'Elixir', 'Haskell', 'Dart',
+    'React', 'Angular', 'Vue', 'Svelte', 'Next.js', 'Node.js', 'Express', 'Django', 'Flask', 'FastAPI',
+    'Spring', 'Spring Boot', 'Rails', '.NET', 'Laravel', 'GraphQL', 'REST', 'gRPC', 'WebSocket', 'Redux',
+    'Tailwind', 'Flutter', 'React Native',
+    'PostgreSQL', 'MySQL', 'SQLite', 'MongoDB', 'Redis', 'Cassandra', 'DynamoDB', 'Elasticsearch',
+    'Snowflake', 'BigQuery', 'Kafka', 'RabbitMQ', 'Spark', 'Hadoop', 'Airflow', 'dbt', 'Flink',
+    'AWS', 'EC2', 'S3', 'Lambda', 'GCP', 'Google Cloud', 'Azure', 'Docker', 'Kubernetes', 'Terraform',
+    'Ansible', 'Jenkins', 'GitHub Actions', 'CI/CD', 'Linux', 'Nginx', 'Git', 'Prometheus', 'Grafana',
+    'TensorFlow', 'PyTorch', 'scikit-learn', 'Pandas', 'NumPy', 'Keras', 'XGBoost', 'BERT', 'LLM',
+    'Hugging Face', 'OpenCV', 'NLP', 'Machine Learning', 'Deep Learning', 'Computer Vision',
+    'Microservices', 'Stripe', 'JWT', 'OAuth', 'pytest', 'Jest', 'Selenium', 'Figma', 'Tableau',
+]
+
+BULLET_CHARS = '•\x7f-*▪◦●–·>'
+
+_CONTACT_PATTERN = re.compile(
+    r'[\w.+-]+@[\w-]+\.[\w.]+|\(?\+?\d[\d\s().-]{7,}\d|linkedin\.com|github\.com|https?://',
+    re.IGNORECASE
+)
+_LIST_LINE_PATTERN = re.compile(r'^(technologies|tech stack|stack|tools|languages|frameworks|databases|skills)[^:]{0,20}:', re.IGNORECASE)
+_IMPACT_PATTERN = re.compile(r'\d')
+
+Line = namedtuple('Line', ['position', 'section', 'kind', 'text', 'entry'])
+
+
+def estimate_tokens(text):
+    """Rough model token count (about four characters per token for English text)"""
+    return math.ceil(len(text) / 4)
+
+
+def _heading_section(line):
+    """Return the canonical section a heading line opens, or None if it isn't a heading"""
+    stripped = line.strip().rstrip(':').strip()
+    letters = [c for c in stripped if c.isalpha()]
+    # "Skills: Python, Go" is a list line, not a heading
+    if not letters or len(stripped.split()) > 5 or ':' in stripped or ',' in stripped:
+        return None
+    upper = stripped.upper()
+    is_uppercase = sum(c.isupper() for c in letters) / len(letters) > 0.8
+    for section, keywords in SECTION_KEYWORDS:
+        for keyword in keywords:
+            # Title-case headings only count when the whole line is the heading
+            if keyword in upper and (is_uppercase or upper.startswith(keyword)):
+                return section
+    return None
+
+
+def _strip_bullet(line):
+    stripped = line.strip()
+    if stripped and stripped[0] in BULLET_CHARS and (len(stripped) == 1 or stripped[1] == ' '):
+        return stripped[1:].strip(), True
+    return stripped, False
+
+
+def split_sections(text):
+    """Split extracted resume text into Line records tagged with section and kind
+
+    Wrapped lines are re-joined, bullets become kind 'bullet', other lines in
+    experience and projects become 'entry' headers that following bullets point
+    at, and the contact block before the first heading is tagged 'header'.
+    """
+    raw_lines = [line for line in text.splitlines() if line.strip()]
+    has_headings = any(_heading_section(line) for line in raw_lines)
+
+    merged = []
+    section = 'header' if has_headings else 'other'
+    for raw in raw_lines:
+        heading = _heading_section(raw)
+        if heading:
+            section = heading
+            continue
+        content, is_bullet = _strip_bullet(raw)
+        if not content:
+            continue
+        # PDF extraction wraps long bullets; a lowercase or numeric start continues the previous line
+        if (not is_bullet and merged and merged[-1][0] == section
+                and (content[0].islower() or content[0].isdigit()) and not _CONTACT_PATTERN.search(content)):
+            merged[-1][1] = f"{merged[-1][1]} {content}"
+            continue
+        merged.append([section, content, is_bullet])
+
+    lines = []
+    entry = None
+    for position, (section, content, is_bullet) in enumerate(merged):
+        if section == 'header' or (not has_headings and _CONTACT_PATTERN.search(content)):
+            kind = 'header'
+        elif _LIST_LINE_PATTERN.match(content):
+            kind = 'list'
+        elif is_bullet:
+            kind = 'bullet'
+        elif section in ('experience', 'projects'):
+            kind = 'entry'
+            entry = position
+        else:
+            kind = 'text'
+        lines.append(Line(position, section, kind, content, entry if kind == 'bullet' else None))
+    return lines
+
+
+def _technology_pattern(lines):
+    """Compile a matcher for known technologies plus anything the resume lists as a skill"""
+    terms = {term.lower(): term for term in KNOWN_TECHNOLOGIES}
+    for line in lines:
+        if line.kind == 'list' or line.section == 'skills':
+            _, _, listed = line.text.partition(':')
+            for item in re.split(r'[,;|/•]', listed or line.text):
+                item = item.strip(' .()')
+                if 1 < len(item) <= 30 and len(item.split()) <= 3:
+                    terms.setdefault(item.lower(), item)
+    alternatives = sorted(terms, key=len, reverse=True)
+    pattern = re.compile(
+        r'(?<![\w+#.])(' + '|'.join(re.escape(term) for term in alternatives) + r')(?![\w+#]|\.\w)',
+        re.IGNORECASE
+    )
+    return pattern, terms
+
+
+def build_keyword_index(lines):
+    """Map each technology (canonical spelling) to the positions of the lines mentioning it"""
+    pattern, terms = _technology_pattern(lines)
+    index = {}
+    for line in lines:
+        if line.kind == 'header':
+            continue
+        for match in pattern.finditer(line.text):
+            positions = index.setdefault(terms[match.group(1).lower()], [])
+            if line.position not in positions:
+                positions.append(line.position)
+    return index
+
+
+def _entry_title(text):
+    """Keep the role and organisation of an entry header, dropping location and dates"""
+    parts = [part.strip() for part in text.split('|')]
+    return ' | '.join(parts[:2])
+
+
+def condense_resume(text, token_budget=400):
+    """Pack the most informative resume lines into roughly token_budget tokens
+
+    Deterministic: the same text and budget always produce the same output.
+    Lines are scored by section, newly covered technologies and quantified
+    impact, then picked greedily; entry headers come along with their bullets.
+    A budget of 0 returns the text unchanged.
+    """
+    source_tokens = estimate_tokens(text)
+    if not token_budget:
+        return CondensedResume(text, [], {}, source_tokens, source_tokens)
+    lines = split_sections(text)
+    index = build_keyword_index(lines)
+    by_position = {line.position: line for line in lines}
+    terms_of = {}
+    for term, positions in index.items():
+        for position in positions:
+            terms_of.setdefault(position, set()).add(term)
+
+    # Most-mentioned technologies first, ties broken by first appearance
+    technologies = sorted(index, key=lambda term: (-len(index[term]), index[term][0]))
+
+    budget = token_budget
+    technology_line = ''
+    if technologies:
+        listed = []
+        for term in technologies:
+            candidate = 'Technologies: ' + ', '.join(listed + [term])
+            if estimate_tokens(candidate) > token_budget * 0.2:
+                break
+            listed.append(term)
+        if listed:
+            technology_line = 'Technologies: ' + ', '.join(listed)
+            budget -= estimate_tokens(technology_line)
+
+    candidates = [line for line in lines if line.kind in ('bullet', 'text') and line.section in SECTION_WEIGHTS]
+    selected = set()
+    covered = set()
+    while candidates:
+        best = None
+        for line in candidates:
+            cost = estimate_tokens(line.text) + 1
+            if line.entry is not None and line.entry not in selected:
+                cost += estimate_tokens(_entry_title(by_position[line.entry].text)) + 1
+            if cost > budget:
+                continue
+            terms = terms_of.get(line.position, set())
+            score = SECTION_WEIGHTS[line.section]
+            score += 1.5 * len(terms - covered) + 0.25 * len(terms & covered)
+            if _IMPACT_PATTERN.search(line.text):
+                score += 1.0
+            # Favour dense lines without letting one long line crowd out several short ones
+            value = score / (1 + cost / 40)
+            if best is None or value > best[0]:
+                best = (value, line, cost)
+        if best is None:
+            break
+        _, line, cost = best
+        budget -= cost
+        selected.add(line.position)
+        if line.entry is not None:
+            selected.add(line.entry)
+        covered |= terms_of.get(line.position, set())
+        candidates.remove(line)
+
+    # Render in reading order, grouped under canonical section headings
+    output = [technology_line] if technology_line else []
+    for section in SECTION_ORDER:
+        section_lines = [line for line in lines if line.section == section and line.position in selected]
+        if not section_lines:
+            continue
+        output.append(section.upper())
+        for line in section_lines:
+            if line.kind == 'entry':
+                output.append(_entry_title(line.text))
+            elif line.kind == 'bullet':
+                output.append(f"- {line.text}")
+            else:
+                output.append(line.text)
+
+    condensed = '\n'.join(output)
+    if not condensed:
+        # Nothing recognisable (or every line is longer than the budget): plain truncation
+        condensed = text.strip()[:token_budget * 4]
+    return CondensedResume(
+        text=condensed,
+        technologies=technologies,
+        index=index,
+        tokens=estimate_tokens(condensed),
+        source_tokens=source_tokens
+    )
+
+
+if __name__ == '__main__':
+    # Offline check: python resume_condense.py resume.pdf|resume.txt [token_budget]
+    path = sys.argv[1]
+    budget = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    if path.lower().endswith('.pdf'):
+        from pdf_extract import extract_pdf
+        source = extract_pdf(path).text
+    else:
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+    result = condense_resume(source, budget)
+    print(result.text)
+    print(f"\n--- {result.source_tokens} -> {result.tokens} estimated tokens (budget {budget}), "
+          f"{len(result.technologies)} technologies indexed", file=sys.stderr)
@@ -0,0 +1,176 @@
+import random
+import threading
+import time
+from flask import current_app
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from models import db, SharedState
+
+
+class LocalStore:
+    """In-process stand-in for the shared store, for a single worker or local development
+
+    Values are numbers (counters, Unix timestamps); ttl is in seconds.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        entry = self._values.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._live(key, time.time())
+        return default if entry is None else entry[0]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._values[key] = (value, time.time() + ttl if ttl else None)
+
+    def incr(self, key, amount=1, ttl=None):
+        """Add to a counter, starting it (with ttl) when missing or expired; returns the new value"""
+        now = time.time()
+        with self._lock:
+            entry = self._live(key, now) or (0, now + ttl if ttl else None)
+            value = entry[0] + amount
+            self._values[key] = (value, entry[1])
+        return value
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        """Set key only if it currently holds expected (None: missing); returns whether it did"""
+        now = time.time()
+        with self._lock:
+            entry = self._live(key, now)
+            if (entry[0] if entry else None) != expected:
+                return False
+            self._values[key] = (value, now + ttl if ttl else None)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+
+class DatabaseStore:
+    """Shared store in the app database, so every worker on every node sees the same values
+
+    Each operation is a single atomic statement (an upsert with RETURNING on
+    SQLite and PostgreSQL) on its own connection, so it also works on threads
+    without an app context. Expired rows are ignored on read and purged now and then.
+    """
+
+    PURGE_PROBABILITY = 0.01
+    # Dialects whose INSERT supports ON CONFLICT ... RETURNING
+    INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+    def __init__(self, app):
+        self.app = app
+        self.table = SharedState.__table__
+        self._engine = None
+        # Checked at startup: the atomic upserts have no portable equivalent
+        dialect = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+        if dialect not in self.INSERTS:
+            raise ValueError(
+                f"SHARED_STATE_BACKEND=database needs a SQLite or PostgreSQL DATABASE_URL, not {dialect}"
+            )
+        self._insert_statement = self.INSERTS[dialect]
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self.app.app_context():
+                self._engine = db.engine
+        return self._engine
+
+    def _live(self, now):
+        return or_(self.table.c.expires_at.is_(None), self.table.c.expires_at > now)
+
+    def _expired(self, now):
+        return self.table.c.expires_at.isnot(None) & (self.table.c.expires_at <= now)
+
+    def _insert(self):
+        return self._insert_statement(self.table)
+
+    def _execute(self, statement, returning=False):
+        with self.engine.begin() as conn:
+            result = conn.execute(statement)
+            value = result.scalar() if returning else result.rowcount
+            if random.random() < self.PURGE_PROBABILITY:
+                conn.execute(delete(self.table).where(self._expired(time.time())))
+        return value
+
+    def get(self, key, default=None):
+        with self.engine.connect() as conn:
+            value = conn.execute(
+                select(self.table.c.value).where(self.table.c.key == key, self._live(time.time()))
+            ).scalar()
+        return default if value is None else value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        statement = self._insert().values(key=key, value=value, expires_at=expires_at)
+        self._execute(statement.on_conflict_do_update(
+            index_elements=['key'],
+            set_={'value': value, 'expires_at': expires_at}
+        ))
+
+    def incr(self, key, amount=1, ttl=None):
+        """Add to a counter, starting it (with ttl) when missing or expired; returns the new value"""
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        column = self.table.c
+        expired = self._expired(now)
+        statement = self._insert().values(key=key, value=amount, expires_at=expires_at)
+        statement = statement.on_conflict_do_update(
+            index_elements=['key'],
+            set_={
+                'value': db.case((expired, amount), else_=column.value + amount),
+                'expires_at': db.case((expired, expires_at), else_=column.expires_at)
+            }
+        ).returning(column.value)
+        return self._execute(statement, returning=True)
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        """Set key only if it currently holds expected (None: missing); returns whether it did"""
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        column = self.table.c
+        if expected is None:
+            # Insert, or take over an expired row; a live row means someone else holds the key
+            statement = self._insert().values(key=key, value=value, expires_at=expires_at)
+            statement = statement.on_conflict_do_update(
+                index_elements=['key'],
+                set_={'value': value, 'expires_at': expires_at},
+                where=self._expired(now)
+            ).returning(column.key)
+            return self._execute(statement, returning=True) is not None
+        statement = update(self.table).where(
+            column.key == key, column.value == expected, self._live(now)
+        ).values(value=value, expires_at=expires_at)
+        return self._execute(statement) == 1
+
+    def delete(self, *keys):
+        self._execute(delete(self.table).where(self.table.c.key.in_(keys)))
+
+
+def create_store(app):
+    """Build the store named by SHARED_STATE_BACKEND ('local' or 'database')"""
+    backend = app.config['SHARED_STATE_BACKEND']
+    if backend == 'database':
+        return DatabaseStore(app)
+    if backend == 'local':
+        return LocalStore()
+    raise ValueError(f"Unknown SHARED_STATE_BACKEND {backend!r} (expected 'local' or 'database')")
+
+
+def get_store():
+    """The current app's shared store"""
+    return current_app.extensions['shared_state']
@@ -70,52 +70,242 @@ async function handleFile(file) {
     formData.append('resume', file);
 
     try {
-        // Upload resume
-        const response = await fetch('/api/upload-resume', {
-            method: 'POST',
-            body: formData
-        });
+        // Stream questions as they are generated; fall back to a background job
+        if (window.ReadableStream && window.TextDecoder) {
+            await uploadResumeStreaming(formData);
+        } else {
+            await uploadResumeJob(formData);
+        }
+    } catch (error) {
+        console.error('Upload error:', error);
+        showError('An error occurred while uploading your resume');
+    }
+}
+
+async function uploadResumeJob(formData) {
+    // Upload resume as a background job; the server answers 202 right away
+    const response = await fetch('/api/upload-resume?mode=async', {
+        method: 'POST',
+        body: formData
+    });
+
+    const data = await response.json();
+
+    if (response.status === 202 && data.success) {
+        showLoading('Extracting text from your resume...');
+        followUploadJob(data);
+    } else {
+        showError(data.error || 'Failed to process resume');
+    }
+}
 
+async function uploadResumeStreaming(formData) {
+    const response = await fetch('/api/upload-resume?mode=stream', {
+        method: 'POST',
+        body: formData
+    });
+
+    const contentType = response.headers.get('Content-Type') || '';
+    if (!response.ok || !response.body || !contentType.startsWith('text/event-stream')) {
         const data = await response.json();
+        showError(data.error || 'Failed to process resume');
+        return;
+    }
 
-        if (response.ok && data.success) {
-            // Show success message briefly
-            showLoading('Generating interview questions...');
-
-            // Wait a moment for effect
-            setTimeout(() => {
-                displayQuestions(data.questions, data.resume_id);
-                hideLoading();
-            }, 1000);
-        } else {
+    showLoading('Generating interview questions...');
+    beginQuestionStream();
+
+    // Read server-sent events off the POST response as they arrive
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        events.forEach(handleQuestionStreamEvent);
+    }
+
+    if (questionsStreaming) {
+        questionsStreaming = false;
+        showError('The connection closed before all questions were generated');
+    }
+}
+
+function parseServerSentEvent(raw) {
+    let event = 'message';
+    const dataLines = [];
+    raw.split('\n').forEach(line => {
+        if (line.startsWith('event:')) {
+            event = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+            dataLines.push(line.slice(5).trim());
+        }
+    });
+    return { event, data: dataLines.length ? JSON.parse(dataLines.join('\n')) : null };
+}
+
+function handleQuestionStreamEvent(raw) {
+    const { event, data } = parseServerSentEvent(raw);
+
+    if (event === 'question') {
+        addStreamedQuestion(data.question);
+    } else if (event === 'done') {
+        finishQuestionStream(data.questions, data.resume_id);
+    } else if (event === 'error') {
+        questionsStreaming = false;
+        waitingForNextQuestion = false;
+        if (allQuestions.length) updateQuestionProgress();
+        showError(data.error || 'Failed to generate interview questions');
+    }
+}
+
+// Upload Job Progress
+const jobStageMessages = {
+    queued: 'Waiting for a free worker...',
+    extracting: 'Extracting text from your resume...',
+    generating: 'Generating interview questions...',
+    saving: 'Saving your interview questions...'
+};
+
+function handleJobUpdate(job) {
+    if (job.status === 'completed') {
+        displayQuestions(job.questions, job.resume_id);
+        hideLoading();
+        return true;
+    }
+    if (job.status === 'failed') {
+        showError(job.error || 'Failed to process resume');
+        return true;
+    }
+    showLoading(jobStageMessages[job.status] || 'Processing your resume...');
+    return false;
+}
+
+function followUploadJob(job) {
+    // Prefer server-sent events, fall back to polling the status endpoint
+    if (!window.EventSource) {
+        pollUploadJob(job.status_url);
+        return;
+    }
+
+    const events = new EventSource(job.events_url);
+    events.addEventListener('status', (event) => {
+        if (handleJobUpdate(JSON.parse(event.data))) {
+            events.close();
+        }
+    });
+    events.addEventListener('timeout', () => {
+        events.close();
+        pollUploadJob(job.status_url);
+    });
+    events.onerror = () => {
+        events.close();
+        pollUploadJob(job.status_url);
+    };
+}
+
+async function pollUploadJob(statusUrl) {
+    try {
+        const response = await fetch(statusUrl);
+        const data = await response.json();
+
+        if (!response.ok || !data.success) {
             showError(data.error || 'Failed to process resume');
+            return;
+        }
+        if (!handleJobUpdate(data.job)) {
+            setTimeout(() => pollUploadJob(statusUrl), 1000);
         }
     } catch (error) {
-        console.error('Upload error:', error);
-        showError('An error occurred while uploading your resume');
+        console.error('Job status error:', error);
+        showError('An error occurred while processing your resume');
     }
 }
 
-// Display Questions
 // Display Questions
 let currentResumeId = null;
 let allQuestions = [];
 let currentQuestionIndex = 0;
 let userResponses = [];
 
+// Streaming state: questions arrive one by one until the server sends "done"
+const EXPECTED_QUESTION_COUNT = 4;
+let questionsStreaming = false;
+let waitingForNextQuestion = false;
+
 function displayQuestions(questions, resumeId) {
     // Store data
     currentResumeId = resumeId;
     allQuestions = questions;
     currentQuestionIndex = 0;
     userResponses = [];
+    questionsStreaming = false;
+    waitingForNextQuestion = false;
+
+    showQuestionsSection();
+
+    // Render the first question
+    renderCurrentQuestion();
+}
 
+function showQuestionsSection() {
     // Show questions section, hide upload section
     uploadSection.classList.add('hidden');
     questionsSection.classList.remove('hidden');
+}
 
-    // Render the first question
-    renderCurrentQuestion();
+function beginQuestionStream() {
+    currentResumeId = null;
+    allQuestions = [];
+    currentQuestionIndex = 0;
+    userResponses = [];
+    questionsStreaming = true;
+    waitingForNextQuestion = false;
+}
+
+function addStreamedQuestion(question) {
+    allQuestions.push(question);
+
+    if (allQuestions.length === 1) {
+        // First question: show it immediately while the rest are generated
+        hideLoading();
+        showQuestionsSection();
+        renderCurrentQuestion();
+    } else if (waitingForNextQuestion) {
+        waitingForNextQuestion = false;
+        currentQuestionIndex++;
+        renderCurrentQuestion();
+    } else {
+        updateQuestionProgress();
+    }
+}
+
+function finishQuestionStream(questions, resumeId) {
+    currentResumeId = resumeId;
+    questionsStreaming = false;
+
+    if (allQuestions.length === 0) {
+        displayQuestions(questions, resumeId);
+        hideLoading();
+        return;
+    }
+
+    allQuestions = questions;
+    if (waitingForNextQuestion) {
+        // The user already answered the final question
+        waitingForNextQuestion = false;
+        updateQuestionProgress();
+        submitAllResponses();
+        return;
+    }
+    updateQuestionProgress();
+}
+
+function questionTotal() {
+    return questionsStreaming ? Math.max(allQuestions.length, EXPECTED_QUESTION_COUNT) : allQuestions.length;
 }
 
 function renderCurrentQuestion() {
@@ -131,22 +321,16 @@ function renderCurrentQuestion() {
     // Remove animation delay for immediate feel or keep it simple
     card.style.animationDelay = '0s';
 
-    const progressPercentage = ((index + 1) / allQuestions.length) * 100;
-
     card.innerHTML = `
         <div class="question-header" style="margin-bottom: 2rem;">
             <div class="progress-wrapper" style="margin-bottom: 1rem;">
                 <div class="progress-track" style="width: 100%; height: 6px; background: #e2e8f0; border-radius: 4px; overflow: hidden;">
-                    <div class="progress-fill" style="width: ${progressPercentage}%; height: 100%; background: var(--accent-gradient); transition: width 0.5s ease;"></div>
+                    <div class="progress-fill" style="width: 0%; height: 100%; background: var(--accent-gradient); transition: width 0.5s ease;"></div>
                 </div>
             </div>
             <div class="question-meta" style="display: flex; justify-content: space-between; align-items: center;">
-                <span class="question-label" style="font-size: 0.75rem; font-weight: 700; letter-spacing: 0.5px; text-transform: uppercase; color: var(--accent-primary); background: #f1f5f9; padding: 4px 12px; border-radius: 20px;">
-                    Question ${index + 1} / ${allQuestions.length}
-                </span>
-                <span class="status-text" style="font-size: 0.875rem; color: var(--text-tertiary); font-weight: 500;">
-                    ${Math.round(progressPercentage)}% Completed
-                </span>
+                <span class="question-label" style="font-size: 0.75rem; font-weight: 700; letter-spacing: 0.5px; text-transform: uppercase; color: var(--accent-primary); background: #f1f5f9; padding: 4px 12px; border-radius: 20px;"></span>
+                <span class="status-text" style="font-size: 0.875rem; color: var(--text-tertiary); font-weight: 500;"></span>
             </div>
         </div>
         <div class="question-text" style="font-size: 1.5rem; margin-bottom: 2rem; color: var(--text-primary); font-weight: 600;">${escapeHtml(question)}</div>
@@ -170,21 +354,37 @@ function renderCurrentQuestion() {
     `;
 
     questionsContainer.appendChild(card);
+    updateQuestionProgress();
+
+    // Scroll to top of questions
+    questionsSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
+}
+
+function updateQuestionProgress() {
+    // Refresh counters in place so streamed questions don't wipe a typed answer
+    const index = currentQuestionIndex;
+    const total = questionTotal();
+    const progressPercentage = ((index + 1) / total) * 100;
+
+    const fill = questionsContainer.querySelector('.progress-fill');
+    const label = questionsContainer.querySelector('.question-label');
+    const status = questionsContainer.querySelector('.status-text');
+    if (fill) fill.style.width = `${progressPercentage}%`;
+    if (label) label.textContent = `Question ${index + 1} / ${total}`;
+    if (status) status.textContent = `${Math.round(progressPercentage)}% Completed`;
 
     // Update submit button text
     const submitBtn = document.getElementById('submit-btn');
-    const isLast = index === allQuestions.length - 1;
+    const isLast = !questionsStreaming && index === allQuestions.length - 1;
+    submitBtn.disabled = waitingForNextQuestion;
 
     // Preserve icon but change text
     submitBtn.innerHTML = `
         <svg width="20" height="20" viewBox="0 0 20 20" fill="none" xmlns="http://www.w3.org/2000/svg">
             <path d="M16.5 5L7.5 14L3.5 10" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
         </svg>
-        ${isLast ? 'Finish & Submit' : 'Next Question'}
+        ${waitingForNextQuestion ? 'Generating next question...' : (isLast ? 'Finish & Submit' : 'Next Question')}
     `;
-
-    // Scroll to top of questions
-    questionsSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
 }
 
 // UI State Management
@@ -228,9 +428,10 @@ function showError(message) {
 }
 
 // Audio Recording Logic
-let mediaRecorders = {};
-let audioChunks = {};
+// The server records the PCM it relays for transcription, so there is no separate upload
 let webSockets = {};
+let recordingSavedResolvers = {};
+const RECORDING_SAVE_TIMEOUT_MS = 3000;
 
 // Transcript storage for real-time display
 let transcripts = {};
@@ -258,17 +459,6 @@ async function startRecording(index) {
         transcripts[index] = { committed: '', partial: '' };
         const textarea = document.getElementById(`response-${index}`);
 
-        // Setup MediaRecorder for file upload (existing functionality)
-        const mediaRecorder = new MediaRecorder(stream);
-        mediaRecorders[index] = mediaRecorder;
-        audioChunks[index] = [];
-
-        mediaRecorder.ondataavailable = (event) => {
-            if (event.data.size > 0) {
-                audioChunks[index].push(event.data);
-            }
-        };
-
         // Setup AudioContext for real-time transcription (PCM)
         const audioContext = new (window.AudioContext || window.webkitAudioContext)({ sampleRate: 16000 });
         audioContexts[index] = audioContext;
@@ -279,7 +469,11 @@ async function startRecording(index) {
 
         // WebSocket for real-time transcription
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-        const ws = new WebSocket(`${protocol}//${window.location.host}/ws/transcribe`);
+        const params = new URLSearchParams({ sample_rate: audioContext.sampleRate, record: 1, question_index: index });
+        // While questions are still streaming the resume has no id yet; the transcript is stored without one
+        if (currentResumeId !== null) params.set('resume_id', currentResumeId);
+        const ws = new WebSocket(`${protocol}//${window.location.host}/ws/transcribe?${params}`);
+        ws.binaryType = 'arraybuffer';
         webSockets[index] = ws;
 
         ws.onopen = () => {
@@ -293,13 +487,19 @@ async function startRecording(index) {
             const data = JSON.parse(event.data);
             console.log('Transcription event:', data);
 
-            if (data.message_type === 'partial_transcript') {
+            if (data.message_type === 'transcript_started') {
+                // The server keeps the committed text under this id
+                transcripts[index].id = data.transcript_id;
+            } else if (data.message_type === 'partial_transcript') {
                 transcripts[index].partial = data.text;
                 updateTextarea(index);
             } else if (data.message_type === 'committed_transcript') {
                 transcripts[index].committed += (transcripts[index].committed ? ' ' : '') + data.text;
                 transcripts[index].partial = '';
                 updateTextarea(index);
+            } else if (data.message_type === 'recording_saved') {
+                document.getElementById(`audio-${index}`).value = data.filename;
+                if (recordingSavedResolvers[index]) recordingSavedResolvers[index]();
             } else if (data.error) {
                 console.error('Transcription error:', data.error);
                 showError(`Transcription error: ${data.error}`);
@@ -316,38 +516,11 @@ async function startRecording(index) {
                 pcmData[i] = Math.max(-1, Math.min(1, inputData[i])) * 0x7FFF;
             }
 
-            // Convert PCM to base64
-            const base64Audio = btoa(String.fromCharCode.apply(null, new Uint8Array(pcmData.buffer)));
-
-            ws.send(JSON.stringify({
-                type: 'audio',
-                audio: base64Audio,
-                sample_rate: 16000
-            }));
-        };
-
-        mediaRecorder.onstop = async () => {
-            // Create audio blob and upload
-            const audioBlob = new Blob(audioChunks[index], { type: 'audio/webm' });
-            const formData = new FormData();
-            formData.append('audio', audioBlob, 'recording.webm');
-
-            try {
-                const response = await fetch('/api/upload-audio', {
-                    method: 'POST',
-                    body: formData
-                });
-                const data = await response.json();
-                if (data.success) {
-                    document.getElementById(`audio-${index}`).value = data.filename;
-                }
-            } catch (error) {
-                console.error('Error uploading audio:', error);
-            }
+            // Send raw PCM as a binary frame; the server batches and encodes it
+            ws.send(pcmData.buffer);
         };
 
         // Start recording
-        mediaRecorder.start();
         const btn = document.querySelector(`#response-${index}`).parentElement.querySelector('.record-btn');
         btn.classList.add('recording');
 
@@ -366,11 +539,6 @@ function updateTextarea(index) {
 }
 
 async function stopRecording(index) {
-    // Stop MediaRecorder
-    if (mediaRecorders[index] && mediaRecorders[index].state !== 'inactive') {
-        mediaRecorders[index].stop();
-    }
-
     // Stop Audio Processing
     if (processors[index]) {
         processors[index].disconnect();
@@ -387,10 +555,17 @@ async function stopRecording(index) {
         delete audioStreams[index];
     }
 
-    // Close WebSocket
+    // Ask the server to finalize its recording, then close the WebSocket
     if (webSockets[index]) {
-        if (webSockets[index].readyState === WebSocket.OPEN) {
-            webSockets[index].close();
+        const ws = webSockets[index];
+        if (ws.readyState === WebSocket.OPEN) {
+            await new Promise(resolve => {
+                recordingSavedResolvers[index] = resolve;
+                setTimeout(resolve, RECORDING_SAVE_TIMEOUT_MS);
+                ws.send(JSON.stringify({ type: 'stop' }));
+            });
+            delete recordingSavedResolvers[index];
+            ws.close();
         }
         delete webSockets[index];
     }
@@ -405,8 +580,15 @@ async function stopRecording(index) {
 async function handleResponseSubmit(e) {
     e.preventDefault();
 
-    // Get current inputs
     const index = currentQuestionIndex;
+
+    // Stop recording if active (waits for the server to report the saved file)
+    const recordBtn = document.querySelector('.record-btn.recording');
+    if (recordBtn) {
+        await stopRecording(index);
+    }
+
+    // Get current inputs
     const answerTextarea = document.getElementById(`response-${index}`);
     const audioInput = document.getElementById(`audio-${index}`);
     const answer = answerTextarea.value.trim();
@@ -418,23 +600,23 @@ async function handleResponseSubmit(e) {
         return;
     }
 
-    // Stop recording if active
-    const recordBtn = document.querySelector('.record-btn.recording');
-    if (recordBtn) {
-        await stopRecording(index);
-    }
-
-    // Store response
+    // Store response; an unedited transcription also names the server's copy (which links its recording)
+    const transcript = transcripts[index];
     userResponses[index] = {
         question: allQuestions[index],
         answer: answer,
-        audio_file: audioFilename || null
+        audio_file: audioFilename || null,
+        transcript_id: transcript && transcript.id && answer === transcript.committed.trim() ? transcript.id : null
     };
 
     // Check if there are more questions
     if (currentQuestionIndex < allQuestions.length - 1) {
         currentQuestionIndex++;
         renderCurrentQuestion();
+    } else if (questionsStreaming) {
+        // Next question is still being generated; advance when it arrives
+        waitingForNextQuestion = true;
+        updateQuestionProgress();
     } else {
         // Last question, submit everything
         await submitAllResponses();
@@ -453,6 +635,7 @@ async function submitAllResponses() {
             },
             body: JSON.stringify({
                 resume_id: currentResumeId,
+                // The answer shown to the user is always sent; the server only prefers a finished transcript
                 responses: userResponses
             })
         });
@@ -0,0 +1,115 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+# Static files served fingerprinted from /assets/; anything else keeps Flask's /static/ handler
+FINGERPRINTED_EXTENSIONS = ('.css', '.js', '.svg', '.json')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MANIFEST_NAME = 'manifest.json'
+
+# Suffix of each precompressed variant's file next to the fingerprinted copy
+ENCODING_SUFFIXES = {'identity': '', 'gzip': '.gz', 'br': '.br'}
+
+
+class Asset:
+    """One fingerprinted static file and the encodings it was precompressed into"""
+
+    def __init__(self, filename, name, etag, encodings):
+        self.filename = filename
+        self.name = name
+        self.etag = etag
+        self.encodings = encodings
+        self.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    def negotiate(self, accept_encodings):
+        """The smallest variant the client accepts: 'br', 'gzip' or 'identity'"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encodings and accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def path(self, encoding):
+        """The variant's file, relative to the build directory"""
+        return self.name + ENCODING_SUFFIXES[encoding]
+
+
+class AssetManifest:
+    """The fingerprinted assets written by build_assets, looked up by original or hashed name"""
+
+    def __init__(self, build_dir, entries):
+        self.build_dir = build_dir
+        self.by_filename = {}
+        self.by_name = {}
+        for filename, entry in entries.items():
+            asset = Asset(filename, entry['name'], entry['etag'], entry['encodings'])
+            self.by_filename[filename] = asset
+            self.by_name[asset.name] = asset
+
+    @classmethod
+    def load(cls, build_dir):
+        """Read the manifest of a build directory; None if nothing was built there"""
+        try:
+            with open(os.path.join(build_dir, MANIFEST_NAME)) as f:
+                return cls(build_dir, json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def name_for(self, filename):
+        """The fingerprinted name of a static file, or None if it isn't fingerprinted"""
+        asset = self.by_filename.get(filename)
+        return asset.name if asset is not None else None
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+
+def _write(path, body):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(body)
+    os.replace(path + '.tmp', path)
+
+
+def build_assets(static_folder, build_dir):
+    """Write content-hashed copies of a static folder's text assets and their gzip/brotli variants
+
+    Every build hashes the same files to the same names, so URLs agree across
+    workers and nodes and change only when a file's content does. Files from
+    earlier builds are kept for clients still holding old pages. The manifest
+    is written last, so a running process never sees names without files.
+    Returns the new AssetManifest.
+    """
+    try:
+        import brotli  # only the build step compresses
+    except ImportError:
+        brotli = None  # gzip only
+
+    entries = {}
+    for directory, _, files in os.walk(static_folder):
+        for file in files:
+            if not file.endswith(FINGERPRINTED_EXTENSIONS):
+                continue
+            path = os.path.join(directory, file)
+            filename = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                body = f.read()
+            digest = hashlib.sha256(body).hexdigest()
+            root, extension = os.path.splitext(filename)
+            name = f"{root}.{digest[:12]}{extension}"
+
+            bodies = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                bodies['br'] = brotli.compress(body, quality=11)
+            encodings = []
+            for encoding, variant in bodies.items():
+                # Variants that don't come out smaller aren't worth the decode on the client
+                if encoding != 'identity' and len(variant) >= len(body):
+                    continue
+                _write(os.path.join(build_dir, name + ENCODING_SUFFIXES[encoding]), variant)
+                encodings.append(encoding)
+            entries[filename] = {'name': name, 'etag': digest[:32], 'encodings': encodings}
+
+    _write(os.path.join(build_dir, MANIFEST_NAME), json.dumps(entries, indent=2, sort_keys=True).encode('utf-8'))
+    return AssetManifest(build_dir, entries)
@@ -0,0 +1,85 @@
+import math
+import pytest
+from analytics import FILLER_PHRASES, FILLER_WORDS, STAR_KEYWORDS, compute_answer_metrics
+from models import AnswerMetric
+
+
+def _is_word_char(char):
+    code = ord(char)
+    return (
+        char.isascii() and char.isalnum()
+        or code in (0x27, 0x2019)
+        or 0xc0 <= code <= 0x1fff
+        or 0x2c00 <= code <= 0xffff
+    )
+
+
+def _words(text):
+    """Reference tokenizer: runs of word characters, lower-cased for ASCII only (as the vectorized code does)"""
+    words, current = [], ''
+    for char in text + ' ':
+        if _is_word_char(char):
+            current += char.lower() if char.isascii() else char
+        elif current:
+            words.append(current)
+            current = ''
+    return words
+
+
+def reference_metrics(answer):
+    words = _words(answer)
+    fillers = 0
+    for i, word in enumerate(words):
+        following = words[i + 1] if i + 1 < len(words) else None
+        if word in FILLER_WORDS or f"{word} {following}" in FILLER_PHRASES:
+            fillers += 1
+    components = 0
+    for bit, name in enumerate(AnswerMetric.STAR_COMPONENTS):
+        if any(word in STAR_KEYWORDS[name] for word in words):
+            components |= 1 << bit
+    return len(words), fillers, components
+
+
+ANSWERS = [
+    "Um, so basically the SITUATION was that our build took 40 minutes.",
+    "I implemented caching and it reduced the time, you know, by half.",
+    "I don't think it's needed; we weren't asked. I mean it’s fine.",
+    "Résumé parsing in naïve Ünicode: 東京 team led the migration",
+    "",
+    "   ...   ",
+    "Like I said, you",
+    "know what, kind of sort of like the result improved",
+    "the goal was a problem we solved while during the outage",
+]
+
+
+def test_batch_matches_reference():
+    metrics = compute_answer_metrics(ANSWERS, [float('nan')] * len(ANSWERS))
+    for i, answer in enumerate(ANSWERS):
+        word_count, filler_count, components = reference_metrics(answer)
+        assert metrics['word_count'][i] == word_count, answer
+        assert metrics['filler_count'][i] == filler_count, answer
+        assert metrics['star_components'][i] == components, answer
+
+
+def test_phrase_split_across_answers_is_not_counted():
+    metrics = compute_answer_metrics(["well, you", "know the plan"], [float('nan')] * 2)
+    assert list(metrics['filler_count']) == [0, 0]
+    metrics = compute_answer_metrics(["well, you know the plan"], [float('nan')])
+    assert list(metrics['filler_count']) == [1]
+
+
+def test_apostrophes_and_non_ascii_stay_inside_words():
+    metrics = compute_answer_metrics(["don't won’t café über", "ÉCOLE école"], [float('nan')] * 2)
+    assert list(metrics['word_count']) == [4, 2]
+
+
+def test_rates_and_coverage():
+    metrics = compute_answer_metrics(["um we built it and the result improved", ""], [30.0, float('nan')])
+    assert metrics['filler_rate'][0] == pytest.approx(1 / 8)
+    assert metrics['words_per_minute'][0] == pytest.approx(16)
+    assert math.isnan(metrics['words_per_minute'][1])
+    assert metrics['filler_rate'][1] == 0
+    action, result = (1 << AnswerMetric.STAR_COMPONENTS.index(name) for name in ('action', 'result'))
+    assert metrics['star_components'][0] == action | result
+    assert metrics['star_coverage'][0] == pytest.approx(2 / len(AnswerMetric.STAR_COMPONENTS))
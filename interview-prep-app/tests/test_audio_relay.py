@@ -0,0 +1,137 @@
+import base64
+import json
+import wave
+import numpy as np
+import pytest
+from audio_relay import SilenceGate, TranscriptionRelay
+from create_sample_speech import synthesize_speech, write_wav
+
+RATE = 16000
+FRAME = RATE * 20 // 1000 * 2  # bytes in one 20 ms frame
+
+
+def ms(milliseconds):
+    """Bytes of PCM16 mono at RATE"""
+    return RATE * milliseconds // 1000 * 2
+
+
+def silence(milliseconds, seed=0):
+    # Room noise around -66 dBFS, well under the gate's -45 dBFS threshold
+    noise = np.random.default_rng(seed).normal(0, 16, RATE * milliseconds // 1000)
+    return noise.astype('<i2').tobytes()
+
+
+def tone(milliseconds, dbfs=-12):
+    t = np.arange(RATE * milliseconds // 1000) / RATE
+    amplitude = 32768 * 10 ** (dbfs / 20) * np.sqrt(2)
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype('<i2').tobytes()
+
+
+def feed(gate, pcm, size):
+    """Push pcm through the gate in browser frames of size bytes; returns everything it let through"""
+    out = b''.join(gate.process(pcm[i:i + size]) for i in range(0, len(pcm), size))
+    return out + gate.flush()
+
+
+def make_gate():
+    return SilenceGate(sample_rate=RATE, threshold_dbfs=-45, frame_ms=20, hangover_ms=600, padding_ms=200)
+
+
+def test_silence_is_suppressed():
+    gate = make_gate()
+    pcm = silence(1000)
+    assert feed(gate, pcm, FRAME) == b''
+    gate.close()
+    assert gate.passed_bytes == 0
+    assert gate.suppressed_bytes == len(pcm)
+    assert gate.suppressed_seconds == pytest.approx(1.0)
+
+
+def test_tone_passes_unchanged():
+    gate = make_gate()
+    pcm = tone(1000)
+    assert feed(gate, pcm, FRAME) == pcm
+    gate.close()
+    assert gate.suppressed_bytes == 0
+
+
+@pytest.mark.parametrize('size', [FRAME, 1234, 4096])
+def test_mixed_audio_keeps_padding_and_hangover(size):
+    # 0-500 silence, 500-700 tone, 700-1700 silence, 1700-1800 tone
+    pcm = silence(500) + tone(200) + silence(1000, seed=1) + tone(100)
+    gate = make_gate()
+    out = feed(gate, pcm, size)
+    gate.close()
+    # 200 ms padding before each burst and 600 ms hangover after the first;
+    # the rest of the silence (0-300 and 1300-1500 ms) is dropped
+    assert out == pcm[ms(300):ms(1300)] + pcm[ms(1500):ms(1800)]
+    assert gate.suppressed_bytes == ms(500)
+    assert gate.passed_bytes + gate.suppressed_bytes == len(pcm)
+
+
+def test_recorded_fixture_keeps_order_and_accounts_for_every_byte(tmp_path):
+    pcm, speech_seconds = synthesize_speech(seconds=8.0, seed=3)
+    path = tmp_path / 'speech.wav'
+    write_wav(str(path), pcm)
+    with wave.open(str(path), 'rb') as recording:
+        recorded = recording.readframes(recording.getnframes())
+
+    gate = make_gate()
+    out = feed(gate, recorded, 4096)
+    gate.close()
+    assert gate.passed_bytes == len(out)
+    assert gate.passed_bytes + gate.suppressed_bytes == len(recorded)
+    assert len(out) >= speech_seconds * RATE * 2 * 0.9
+    assert gate.suppressed_bytes > 0
+    # Whole frames are passed or dropped, never reordered
+    frames = [recorded[i:i + FRAME] for i in range(0, len(recorded), FRAME)]
+    position = 0
+    for i in range(0, len(out), FRAME):
+        position = frames.index(out[i:i + FRAME], position) + 1
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+def queued_audio(relay):
+    """Sizes of the PCM chunks waiting in the relay's upstream send queue"""
+    sizes = []
+    while not relay._send_queue.empty():
+        message = json.loads(relay._send_queue.get_nowait())
+        sizes.append(len(base64.b64decode(message['audio_base_64'])))
+    return sizes
+
+
+def test_relay_coalesces_frames_into_chunks():
+    relay = TranscriptionRelay(FakeBrowser(), 'ws://unused', 'key', sample_rate=RATE, chunk_bytes=16000)
+    for _ in range(60):
+        relay._handle_browser_message(tone(20))
+    assert queued_audio(relay) == [16000, 16000]
+    # A control message sends the buffered remainder first
+    relay._handle_browser_message(json.dumps({'type': 'stop'}))
+    assert queued_audio(relay) == [60 * FRAME - 32000]
+
+
+def test_relay_sends_only_gated_audio():
+    gate = make_gate()
+    relay = TranscriptionRelay(FakeBrowser(), 'ws://unused', 'key', sample_rate=RATE, chunk_bytes=16000, gate=gate)
+    pcm = silence(2000) + tone(500)
+    for i in range(0, len(pcm), FRAME):
+        relay._handle_browser_message(pcm[i:i + FRAME])
+    relay._handle_browser_message(json.dumps({'type': 'stop'}))
+    assert sum(queued_audio(relay)) == ms(200) + ms(500)
+
+
+def test_relay_send_queue_is_bounded():
+    relay = TranscriptionRelay(
+        FakeBrowser(), 'ws://unused', 'key', sample_rate=RATE, chunk_bytes=FRAME, queue_size=3, send_timeout=0.01
+    )
+    for _ in range(10):
+        relay._handle_browser_message(tone(20))
+    assert relay._send_queue.qsize() == 3
+    assert relay.dropped_chunks == 7
@@ -0,0 +1,118 @@
+import threading
+import time
+import uuid
+from datetime import datetime
+from models import db, Transcript
+from metrics import TRANSCRIPT_FLUSH_ROWS, TRANSCRIPT_FLUSH_FAILURES, TRANSCRIPT_SEGMENTS
+
+
+class TranscriptWriter:
+    """Collects transcript updates from every session in this process and writes them in batches
+
+    Sessions report their latest state in memory; every interval seconds (or on
+    flush()) all changed transcripts are written in one transaction, so a
+    session costs one UPDATE per interval rather than one per committed segment.
+    """
+
+    def __init__(self, app, interval=2.0):
+        self.app = app
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    def record(self, transcript_id, **values):
+        """Queue the latest values (text, segment_count, ...) for a transcript's next write"""
+        with self._lock:
+            self._pending.setdefault(transcript_id, {}).update(values, updated_at=datetime.utcnow())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='transcript-writer', daemon=True)
+                self._thread.start()
+
+    def flush(self):
+        """Write every queued update now; returns the number of transcripts written"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                with self.app.app_context():
+                    # One executemany UPDATE per set of changed columns; rows deleted meanwhile are skipped
+                    groups = {}
+                    for transcript_id, values in pending.items():
+                        groups.setdefault(tuple(sorted(values)), []).append(dict(values, transcript_id=transcript_id))
+                    table = Transcript.__table__
+                    for columns, rows in groups.items():
+                        db.session.execute(
+                            table.update()
+                            .where(table.c.id == db.bindparam('transcript_id'))
+                            .values({column: db.bindparam(column) for column in columns}),
+                            rows
+                        )
+                    db.session.commit()
+            except Exception as e:
+                TRANSCRIPT_FLUSH_FAILURES.inc()
+                print(f"WARNING: Writing {len(pending)} transcripts failed, retrying next flush: {str(e)}")
+                with self._lock:
+                    # Newer values queued meanwhile win over the ones that failed
+                    for transcript_id, values in pending.items():
+                        self._pending[transcript_id] = dict(values, **self._pending.get(transcript_id, {}))
+                return 0
+            TRANSCRIPT_FLUSH_ROWS.observe(len(pending))
+            return len(pending)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+
+class TranscriptSession:
+    """Accumulates the committed transcript of one /ws/transcribe session"""
+
+    def __init__(self, writer, transcript_id):
+        self.writer = writer
+        self.id = transcript_id
+        self.segments = []
+        self.completed_at = None
+
+    @classmethod
+    def start(cls, writer, resume_id=None, question_index=None):
+        """Insert the session's transcript row (in the current app context) and return its session"""
+        transcript_id = uuid.uuid4().hex
+        db.session.add(Transcript(
+            id=transcript_id,
+            resume_id=resume_id,
+            question_index=question_index,
+            text='',
+            segment_count=0
+        ))
+        db.session.commit()
+        return cls(writer, transcript_id)
+
+    @property
+    def text(self):
+        return ' '.join(self.segments)
+
+    def add(self, text):
+        """Append a committed segment; it reaches the database with the writer's next batch"""
+        text = text.strip()
+        if not text:
+            return
+        self.segments.append(text)
+        TRANSCRIPT_SEGMENTS.inc()
+        self.writer.record(self.id, text=self.text, segment_count=len(self.segments))
+
+    def finish(self, audio_file=None):
+        """Mark the transcript complete and write it (with everything else pending) right away
+
+        Segments arriving after a stop are still added; finishing again writes them.
+        """
+        self.completed_at = self.completed_at or datetime.utcnow()
+        values = {'text': self.text, 'segment_count': len(self.segments), 'completed_at': self.completed_at}
+        if audio_file:
+            values['audio_file'] = audio_file
+        self.writer.record(self.id, **values)
+        self.writer.flush()